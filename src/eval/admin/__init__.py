@@ -1,16 +1,130 @@
+from functools import partial
+import json
+
 from django.contrib import admin
-from django.db.models import Case, Count, F, Q, When
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+    JsonResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
+from eval import archive
+from eval import caching
 from eval import constants
 from eval import models
+from eval import stations
+from eval import stats
+from eval.admin import columns
 from eval.admin import common
+from eval.admin import filters
 from eval.admin import inlines as eval_inlines
+from eval.admin import pagination
 from eval.admin import utils
 
 
+class EventAdmin(admin.ModelAdmin):
+    actions = ["finalize"]
+    list_display = ("name", "is_active", "is_finalized")
+
+    def finalize(self, request, queryset):
+        for event in queryset.filter(is_finalized=False):
+            archive.finalize(event)
+            self.message_user(request, f"Finalized '{event}'.")
+
+    finalize.short_description = (
+        f"Finalize selected {constants.EVENT_PLURAL_SK}"
+    )
+
+
+class FinalStandingAdmin(admin.ModelAdmin):
+    list_display = (
+        "category_1_rank",
+        "category_2_rank",
+        "team",
+        "missed_sites",
+        "get_route_time",
+        "get_stop_time",
+        "get_total_penalty",
+        "get_total_time",
+    )
+    list_display_links = ("team",)
+    list_filter = (filters.EventFilter,)
+    list_per_page = 1000
+    fields = (
+        "event",
+        "team",
+        "category_1_rank",
+        "category_2_rank",
+        "get_sites",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_route_time(self, obj):
+        return utils.format_seconds(
+            obj.route_time, colorful=False, signed=False
+        )
+
+    get_route_time.short_description = constants.ROUTE_SK
+    get_route_time.admin_order_field = "route_time"
+
+    def get_stop_time(self, obj):
+        return utils.format_seconds(obj.stop_time, "&nbsp;")
+
+    get_stop_time.short_description = mark_safe(
+        f"&Sigma; {constants.STOP_TIME}"
+    )
+    get_stop_time.admin_order_field = "stop_time"
+
+    def get_total_penalty(self, obj):
+        return utils.format_seconds(obj.total_penalty, "")
+
+    get_total_penalty.short_description = mark_safe(
+        f"&Sigma; {constants.PENALTY_SK} ({constants.CATEGORY_SK} 2)"
+    )
+    get_total_penalty.admin_order_field = "category_2_rank"
+
+    def get_total_time(self, obj):
+        return utils.format_seconds(
+            obj.total_time, colorful=False, signed=False
+        )
+
+    get_total_time.short_description = mark_safe(
+        f"&Sigma;&Sigma; ({constants.CATEGORY_SK} 1)"
+    )
+    get_total_time.admin_order_field = "category_1_rank"
+
+    def get_sites(self, obj):
+        sites = json.loads(obj.sites)
+        return utils.format_like_table(
+            [f"ST{site['site']} {site['name']}" for site in sites],
+            [utils.format_seconds(site["total_penalty"]) for site in sites],
+            distinguish_last=False,
+        )
+
+    get_sites.short_description = constants.SITE_PLURAL_SK
+
+
 class SiteAdmin(admin.ModelAdmin):
     fieldsets = (
-        (None, {"fields": ("number", "name", "task")}),
+        (None, {"fields": ("event", "number", "name", "task")}),
         (
             constants.TIMING_SK,
             {
@@ -24,56 +138,422 @@ class SiteAdmin(admin.ModelAdmin):
             },
         ),
     )
-    inlines = (eval_inlines.SiteVariantInline,)
+    inlines = (
+        eval_inlines.SiteVariantInline,
+        eval_inlines.SiteStatisticsInline,
+    )
+    list_display = ("__str__", "event", "get_station_entry")
+    list_filter = (filters.EventFilter,)
+
+    def has_change_permission(self, request, obj=None):
+        if obj and obj.event.is_finalized:
+            return False
+
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        # NOTE: without `obj` for the changelist action of the shown event.
+        event = obj.event if obj else utils.get_request_event(request)
+        if event.is_finalized:
+            return False
+
+        return super().has_delete_permission(request, obj)
+
+    def changelist_view(self, request, extra_context=None):
+        response = utils.check_active_event(request)
+        if response is not None:
+            return response
+
+        return super().changelist_view(request, extra_context)
+
+    def get_station_entry(self, obj):
+        if obj.event.is_finalized:
+            return constants.DISPLAY_NO_DATA
+
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse("admin:eval_result_station", args=[obj.pk]),
+            constants.STATION_ENTRY_SK,
+        )
+
+    get_station_entry.short_description = constants.STATION_ENTRY_SK
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+
+        # NOTE: disabled (not read-only) to keep unique number validation.
+        if obj and "event" in form.base_fields:
+            form.base_fields["event"].disabled = True
+
+        return form
+
+    def get_urls(self):
+        urls = [
+            path(
+                "statistics/",
+                self.admin_site.admin_view(self.statistics_view),
+                name="eval_site_statistics",
+            )
+        ]
+        return urls + super().get_urls()
+
+    def statistics_view(self, request):
+        """
+        Per site and variant statistics of the event as JSON.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        event = utils.get_request_event(request)
+        return JsonResponse(
+            {"event": str(event), "sites": stats.get_event_statistics(event)}
+        )
 
 
 class ResultAdmin(common.ResultSummaryBase, admin.ModelAdmin):
-    actions = ["recalculate_results", "export_as_csv"]
+    actions = ["recalculate_results", "export_as_csv", "export_as_npz"]
     inlines = [eval_inlines.SiteResultInline, eval_inlines.ResultSummaryInline]
-    list_per_page = 1000
+    # Standings are paginated by ranking, see `KeysetChangeList`.
+    keyset_fields = ("category_1_ordering", "category_2_ordering")
+    list_filter = (
+        filters.EventFilter,
+        filters.DisqualifiedFilter,
+        filters.MissedSitesFilter,
+    )
+    list_per_page = 100
+    list_select_related = ("summary",)
+    paginator = pagination.CachedCountPaginator
+    # NOTE: searched by `get_search_results`.
+    search_fields = ("team",)
+    show_full_result_count = False
 
     class Media:
         js = ("eval/js/admin/fieldEvents.js",)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        qs = qs.annotate(
-            missed_sites=Count("siteresult", filter=Q(siteresult__missed=True))
-        )
-        # 5 days in seconds --> artifical penalty for DSQ teams.
-        dsq = 60 * 60 * 24 * 5
-        qs = qs.annotate(
-            category_1_ordering=Case(
-                When(
-                    missed_sites__gte=constants.CATEGORY_1_MISSED_SITES_DSQ,
-                    then=F("summary__total_time") + dsq,
-                ),
-                default=F("summary__total_time"),
-            ),
-            category_2_ordering=Case(
-                When(
-                    missed_sites__gte=constants.CATEGORY_2_MISSED_SITES_DSQ,
-                    then=F("summary__total_penalty") + dsq,
-                ),
-                default=F("summary__total_penalty"),
-            ),
+        qs = utils.add_category_ordering_annotations(qs)
+        site_columns = columns.site_columns.get(
+            utils.get_request_event(request)
+        )
+        return qs.annotate(**site_columns.annotations)
+
+    def has_add_permission(self, request):
+        # NOTE: new results belong to the active event, see `get_form`.
+        event = models.get_active_event()
+        if event is None or event.is_finalized:
+            return False
+
+        return super().has_add_permission(request)
+
+    def has_change_permission(self, request, obj=None):
+        if obj and obj.event.is_finalized:
+            return False
+
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        # NOTE: without `obj` for the changelist action of the shown event.
+        event = obj.event if obj else utils.get_request_event(request)
+        if event.is_finalized:
+            return False
+
+        return super().has_delete_permission(request, obj)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Teams with a name word starting with the term, regardless of case and
+        diacritics; a range of the indexed search words, no full scan.
+        """
+        term = " ".join(models.get_search_name(search_term).split())
+        if not term:
+            return queryset, False
+
+        # NOTE: U+10FFFF sorts after any other character.
+        words = models.ResultSearchWord.objects.filter(
+            word__gte=term, word__lt=f"{term}\U0010ffff"
+        )
+        queryset = queryset.filter(pk__in=words.values("result"))
+        return queryset, False
+
+    def get_changelist(self, request, **kwargs):
+        return pagination.KeysetChangeList
+
+    def get_ordering(self, request):
+        return ("category_1_ordering",)
+
+    def get_facets(self, event):
+        """
+        Sidebar counts of the event as (title, [(label, count, url)]); read
+        from the cache until the next result change.
+        """
+        counts = caching.get_cached(
+            f"facets:{event.pk}", partial(stats.get_facet_counts, event)
+        )
+        disqualified = [
+            (
+                f"{constants.CATEGORY_SK} {category}",
+                counts["disqualified"][f"category_{category}"],
+                f"?event={event.pk}&dsq={category}",
+            )
+            for category in (1, 2)
+        ]
+        missed = [
+            (f"ST{number} {name}", count, None)
+            for number, name, count in counts["missed"]
+        ]
+        return [
+            (constants.DISQUALIFIED_SK, disqualified),
+            (constants.MISSED_SK, missed),
+        ]
+
+    def changelist_view(self, request, extra_context=None):
+        response = utils.check_active_event(request)
+        if response is not None:
+            return response
+
+        # Finalized events are served from the snapshot.
+        event = utils.get_request_event(request)
+        if event.is_finalized:
+            url = reverse("admin:eval_finalstanding_changelist")
+            return HttpResponseRedirect(f"{url}?event={event.pk}")
+
+        extra_context = dict(
+            extra_context or {}, facets=self.get_facets(event)
+        )
+        return super().changelist_view(request, extra_context)
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+
+        # Sites of the inline are given by the event; new results belong to
+        # the active one.
+        if "event" in form.base_fields:
+            form.base_fields["event"].disabled = True
+
+        return form
+
+    def render_change_form(
+        self, request, context, add=False, change=False, form_url="", obj=None
+    ):
+        # For the live penalty preview in `fieldEvents.js`.
+        event = obj.event if obj else models.get_active_event()
+        context["scoring_rules"] = utils.get_scoring_rules(event)
+        return super().render_change_form(
+            request, context, add, change, form_url, obj
         )
-        return utils.add_dynamic_get_site_ordering_annotations(qs)
 
     def get_list_display(self, request):
         list_display = list(super().get_list_display(request))
-        get_site_fields = utils.add_dynamic_get_site_field_methods(self)
+        site_columns = columns.site_columns.get(
+            utils.get_request_event(request)
+        )
 
-        list_display[1:1] = get_site_fields
+        list_display[1:1] = site_columns.list_display
         return list_display
 
+    def get_urls(self):
+        urls = [
+            path(
+                "export/",
+                self.admin_site.admin_view(self.export_view),
+                name="eval_result_export",
+            ),
+            path(
+                "site-result/<int:pk>/",
+                self.admin_site.admin_view(self.site_result_view),
+                name="eval_result_site_result",
+            ),
+            path(
+                "station/<int:site_pk>/",
+                self.admin_site.admin_view(self.station_view),
+                name="eval_result_station",
+            ),
+            path(
+                "station/<int:site_pk>/sync/",
+                self.admin_site.admin_view(self.station_sync_view),
+                name="eval_result_station_sync",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def _get_station_site(self, request, site_pk):
+        if not (
+            self.has_add_permission(request)
+            and self.has_change_permission(request)
+        ):
+            raise PermissionDenied
+
+        site = get_object_or_404(
+            models.Site.objects.select_related("event"), pk=site_pk
+        )
+        if site.event.is_finalized:
+            raise PermissionDenied
+
+        return site
+
+    def station_view(self, request, site_pk):
+        """
+        Entry page of a site's station; entries are queued in the browser
+        and synced by `station_sync_view`, see `stationEntry.js`.
+        """
+        site = self._get_station_site(request, site_pk)
+        entered = set(
+            site.siteresult_set.values_list("result_id", flat=True)
+        )
+        teams = models.Result.objects.filter(event=site.event).order_by(
+            "team"
+        )
+        variants = site.sitevariant_set.all()
+
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title=f"{constants.STATION_ENTRY_SK}: {site}",
+            site=site,
+            teams=[
+                (pk, team, pk in entered)
+                for pk, team in teams.values_list("pk", "team")
+            ],
+            variants=variants,
+            station={
+                "site": site.pk,
+                "storageKey": f"eval-station-{site.pk}",
+                "syncUrl": reverse(
+                    "admin:eval_result_station_sync", args=[site.pk]
+                ),
+                "batchSize": stations.MAX_BATCH_SIZE,
+                "labels": {
+                    "pending": constants.PENDING_SK,
+                    "synced": constants.SYNCED_SK,
+                    "rejected": constants.REJECTED_SK,
+                    "offline": constants.OFFLINE_SK,
+                    "edit": constants.EDIT_SK,
+                    "missed": constants.MISSED_SK,
+                },
+            },
+            scoring_rules=utils.get_scoring_rules(site.event),
+            TEAM_SK=constants.TEAM_SK,
+            VARIANT_SK=constants.VARIANT_SK,
+            MISSED_SK=constants.MISSED_SK,
+            TIME_SK=constants.TIME_SK,
+            RESULT_SK=constants.RESULT_SK,
+            STOP_TIME=constants.STOP_TIME,
+            PENALTY_SK=constants.PENALTY_SK,
+            QUEUE_SK=constants.QUEUE_SK,
+        )
+        return TemplateResponse(
+            request, "admin/eval/result/station.html", context
+        )
+
+    def station_sync_view(self, request, site_pk):
+        """
+        Applies a batch of station entries, `{"entries": [...]}`; returns
+        ids of the applied ones and field errors of the rejected ones.
+        """
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        site = self._get_station_site(request, site_pk)
+        try:
+            entries = json.loads(request.body.decode())["entries"]
+        except (ValueError, KeyError, TypeError):
+            return HttpResponseBadRequest("Invalid batch.")
+
+        if not isinstance(entries, list) or not all(
+            isinstance(entry, dict) for entry in entries
+        ):
+            return HttpResponseBadRequest("Invalid batch.")
+        if len(entries) > stations.MAX_BATCH_SIZE:
+            return HttpResponseBadRequest(
+                f"At most {stations.MAX_BATCH_SIZE} entries per batch."
+            )
+
+        try:
+            written = stations.apply_entries(site, entries)
+        except IntegrityError:
+            # The same entries synced concurrently; the retry gets them done.
+            return JsonResponse({"error": "Conflict, retry."}, status=409)
+
+        return JsonResponse(
+            {
+                # Already applied entries (a retry) are done as well.
+                "applied": written.applied + written.duplicates,
+                "errors": written.errors,
+            }
+        )
+
+    def export_view(self, request):
+        """
+        Export for the results publisher; `?since=<version>` returns only
+        teams changed (or deleted, position "-") after the version from
+        `X-Results-Version` header.
+        """
+        since_version = request.GET.get("since")
+        if since_version is not None:
+            try:
+                since_version = int(since_version)
+            except ValueError:
+                return HttpResponseBadRequest("Invalid 'since' version.")
+
+        event = utils.get_request_event(request)
+        if event.is_finalized:
+            return utils.export_final_results_as_csv(
+                event, "ig5-results", since_version=since_version
+            )
+
+        queryset = (
+            self.get_queryset(request)
+            .filter(event=event)
+            .order_by("category_1_ordering", "pk")
+        )
+        return utils.export_results_as_csv(
+            queryset, "ig5-results", event, since_version=since_version
+        )
+
+    def site_result_view(self, request, pk):
+        """
+        Breakdown columns of a site result for the compact inline.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        site_result = get_object_or_404(
+            models.SiteResult.objects.select_related(
+                "site", "variant", "summary"
+            ),
+            pk=pk,
+        )
+        if not hasattr(site_result, constants.SUMMARY):
+            raise Http404
+
+        return JsonResponse(
+            {
+                "get_penalty": utils.format_like_table(
+                    *utils.get_site_penalty_items(site_result)
+                ),
+                "get_time": utils.format_like_table(
+                    *utils.get_site_total_time_items(site_result)
+                ),
+            }
+        )
+
     def export_as_csv(self, request, queryset):
-        return utils.export_results_as_csv(queryset, "ig5-results")
+        return utils.export_results_as_csv(
+            queryset, "ig5-results", utils.get_request_event(request)
+        )
 
     export_as_csv.short_description = (
         f"Export selected {constants.RESULT_PLURAL_SK} as CSV"
     )
 
+    def export_as_npz(self, request, queryset):
+        return utils.export_results_as_npz(queryset, "ig5-results")
+
+    export_as_npz.short_description = (
+        f"Export selected {constants.RESULT_PLURAL_SK} as NumPy (.npz)"
+    )
+
     def recalculate_results(self, request, queryset):
         for result in queryset:
             for site_result in result.siteresult_set.all():
@@ -88,5 +568,7 @@ class ResultAdmin(common.ResultSummaryBase, admin.ModelAdmin):
 
 admin.site.site_header = "International Geodetic Pentathlon"
 admin.site.site_url = None
+admin.site.register(models.Event, EventAdmin)
+admin.site.register(models.FinalStanding, FinalStandingAdmin)
 admin.site.register(models.Site, SiteAdmin)
 admin.site.register(models.Result, ResultAdmin)
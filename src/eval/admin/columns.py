@@ -0,0 +1,84 @@
+"""
+Per site columns of the results changelist, built once per site catalogue
+(numbers and names of the event's sites) and shared read-only by all
+requests and threads until a site of the event changes.
+"""
+from collections import namedtuple
+import threading
+
+from django.db.models import OuterRef, Subquery
+
+from eval import caching
+from eval import models
+from eval.admin import utils
+
+
+SiteColumns = namedtuple("SiteColumns", ("list_display", "annotations"))
+
+
+class SiteColumn:
+    """
+    `list_display` callable of a site's total penalty; reads the
+    `site_<number>_ann` annotation, see `SiteColumns.annotations`.
+    """
+
+    def __init__(self, number, name):
+        self.annotation = f"site_{number}_ann"
+        # NOTE: used by the admin for the CSS class of the column.
+        self.__name__ = f"get_site_{number}"
+        self.short_description = f"ST {number}: {name}"
+        self.admin_order_field = self.annotation
+
+    @utils.display_no_data_on_exc
+    def __call__(self, obj):
+        return utils.format_seconds(getattr(obj, self.annotation))
+
+
+def build_site_columns(catalogue):
+    columns = tuple(SiteColumn(number, name) for number, name in catalogue)
+    annotations = {
+        column.annotation: Subquery(
+            models.SiteResult.objects.filter(
+                site__number=number, result=OuterRef("pk")
+            ).values_list("summary__total_penalty")
+        )
+        for column, (number, _) in zip(columns, catalogue)
+    }
+    return SiteColumns(columns, annotations)
+
+
+class SiteColumnRegistry:
+    """
+    Event pk --> `SiteColumns` of its current site catalogue, rebuilt when
+    the sites generation of the event changes (see `signals`); the entries
+    are never mutated, readers don't lock.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, event):
+        # NOTE: read before the catalogue, a concurrent change only costs
+        # another rebuild.
+        generation = caching.get_sites_generation(event.pk)
+        entry = self._entries.get(event.pk)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        catalogue = tuple(
+            models.Site.objects.filter(event=event)
+            .order_by("number")
+            .values_list("number", "name")
+        )
+        columns = build_site_columns(catalogue)
+        with self._lock:
+            # Copy on write; columns of a changed catalogue are replaced.
+            entries = dict(self._entries)
+            entries[event.pk] = (generation, columns)
+            self._entries = entries
+
+        return columns
+
+
+site_columns = SiteColumnRegistry()
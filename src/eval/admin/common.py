@@ -15,7 +15,7 @@ class ResultSummaryBase:
         "get_total_penalty",
         "get_total_time",
     )
-    exclude = ("route_time",)
+    exclude = ("route_time", "route_seconds")
 
     def _get_obj_attr(self, obj):
         if self.obj_attr:
@@ -24,13 +24,7 @@ class ResultSummaryBase:
         return obj
 
     def _get_missed_sites_count(self, obj):
-        # NOTE comes from annotation.
-        if hasattr(obj, "missed_sites"):
-            missed_sites = obj.missed_sites
-        else:
-            missed_sites = obj.siteresult_set.filter(missed=True).count()
-
-        return missed_sites
+        return obj.summary.missed_sites
 
     def _format_disqualified(self, formatted_seconds):
         return mark_safe(f"<span>{formatted_seconds} (DSQ)</span>")
@@ -39,11 +33,11 @@ class ResultSummaryBase:
         obj = self._get_obj_attr(obj)
 
         return utils.format_seconds(
-            obj.route_time.seconds, colorful=False, signed=False
+            obj.route_seconds, colorful=False, signed=False
         )
 
     get_route_time.short_description = constants.ROUTE_SK
-    get_route_time.admin_order_field = "route_time"
+    get_route_time.admin_order_field = "route_seconds"
 
     def get_total_stop_time(self, obj):
         obj = self._get_obj_attr(obj)
@@ -0,0 +1,113 @@
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.db.models import Q
+
+from eval import constants
+from eval import models
+from eval.admin import utils
+
+
+class EventFilter(admin.SimpleListFilter):
+    """
+    Always scoped to one event; the active one by default.
+    """
+
+    title = constants.EVENT_SK
+    parameter_name = "event"
+
+    def lookups(self, request, model_admin):
+        return [(event.pk, str(event)) for event in models.Event.objects.all()]
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.default = str(utils.get_request_event(request).pk)
+
+    def value(self):
+        return super().value() or self.default
+
+    def queryset(self, request, queryset):
+        return queryset.filter(event=self.value())
+
+    def choices(self, changelist):
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == str(lookup),
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: lookup}
+                ),
+                "display": title,
+            }
+
+
+def _missed_sites_below(count):
+    # NOTE: results without site results have no summary yet.
+    return Q(summary__missed_sites__lt=count) | Q(summary__isnull=True)
+
+
+class MissedSitesFilter(admin.SimpleListFilter):
+    """
+    By the stored (indexed) missed sites count of the summary.
+    """
+
+    title = constants.MISSED_SK
+    parameter_name = "missed_sites"
+
+    def lookups(self, request, model_admin):
+        counts = (
+            models.ResultSummary.objects.filter(
+                result__event=utils.get_request_event(request)
+            )
+            .order_by()
+            .values_list("missed_sites", flat=True)
+            .distinct()
+        )
+        return [(count, str(count)) for count in sorted({0, *counts})]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+
+        try:
+            count = int(self.value())
+        except ValueError:
+            raise IncorrectLookupParameters(f"Invalid count: {self.value()}.")
+
+        if count == 0:
+            return queryset.filter(_missed_sites_below(1))
+
+        return queryset.filter(summary__missed_sites=count)
+
+
+class DisqualifiedFilter(admin.SimpleListFilter):
+    """
+    Disqualified in a category by the stored missed sites count, see
+    `constants.CATEGORY_1_MISSED_SITES_DSQ`.
+    """
+
+    title = constants.DISQUALIFIED_SK
+    parameter_name = "dsq"
+
+    thresholds = {
+        "1": constants.CATEGORY_1_MISSED_SITES_DSQ,
+        "2": constants.CATEGORY_2_MISSED_SITES_DSQ,
+    }
+
+    def lookups(self, request, model_admin):
+        return [
+            ("1", f"{constants.CATEGORY_SK} 1"),
+            ("2", f"{constants.CATEGORY_SK} 2"),
+            ("no", constants.NOT_DISQUALIFIED_SK),
+        ]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == "no":
+            return queryset.filter(
+                _missed_sites_below(min(self.thresholds.values()))
+            )
+        if value in self.thresholds:
+            return queryset.filter(
+                summary__missed_sites__gte=self.thresholds[value]
+            )
+
+        return queryset
@@ -4,6 +4,7 @@ from django.utils.translation import gettext as _
 
 from eval import constants
 from eval import models
+from eval import stations
 from eval.admin import utils
 
 
@@ -33,36 +34,53 @@ class SiteResultlInlineFormSet(forms.models.BaseInlineFormSet):
 
     def __init__(self, *args, **kwargs):
         exists = kwargs["instance"].pk
+        event = kwargs["instance"].event
 
         # Preselect sites.
         if not exists:
-            kwargs["initial"] = utils.get_initial_site_pks()
+            kwargs["initial"] = utils.get_initial_site_pks(event)
 
         super().__init__(*args, **kwargs)
 
+        # NOTE: sites and variants are loaded at once for all forms; the
+        # querysets are used for validation only.
+        sites = models.Site.objects.filter(event=event)
+        site_choices = [(site.pk, str(site)) for site in sites]
+        variants = {}
+        for variant in models.SiteVariant.objects.filter(site__event=event):
+            variants.setdefault(variant.site_id, []).append(variant)
+
         # Filter variants per site.
         for index, form in enumerate(self.forms):
+            site = form.fields["site"]
+            site.queryset = sites
+            site.choices = [("", site.empty_label)] + site_choices
+
             if exists:
                 try:
                     site_pk = form.instance.site.pk
                 except models.SiteResult.site.RelatedObjectDoesNotExist:
                     # In case a new site was added after a result was created.
-                    site = models.Site.objects.get(number=index + 1)
-                    site_pk = site.pk
+                    site_pk = sites.get(number=index + 1).pk
                     form.initial["site"] = site_pk
             else:
                 site_pk = form.initial["site"]
 
-            qs = models.SiteVariant.objects.filter(site__pk=site_pk)
+            site_variants = variants.get(site_pk, [])
             variant = form.fields["variant"]
-            variant.queryset = qs
+            variant.queryset = models.SiteVariant.objects.filter(
+                site__pk=site_pk
+            )
+            variant.choices = [("", variant.empty_label)] + [
+                (site_variant.pk, str(site_variant))
+                for site_variant in site_variants
+            ]
 
             # Auto select if 0 or 1 variants are available.
-            qs_len = len(qs)
-            if qs_len <= 1:
+            if len(site_variants) <= 1:
                 variant.disabled = True
-            if qs_len == 1:
-                form.initial["variant"] = qs.first().pk
+            if len(site_variants) == 1:
+                form.initial["variant"] = site_variants[0].pk
 
     def clean(self):
         super().clean()
@@ -86,19 +104,9 @@ class SiteResultlInlineFormSet(forms.models.BaseInlineFormSet):
                     ),
                 )
             else:
-                if form_cleaned_data["missed"]:
-                    continue
-
-                field_errors = [(("time", "value"), _("Zadajte hodnotu."))]
-
-                if form_cleaned_data["site"].sitevariant_set.all():
-                    field_errors.append(
-                        (("variant",), _("Vyberte jednu z možností."))
-                    )
-
-                for fields, error in field_errors:
-                    for field in fields:
-                        if form_cleaned_data[field] is None:
-                            self.forms[index].add_error(
-                                field, ValidationError(error)
-                            )
+                errors = stations.get_entry_errors(
+                    form_cleaned_data,
+                    form_cleaned_data["site"].sitevariant_set.exists(),
+                )
+                for field, error in errors.items():
+                    self.forms[index].add_error(field, ValidationError(error))
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 from eval import constants
@@ -8,7 +10,23 @@ from eval.admin import formsets
 from eval.admin import utils
 
 
-class SiteVariantInline(admin.StackedInline):
+class FinalizedEventReadOnlyMixin:
+    def has_add_permission(self, request, obj=None):
+        # NOTE: a new parent belongs to the active event.
+        event = obj.event if obj else models.get_active_event()
+        if event is None or event.is_finalized:
+            return False
+
+        return super().has_add_permission(request, obj)
+
+    def has_change_permission(self, request, obj=None):
+        if obj and obj.event.is_finalized:
+            return False
+
+        return super().has_change_permission(request, obj)
+
+
+class SiteVariantInline(FinalizedEventReadOnlyMixin, admin.StackedInline):
     extra = 0
     formset = formsets.SiteVariantInlineFormSet
     model = models.SiteVariant
@@ -17,6 +35,89 @@ class SiteVariantInline(admin.StackedInline):
         return False
 
 
+class SiteStatisticsInline(admin.TabularInline):
+    model = models.SiteStatistics
+    fields = (
+        "variant",
+        "results_count",
+        "missed_count",
+        "get_time",
+        "get_deviation",
+        "get_outside_tolerance",
+        "get_outside_max_tolerance",
+        "get_over_time_limit_max",
+        "get_total_penalty_avg",
+    )
+    readonly_fields = fields
+    ordering = ("variant__name",)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def _format_share(self, obj, count):
+        if not obj.reported_count:
+            return constants.DISPLAY_NO_DATA
+
+        return f"{count} ({count / obj.reported_count:.0%})"
+
+    @utils.display_no_data_on_exc
+    def get_time(self, obj):
+        labels = [constants.AVERAGE_SK, "min", "max"]
+        values = [
+            utils.format_seconds(round(value), colorful=False, signed=False)
+            for value in (obj.time_avg, obj.time_min, obj.time_max)
+        ]
+        return utils.format_like_table(labels, values, distinguish_last=False)
+
+    get_time.short_description = constants.TIME_SK
+
+    @utils.display_no_data_on_exc
+    def get_deviation(self, obj):
+        labels = [constants.AVERAGE_SK, "&sigma;", "min", "max"]
+        values = [
+            f"{obj.deviation_avg:+.2f}",
+            f"{obj.deviation_std:.2f}",
+            f"{obj.deviation_min:+.2f}",
+            f"{obj.deviation_max:+.2f}",
+        ]
+        return utils.format_like_table(labels, values, distinguish_last=False)
+
+    get_deviation.short_description = constants.DEVIATION_SK
+
+    def get_outside_tolerance(self, obj):
+        return self._format_share(obj, obj.outside_tolerance_count)
+
+    get_outside_tolerance.short_description = constants.OUTSIDE_TOLERANCE_SK
+
+    def get_outside_max_tolerance(self, obj):
+        return self._format_share(obj, obj.outside_max_tolerance_count)
+
+    get_outside_max_tolerance.short_description = (
+        constants.OUTSIDE_MAX_TOLERANCE_SK
+    )
+
+    def get_over_time_limit_max(self, obj):
+        return self._format_share(obj, obj.over_time_limit_max_count)
+
+    get_over_time_limit_max.short_description = (
+        constants.OVER_TIME_LIMIT_MAX_SK
+    )
+
+    @utils.display_no_data_on_exc
+    def get_total_penalty_avg(self, obj):
+        return utils.format_seconds(round(obj.total_penalty_avg))
+
+    get_total_penalty_avg.short_description = (
+        f"{constants.PENALTY_SK} ({constants.AVERAGE_SK.lower()})"
+    )
+
+
 class ResultSummaryInline(common.ResultSummaryBase, admin.TabularInline):
     obj_attr = "result"
 
@@ -28,7 +129,7 @@ class ResultSummaryInline(common.ResultSummaryBase, admin.TabularInline):
         return False
 
 
-class SiteResultInline(admin.TabularInline):
+class SiteResultInline(FinalizedEventReadOnlyMixin, admin.TabularInline):
     fields = (
         "site",
         "variant",
@@ -44,9 +145,23 @@ class SiteResultInline(admin.TabularInline):
     model = models.SiteResult
     ordering = ("site__number",)
     readonly_fields = ("get_penalty", "get_time")
+    # Set per request in `get_formset` (inlines are instantiated per request).
+    compact = False
+
+    class Media:
+        js = ("eval/js/admin/siteResultDetails.js",)
+
+    def get_queryset(self, request):
+        # Breakdown columns are rendered from the stored summary.
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("result", "site", "variant", "summary")
+        )
 
     def get_extra(self, request, obj=None, **kwargs):
-        return len(utils.get_initial_site_pks())
+        event = obj.event if obj else models.get_active_event()
+        return len(utils.get_initial_site_pks(event))
 
     def get_max_num(self, request, obj=None, **kwargs):
         return self.get_extra(request, obj, **kwargs)
@@ -54,8 +169,25 @@ class SiteResultInline(admin.TabularInline):
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def is_compact(self, request, obj=None):
+        """
+        Compact rows show totals only, breakdowns are loaded on demand;
+        `?compact=0|1` overrides the default given by the number of sites.
+        """
+        compact = request.GET.get("compact")
+        if compact is not None:
+            return compact == "1"
+
+        sites_count = self.get_extra(request, obj)
+        return sites_count >= constants.COMPACT_SITE_RESULTS_MIN_SITES
+
     def get_formset(self, request, obj=None, **kwargs):
         formset = super().get_formset(request, obj, **kwargs)
+        self.compact = self.is_compact(request, obj)
+
+        # Read-only.
+        if not formset.form.base_fields:
+            return formset
 
         time_placeholder = "hh:mm:ss"
         for field in ("stop_time_start", "stop_time_end"):
@@ -77,35 +209,23 @@ class SiteResultInline(admin.TabularInline):
 
     @utils.display_no_data_on_exc
     def get_penalty(self, obj):
-        labels = [
-            constants.SPEED_SK,
-            constants.PRECISION_SK,
-            constants.TOTAL_SK,
-        ]
-        values = [
-            utils.format_seconds(obj.summary.time_penalty),
-            utils.format_seconds(obj.summary.precision_penalty),
-            utils.format_seconds(obj.summary.total_penalty),
-        ]
-
-        # Add info about missed penalty.
-        if obj.missed:
-            labels.insert(2, constants.MISSED_SK)
-            values.insert(2, utils.format_seconds(obj.missed_penalty))
-        # Add info about penalty correction.
-        elif obj.total_penalty_correction:
-            labels.insert(2, constants.CORRECTION_SK)
-            values.insert(
-                2, utils.format_seconds(obj.total_penalty_correction)
+        if self.compact:
+            return format_html(
+                '{}<br><a href="{}" class="site-result-details">{}</a>',
+                utils.format_seconds(obj.summary.total_penalty),
+                reverse("admin:eval_result_site_result", args=[obj.pk]),
+                constants.DETAILS_SK,
             )
 
-        return utils.format_like_table(labels, values)
+        return utils.format_like_table(*utils.get_site_penalty_items(obj))
 
     get_penalty.short_description = constants.PENALTY_SK
 
     @utils.display_no_data_on_exc
     def get_time(self, obj):
-        labels, values = utils.get_site_total_time_items(obj)
-        return utils.format_like_table(labels, values)
+        if self.compact:
+            return utils.format_seconds(obj.summary.total_time)
+
+        return utils.format_like_table(*utils.get_site_total_time_items(obj))
 
     get_time.short_description = mark_safe("&Sigma;")
@@ -0,0 +1,117 @@
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+from eval import caching
+from eval import constants
+
+
+CURSOR_VAR = "after"
+
+
+class CachedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return caching.get_cached_count(self.object_list)
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist ordered by one of model admin's `keyset_fields` (ascending)
+    is paginated by `?after=<value>:<pk>` of the last shown row
+    instead of OFFSET; other orderings fall back to numbered pages.
+    """
+
+    first_page_label = constants.FIRST_PAGE_SK
+    next_page_label = constants.NEXT_PAGE_SK
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = self.parse_cursor(request.GET.get(CURSOR_VAR))
+        self.keyset_field = None
+        super().__init__(request, *args, **kwargs)
+        self.params.pop(CURSOR_VAR, None)
+
+    @staticmethod
+    def parse_cursor(cursor):
+        if cursor is None:
+            return None
+
+        try:
+            value, pk = cursor.split(":")
+            return (None if value == "" else int(value)), int(pk)
+        except ValueError:
+            raise IncorrectLookupParameters(f"Invalid cursor: {cursor}.")
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+
+        # NOTE: ties are broken by pk only, as in the standings.
+        field = ordering[0]
+        if field in getattr(self.model_admin, "keyset_fields", ()):
+            self.keyset_field = field
+            # NOTE: explicit NULLs position (differs per database), results
+            # without summaries come first.
+            return [F(field).asc(nulls_first=True), "pk"]
+
+        return ordering
+
+    def get_keyset_filter(self):
+        value, pk = self.cursor
+        field = self.keyset_field
+
+        if value is None:
+            return Q(**{f"{field}__isnull": False}) | Q(
+                **{f"{field}__isnull": True, "pk__gt": pk}
+            )
+
+        return Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+
+    def get_results(self, request):
+        if self.keyset_field is None:
+            if self.cursor:
+                raise IncorrectLookupParameters("Cursor requires a ranking.")
+
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        queryset = self.queryset
+        if self.cursor:
+            queryset = queryset.filter(self.get_keyset_filter())
+
+        # One more row tells whether there's a next page.
+        result_list = list(queryset[: self.list_per_page + 1])
+        has_next = len(result_list) > self.list_per_page
+        result_list = result_list[: self.list_per_page]
+
+        self.next_cursor = None
+        if has_next:
+            last = result_list[-1]
+            value = getattr(last, self.keyset_field)
+            self.next_cursor = f"{'' if value is None else value}:{last.pk}"
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_next or self.cursor is not None
+        self.paginator = paginator
+
+    def get_first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+    def get_next_page_url(self):
+        if self.next_cursor is None:
+            return None
+
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
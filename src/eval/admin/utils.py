@@ -1,23 +1,59 @@
 import csv
 from datetime import timedelta
-import types
+import tempfile
 
-from django.db.models import OuterRef, Subquery
-from django.http import HttpResponse
+from django.contrib import messages
+from django.db.models import F
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.urls import reverse
 from django.utils.safestring import mark_safe
 
+from eval import columnar
 from eval import models
 from eval import constants
+from eval.snapshot import SITE_FIELDS, VARIANT_FIELDS
 
 
-def get_initial_site_pks():
-    return [
-        {"site": pk} for pk in models.Site.objects.values_list("pk", flat=True)
-    ]
+def get_request_event(request, fallback=True):
+    """
+    The `?event=<pk>` event, the active one by default; without an active
+    event the latest one if `fallback` (to show), else `None`.
+    """
+    try:
+        return models.Event.objects.get(pk=request.GET["event"])
+    except (KeyError, ValueError, models.Event.DoesNotExist):
+        pass
+
+    event = models.get_active_event()
+    if event is None and fallback:
+        event = models.Event.objects.first()
+
+    return event
+
 
+def check_active_event(request):
+    """
+    Warns if no event is active; returns a redirect to the events if there
+    is none at all (nothing to show).
+    """
+    if models.get_active_event() is not None:
+        return None
 
-def get_site_numbers():
-    return models.Site.objects.values_list("number", flat=True)
+    if not models.Event.objects.exists():
+        messages.warning(request, constants.NO_EVENT_SK)
+        return HttpResponseRedirect(reverse("admin:eval_event_changelist"))
+
+    messages.warning(request, constants.NO_ACTIVE_EVENT_SK)
+    return None
+
+
+def get_initial_site_pks(event):
+    return [
+        {"site": pk}
+        for pk in models.Site.objects.filter(event=event).values_list(
+            "pk", flat=True
+        )
+    ]
 
 
 def format_seconds(
@@ -82,78 +118,115 @@ def display_no_data_on_exc(f):
     return wrapper
 
 
-def add_dynamic_get_site_ordering_annotations(qs):
-    # Dynamic `get_site_*` ordering annotation prep.
-    for site_number in get_site_numbers():
-        annotation_name = f"site_{site_number}_ann"
-        annotation = {
-            annotation_name: Subquery(
-                models.SiteResult.objects.filter(
-                    site__number=site_number, result=OuterRef("pk")
-                ).values_list("summary__total_penalty")
-            )
-        }
-        qs = qs.annotate(**annotation)
+def add_category_ordering_annotations(qs):
+    # NOTE: precomputed by `ResultSummary.save`; `None` without a summary.
+    return qs.annotate(
+        category_1_ordering=F("summary__category_1_ordering"),
+        category_2_ordering=F("summary__category_2_ordering"),
+    )
+
 
-    return qs
+def get_scoring_rules(event):
+    """
+    Scoring parameters of the event's sites for the live penalty preview in
+    `fieldEvents.js`; site pk --> site fields and variant pk --> variant
+    fields.
+    """
+    sites = {
+        values.pop("id"): dict(values, variants={})
+        for values in models.Site.objects.filter(event=event).values(
+            "id", *SITE_FIELDS
+        )
+    }
+    variants = models.SiteVariant.objects.filter(site__event=event)
+    for values in variants.values("id", "site_id", *VARIANT_FIELDS):
+        sites[values.pop("site_id")]["variants"][values.pop("id")] = values
+
+    return {
+        "task_correct_answers": models.TASK_EVAL_CORRECT_ANSWERS,
+        "labels": {
+            "speed": constants.SPEED_SK,
+            "precision": constants.PRECISION_SK,
+            "missed": constants.MISSED_SK,
+            "correction": constants.CORRECTION_SK,
+            "total": constants.TOTAL_SK,
+            "preview": constants.PREVIEW_SK,
+        },
+        "sites": sites,
+    }
 
 
-def get_site_total_time_items(obj, apply_formatting=True):
-    labels = [constants.STOP_TIME, constants.PENALTY_SK, constants.TOTAL_SK]
+def get_site_penalty_items(obj, apply_formatting=True):
+    labels = [constants.SPEED_SK, constants.PRECISION_SK, constants.TOTAL_SK]
 
     values = [
-        obj.summary.stop_time,
+        obj.summary.time_penalty,
+        obj.summary.precision_penalty,
         obj.summary.total_penalty,
-        obj.summary.total_time,
     ]
 
+    # Add info about missed penalty.
+    if obj.missed:
+        labels.insert(2, constants.MISSED_SK)
+        values.insert(2, obj.missed_penalty)
+    # Add info about penalty correction; the only value not stored in the
+    # summary, scored from the already loaded site and variant.
+    elif obj.total_penalty_correction:
+        labels.insert(2, constants.CORRECTION_SK)
+        values.insert(2, obj.total_penalty_correction)
+
     if apply_formatting:
         values = [format_seconds(value) for value in values]
 
     return labels, values
 
 
-def get_site_factory(self):
-    @display_no_data_on_exc
-    def get_site(self, obj):
-        site_number = get_site.__name__[-1]
-        obj = obj.siteresult_set.get(result=obj, site__number=site_number)
-        return format_seconds(obj.summary.total_penalty)
-
-    return get_site
-
-
-def add_dynamic_get_site_field_methods(self):
-    # Dynamic `get_site_*` fields prep.
-    dynamic_get_site_fields = []
-
-    for number, name in models.Site.objects.values_list("number", "name"):
-        method_name = f"get_site_{number}"
+def get_site_total_time_items(obj, apply_formatting=True):
+    labels = [constants.STOP_TIME, constants.PENALTY_SK, constants.TOTAL_SK]
 
-        get_site = get_site_factory(self)
-        get_site.__name__ = method_name
-        get_site.short_description = f"ST {number}: {name}"
-        get_site.admin_order_field = f"site_{number}_ann"
+    values = [
+        obj.summary.stop_time,
+        obj.summary.total_penalty,
+        obj.summary.total_time,
+    ]
 
-        setattr(self, method_name, types.MethodType(get_site, self))
-        dynamic_get_site_fields.append(method_name)
+    if apply_formatting:
+        values = [format_seconds(value) for value in values]
 
-    return dynamic_get_site_fields
+    return labels, values
 
 
-def export_results_as_csv(queryset, export_name):
+def export_results_as_csv(queryset, export_name, event, since_version=None):
+    """
+    With `since_version` only teams whose summary changed after that version
+    are exported, followed by the teams deleted since (position "-");
+    positions are still taken from the whole queryset.
+    """
     ARTIFICIAL_TIME_OFFSET = 43200  # 12 hours
+    SITE_COLUMNS_COUNT = 10
     CAT1 = f"ΣΣ ({constants.CATEGORY_SK} 1)"
     CAT2 = f"Σ {constants.PENALTY_SK} ({constants.CATEGORY_SK} 2)"
     CAT_2_OFFSETTED = f"{CAT2} {constants.OFFSET_SK}"
 
     fields = [constants.ORDER_SK, constants.TEAM_SK]
 
+    # NOTE: read before the rows, so no change falls between two exports.
+    latest_version = models.get_latest_summary_version()
+
+    positions = None
+    if since_version is not None:
+        ordered_pks = queryset.values_list("pk", flat=True)
+        positions = {
+            pk: position for position, pk in enumerate(ordered_pks, start=1)
+        }
+        queryset = queryset.filter(summary__version__gt=since_version)
+
+    sites = list(models.Site.objects.filter(event=event).order_by("number"))
     siteresult_fields = []
-    for siteresut in queryset.first().siteresult_set.all():
+    for site in sites:
         siteresult_fields.extend(
             [
-                f"ST{siteresut.site.number} {siteresut.site.name}",
+                f"ST{site.number} {site.name}",
                 constants.TIME_SK,
                 constants.STOP_TIME,
                 constants.VARIANT_SK,
@@ -179,6 +252,7 @@ def export_results_as_csv(queryset, export_name):
 
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = f"attachment; filename={export_name}.csv"
+    response["X-Results-Version"] = latest_version
 
     writer = csv.writer(response)
     writer.writerow(fields)
@@ -193,14 +267,28 @@ def export_results_as_csv(queryset, export_name):
     indexes_to_convert = [index for index, field in enumerate(fields) if field in fields_to_convert]
 
     for final_position, obj in enumerate(queryset, start=1):
+        if positions is not None:
+            final_position = positions[obj.pk]
         values = [f"{final_position}.", obj.team]
 
         siteresult_values = []
-        for siteresut in obj.siteresult_set.all():
+        siteresults = {
+            siteresult.site_id: siteresult
+            for siteresult in obj.siteresult_set.select_related(
+                "site", "variant", "summary"
+            )
+        }
+        for site in sites:
+            siteresut = siteresults.get(site.pk)
+            # NOTE: sites without a result stay empty, columns don't shift.
+            if siteresut is None:
+                siteresult_values.extend([""] * SITE_COLUMNS_COUNT)
+                continue
+
             siteresult_values.extend(
                 [
                     "",
-                    siteresut.time,
+                    siteresut.time_seconds,
                     siteresut.stop_time,
                     siteresut.variant.name if siteresut.variant else "",
                     siteresut.variant.reference_value if siteresut.variant else "",
@@ -215,7 +303,7 @@ def export_results_as_csv(queryset, export_name):
         values.extend(
             [
                 "",
-                obj.route_time,
+                obj.route_seconds,
                 obj.summary.stop_time,
                 obj.summary.total_penalty,
                 ARTIFICIAL_TIME_OFFSET + obj.summary.total_penalty,
@@ -241,4 +329,116 @@ def export_results_as_csv(queryset, export_name):
 
         writer.writerow(values)
 
+    # Deleted teams (and not added again) as "-" rows.
+    if since_version is not None:
+        deleted = (
+            models.DeletedResult.objects.filter(
+                event_pk=event.pk, version__gt=since_version
+            )
+            .exclude(
+                team__in=models.Result.objects.filter(event=event).values(
+                    "team"
+                )
+            )
+            .order_by("team")
+            .values_list("team", flat=True)
+            .distinct()
+        )
+        for team in deleted:
+            empty = [""] * (len(fields) - 2)
+            writer.writerow([constants.DISPLAY_NO_DATA, team, *empty])
+
+    return response
+
+
+def export_final_results_as_csv(event, export_name, since_version=None):
+    """
+    Export stored when the event was finalized; nothing changes afterwards.
+    """
+    content = event.final_export
+    if since_version is not None:
+        # Header only.
+        content = content.splitlines(keepends=True)[0]
+
+    response = HttpResponse(content, content_type="text/csv")
+    response["Content-Disposition"] = f"attachment; filename={export_name}.csv"
+    response["X-Results-Version"] = models.get_latest_summary_version()
     return response
+
+
+def export_results_as_npz(queryset, export_name):
+    """
+    Typed columnar export; one row per team x site, times and penalties in
+    integer seconds, measured values as floats (`nan` if not filled in).
+    """
+    text = columnar.text(50)
+    writer = columnar.NpzWriter(
+        [
+            ("position", columnar.INT),
+            ("team", text),
+            ("site_number", columnar.INT),
+            ("site_name", text),
+            ("variant", text),
+            ("missed", columnar.BOOL),
+            ("time", columnar.INT),
+            ("stop_time", columnar.INT),
+            ("reference_value", columnar.FLOAT),
+            ("value", columnar.FLOAT),
+            ("time_penalty", columnar.INT),
+            ("precision_penalty", columnar.INT),
+            ("correction", columnar.INT),
+            ("site_total_penalty", columnar.INT),
+            ("site_total_time", columnar.INT),
+            ("route_time", columnar.INT),
+            ("total_stop_time", columnar.INT),
+            ("total_penalty", columnar.INT),
+            ("total_time", columnar.INT),
+        ]
+    )
+
+    positions = {
+        pk: position
+        for position, pk in enumerate(
+            queryset.values_list("pk", flat=True), start=1
+        )
+    }
+    siteresults = (
+        models.SiteResult.objects.filter(result__pk__in=positions)
+        .select_related("site", "variant", "summary", "result__summary")
+        .order_by("result", "site__number")
+    )
+    nan = float("nan")
+
+    for siteresult in siteresults.iterator():
+        result = siteresult.result
+        variant = siteresult.variant
+        writer.writerow(
+            [
+                positions[result.pk],
+                result.team,
+                siteresult.site.number,
+                siteresult.site.name,
+                variant.name if variant else "",
+                siteresult.missed,
+                siteresult.time_seconds or 0,
+                siteresult.stop_time,
+                variant.reference_value if variant else nan,
+                nan if siteresult.value is None else siteresult.value,
+                siteresult.summary.time_penalty,
+                siteresult.summary.precision_penalty,
+                siteresult.total_penalty_correction,
+                siteresult.summary.total_penalty,
+                siteresult.summary.total_time,
+                result.route_seconds,
+                result.summary.stop_time,
+                result.summary.total_penalty,
+                result.summary.total_time,
+            ]
+        )
+
+    return FileResponse(
+        writer.write(tempfile.TemporaryFile()),
+        as_attachment=True,
+        filename=f"{export_name}.npz",
+        content_type="application/octet-stream",
+    )
@@ -0,0 +1,130 @@
+import json
+
+
+from eval import models
+from eval.admin import utils
+from eval.sandbox import rank_standings
+from ig5_site.sqlite3.transaction import atomic_write
+
+
+STANDING_FIELDS = (
+    "team",
+    "category_1_rank",
+    "category_2_rank",
+    "missed_sites",
+    "route_time",
+    "stop_time",
+    "total_penalty",
+    "total_time",
+    "sites",
+)
+
+
+def _get_site_breakdowns(event):
+    breakdowns = {}
+    site_results = (
+        models.SiteResult.objects.filter(result__event=event)
+        .select_related("site", "variant", "summary")
+        .order_by("site__number")
+    )
+    for site_result in site_results:
+        summary = site_result.summary
+        breakdowns.setdefault(site_result.result_id, []).append(
+            {
+                "site": site_result.site.number,
+                "name": site_result.site.name,
+                "variant": site_result.variant.name
+                if site_result.variant
+                else "",
+                "missed": site_result.missed,
+                "time": site_result.time_seconds,
+                "value": site_result.value,
+                "stop_time": summary.stop_time,
+                "time_penalty": summary.time_penalty,
+                "precision_penalty": summary.precision_penalty,
+                "correction": site_result.total_penalty_correction,
+                "total_penalty": summary.total_penalty,
+                "total_time": summary.total_time,
+            }
+        )
+
+    return breakdowns
+
+
+def _get_live_standings(event):
+    rows = models.Result.objects.filter(event=event).values_list(
+        "pk",
+        "team",
+        "route_seconds",
+        "summary__stop_time",
+        "summary__total_time",
+        "summary__total_penalty",
+        "summary__missed_sites",
+    )
+    route_times = {}
+    stop_times = {}
+    totals = {}
+    for pk, team, route_seconds, stop_time, *scores in rows:
+        total_time, total_penalty, missed_sites = scores
+        route_times[pk] = route_seconds
+        # Teams without site results have no summary.
+        stop_times[pk] = stop_time or 0
+        totals[pk] = (
+            team,
+            total_time or 0,
+            total_penalty or 0,
+            missed_sites or 0,
+        )
+
+    breakdowns = _get_site_breakdowns(event)
+    return [
+        dict(
+            standing._asdict(),
+            route_time=route_times[pk],
+            stop_time=stop_times[pk],
+            sites=breakdowns.get(pk, []),
+        )
+        for pk, standing in rank_standings(totals).items()
+    ]
+
+
+def get_standings(event):
+    """
+    Standings of the event by category 1 rank, dicts of `FinalStanding`
+    fields with a list of per-site breakdowns; the snapshot once finalized.
+    """
+    if not event.is_finalized:
+        return _get_live_standings(event)
+
+    return [
+        dict(values, sites=json.loads(values["sites"]))
+        for values in event.final_standings.values(*STANDING_FIELDS)
+    ]
+
+
+@atomic_write()
+def finalize(event):
+    """
+    Snapshots the stored standings, per-site breakdowns and the CSV export of
+    the event; it is never recomputed afterwards.
+    """
+    if event.is_finalized:
+        raise ValueError(f"Event '{event}' is already finalized.")
+
+    models.FinalStanding.objects.bulk_create(
+        models.FinalStanding(
+            event=event,
+            **dict(standing, sites=json.dumps(standing["sites"])),
+        )
+        for standing in _get_live_standings(event)
+    )
+
+    queryset = utils.add_category_ordering_annotations(
+        models.Result.objects.filter(event=event)
+    )
+    export = utils.export_results_as_csv(
+        queryset.order_by("category_1_ordering", "pk"), "ig5-results", event
+    )
+    event.final_export = export.content.decode()
+    event.is_finalized = True
+    event.save()
@@ -0,0 +1,69 @@
+"""
+Cached queryset and facet counts for the admin, and the generation of each
+event's sites (see `columns.SiteColumnRegistry`). All counts are dropped at
+once on any result change. The production settings share the cache among
+the worker processes; with the default (local memory) cache each process
+has its own, so other processes see a change only after
+`COUNT_CACHE_TIMEOUT` (counts) or a restart (site columns).
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from eval import constants
+
+
+GENERATION_KEY = "eval:counts:generation"
+SITES_GENERATION_KEY = "eval:sites:generation:{}"
+
+
+def _new_generation():
+    # NOTE: not 1, so an evicted generation never revives old counts.
+    return int(time.time() * 1000)
+
+
+def get_generation(key=GENERATION_KEY):
+    return cache.get_or_set(key, _new_generation, None)
+
+
+def _invalidate(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), None)
+
+
+def invalidate_counts():
+    _invalidate(GENERATION_KEY)
+
+
+def get_sites_generation(event_pk):
+    """
+    Changes with the sites of the event; see `columns.SiteColumnRegistry`.
+    """
+    return get_generation(SITES_GENERATION_KEY.format(event_pk))
+
+
+def invalidate_sites(event_pk):
+    _invalidate(SITES_GENERATION_KEY.format(event_pk))
+
+
+def get_cached(name, compute):
+    """
+    Value of `compute()` cached until the next result change.
+    """
+    key = f"eval:counts:{get_generation()}:{name}"
+
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, constants.COUNT_CACHE_TIMEOUT)
+
+    return value
+
+
+def get_cached_count(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql} {params}".encode()).hexdigest()
+    return get_cached(digest, queryset.count)
@@ -0,0 +1,95 @@
+import shutil
+import struct
+import tempfile
+import zipfile
+
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_ALIGNMENT = 64
+
+# Column types (`.npy` descr).
+INT = "<i8"
+FLOAT = "<f8"
+BOOL = "|b1"
+
+STRUCT_FORMATS = {INT: "q", FLOAT: "d", BOOL: "?"}
+
+
+def text(width):
+    return f"<U{width}"
+
+
+def _get_itemsize(descr):
+    if descr in STRUCT_FORMATS:
+        return struct.calcsize(STRUCT_FORMATS[descr])
+
+    # Unicode strings are stored as fixed width UTF-32.
+    return int(descr[2:]) * 4
+
+
+def _pack(descr, values):
+    if descr in STRUCT_FORMATS:
+        return struct.pack(f"<{len(values)}{STRUCT_FORMATS[descr]}", *values)
+
+    itemsize = _get_itemsize(descr)
+    return b"".join(
+        value.encode("utf-32-le")[:itemsize].ljust(itemsize, b"\0")
+        for value in values
+    )
+
+
+def _get_npy_header(descr, length):
+    header = (
+        f"{{'descr': '{descr}', 'fortran_order': False, "
+        f"'shape': ({length},), }}"
+    )
+    # Magic (8) + header length (2) + header + newline, 64 bytes aligned.
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % NPY_ALIGNMENT
+    header = (header + " " * padding + "\n").encode("latin1")
+
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+class NpzWriter:
+    """
+    Streams rows into one spooled column per field and writes them as an
+    uncompressed `.npz` archive (`numpy.load` compatible) - memory usage does
+    not grow with the number of rows.
+    """
+
+    buffer_size = 1024
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.length = 0
+        self._buffers = [[] for _ in self.columns]
+        self._files = [tempfile.TemporaryFile() for _ in self.columns]
+
+    def writerow(self, row):
+        for buffer, value in zip(self._buffers, row):
+            buffer.append(value)
+
+        self.length += 1
+        if self.length % self.buffer_size == 0:
+            self._flush()
+
+    def _flush(self):
+        for (_, descr), buffer, file in zip(
+            self.columns, self._buffers, self._files
+        ):
+            file.write(_pack(descr, buffer))
+            buffer.clear()
+
+    def write(self, fileobj):
+        self._flush()
+
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_STORED) as archive:
+            for (name, descr), file in zip(self.columns, self._files):
+                file.seek(0)
+                with archive.open(f"{name}.npy", "w") as member:
+                    member.write(_get_npy_header(descr, self.length))
+                    shutil.copyfileobj(file, member)
+                file.close()
+
+        fileobj.seek(0)
+        return fileobj
@@ -3,35 +3,71 @@ from django.utils.translation import gettext as _
 # Disqualification rules based on missed sites count.
 CATEGORY_1_MISSED_SITES_DSQ = 1
 CATEGORY_2_MISSED_SITES_DSQ = 2
+# 5 days in seconds --> artifical penalty for DSQ teams.
+DSQ_ORDERING_PENALTY = 60 * 60 * 24 * 5
+# Result change page loads per-site breakdowns on demand from this many sites.
+COMPACT_SITE_RESULTS_MIN_SITES = 20
+# Seconds; admin changelist counts are cached, see `eval.caching`.
+COUNT_CACHE_TIMEOUT = 60
 
 # Wording.
+AVERAGE_SK = _("Priemer")
 CATEGORY_SK = _("Kategória")
 CORRECTION_SK = _("Korekcia")
+DETAILS_SK = _("Detaily")
+DEVIATION_SK = _("Odchýlka")
 DISPLAY_NO_DATA = "-"
+DISQUALIFIED_SK = _("Diskvalifikácia")
+EDIT_SK = _("Upraviť")
+EVENT_SK = _("Podujatie")
+EVENT_PLURAL_SK = _("Podujatia")
+FINAL_STANDING_SK = _("Konečné poradie")
+FINAL_STANDING_PLURAL_SK = _("Konečné poradia")
 FINISH_SK = _("Cieľ")
+FIRST_PAGE_SK = _("Prvá strana")
 MEASSURED_VALUE_SK = _("Nameraná hodnota")
 MISSED_SK = _("Vynechané")
 NAME_SK = _("Názov")
+NEXT_PAGE_SK = _("Ďalšia strana")
+NOT_DISQUALIFIED_SK = _("Bez diskvalifikácie")
+NO_ACTIVE_EVENT_SK = _(
+    "Žiadne podujatie nie je aktívne, zobrazuje sa posledné; výsledky možno "
+    "pridávať až po aktivovaní podujatia."
+)
+NO_EVENT_SK = _("Zatiaľ nie je žiadne podujatie, najprv ho pridajte.")
+OFFLINE_SK = _("Bez pripojenia")
 OFFSET_SK = _("Odsadené")
 ORDER_SK = _("Poradie")
+OUTSIDE_MAX_TOLERANCE_SK = _("Nad maximálnu povolenú odchýlku")
+OUTSIDE_TOLERANCE_SK = _("Nad povolenú odchýlku")
+OVER_TIME_LIMIT_MAX_SK = _("Nad maximálny časový limit")
 PENALTY_SK = _("Penalizácia")
+PENDING_SK = _("Čaká na odoslanie")
 POINTS_COUNT_SK = _("Počet bodov")
+PREVIEW_SK = _("Náhľad")
 PRECISION_SK = _("Presnosť")
+QUEUE_SK = _("Zaradiť")
 RESULT_SK = _("Výsledok")
 REFERENCE_VALUE_SK = _("Referenčná hodnota")
 RESULT_PLURAL_SK = _("Výsledky")
+REJECTED_SK = _("Zamietnuté")
 ROUTE_SK = _("Trasa")
 SITE_SK = _("Stanovisko")
 SITE_PLURAL_SK = _("Stanoviská")
 SPEED_SK = _("Rýchlosť")
+STATISTICS_SK = _("Štatistika")
+STATISTICS_PLURAL_SK = _("Štatistiky")
+STATION_ENTRY_SK = _("Zadávanie na stanovisku")
 STOP_TIME = "Stop time"
 START_SK = _("Štart")
 SUMMARY = "summary"
 SUMMARY_SK = _("Zhrnutie")
+SYNCED_SK = _("Odoslané")
 TEAM_SK = _("Tým")
 TIME_SK = _("Čas")
 TIMING_SK = _("Časovanie")
 TOTAL_SK = _("Spolu")
+UPDATED_SK = _("Aktualizované")
 VARIANT_SK = _("Varianta")
 
 
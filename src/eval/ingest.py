@@ -0,0 +1,75 @@
+"""
+Bulk ingest of site results pushed by devices (timing chip readers,
+tablets): records name the site by number, the team and the variant by
+name, and carry an idempotency `key`; see `ingest`.
+"""
+from django.utils.translation import gettext as _
+
+from eval import models
+from eval import stations
+from ig5_site.sqlite3.transaction import atomic_write
+
+
+# Records per request.
+MAX_RECORDS = 1000
+
+
+def _get_entry(record, results, variants):
+    entry = {field: record.get(field) for field in stations.ENTRY_FIELDS}
+    entry["id"] = record.get("key")
+
+    team = record.get("team")
+    entry["result"] = results.get(team) if isinstance(team, str) else None
+    # NOTE: unknown names are left to the form's validation.
+    variant = record.get("variant")
+    if isinstance(variant, str):
+        entry["variant"] = variants.get(variant, variant)
+
+    return entry
+
+
+@atomic_write()
+def ingest(event, records):
+    """
+    Creates or updates the event's site results of `records`, dicts with a
+    `key`, `site` number, `team` name, optional `variant` name and the
+    `stations.ENTRY_FIELDS` values, in one transaction; rescores the written
+    results once. Returns `stations.Written`.
+    """
+    sites = {site.number: site for site in event.site_set.all()}
+    results = dict(
+        models.Result.objects.filter(event=event).values_list("team", "pk")
+    )
+    variants = {}
+    for variant in models.SiteVariant.objects.filter(site__event=event):
+        variants.setdefault(variant.site_id, {})[variant.name] = variant.pk
+
+    written = stations.Written([], [], {}, [])
+    entries = {}
+    for record in records:
+        number = record.get("site")
+        site = sites.get(number) if isinstance(number, int) else None
+        if site is None:
+            written.errors[str(record.get("key"))] = {
+                "site": [_("Neznáme stanovisko.")]
+            }
+            continue
+
+        entries.setdefault(site, []).append(
+            _get_entry(record, results, variants.get(site.pk, {}))
+        )
+
+    scope = {}
+    # NOTE: keys applied for a site are duplicates for the next ones.
+    for site, site_entries in entries.items():
+        site_written = stations.write_entries(site, site_entries)
+        written.applied.extend(site_written.applied)
+        written.duplicates.extend(site_written.duplicates)
+        written.errors.update(site_written.errors)
+        if site_written.result_pks:
+            scope[site] = site_written.result_pks
+
+    if scope:
+        stations.rescore(scope)
+
+    return written
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+from functools import wraps
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def is_enabled():
+    return bool(getattr(settings, "EVAL_INSTRUMENTATION_LOG", None))
+
+
+def get_budget(name):
+    budgets = getattr(settings, "EVAL_INSTRUMENTATION_BUDGETS", {})
+    return budgets.get(name, budgets.get("default", {}))
+
+
+class Measurement:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.queries = 0
+        self.db_time = 0.0
+        self.total_time = 0.0
+
+    @property
+    def python_time(self):
+        return self.total_time - self.db_time
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "queries": self.queries,
+            "db_time": round(self.db_time, 6),
+            "python_time": round(self.python_time, 6),
+            "total_time": round(self.total_time, 6),
+        }
+
+
+def record(measurement):
+    budget = get_budget(measurement.name)
+    over_budget = [
+        f"{key} {value} > {budget[key]}"
+        for key, value in (
+            ("queries", measurement.queries),
+            ("time", round(measurement.total_time, 3)),
+        )
+        if key in budget and value > budget[key]
+    ]
+    if over_budget:
+        logger.warning(
+            "%s '%s' over budget: %s.",
+            measurement.kind,
+            measurement.name,
+            ", ".join(over_budget),
+        )
+
+    line = json.dumps(measurement.as_dict())
+    with _lock:
+        with open(settings.EVAL_INSTRUMENTATION_LOG, "a") as log:
+            log.write(line + "\n")
+
+
+@contextmanager
+def measure(name, kind="block"):
+    """
+    Counts queries, DB and Python time of the block and records them into
+    `EVAL_INSTRUMENTATION_LOG`; no-op if the log is not configured.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    measurement = Measurement(name, kind)
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(measurement):
+            yield measurement
+    finally:
+        measurement.total_time = time.perf_counter() - start
+        record(measurement)
+
+
+def instrumented(f):
+    """
+    Measures each call of a signal handler.
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        with measure(f"{f.__module__}.{f.__name__}", kind="signal"):
+            return f(*args, **kwargs)
+
+    return wrapper
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with measure(request.path, kind="request") as measurement:
+            response = self.get_response(request)
+
+            # Group by view rather than by URL (object ids, etc.).
+            if request.resolver_match:
+                measurement.name = request.resolver_match.view_name
+
+        return response
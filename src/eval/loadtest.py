@@ -0,0 +1,452 @@
+"""
+Event-day load test: judges saving site results through the result change
+form, organizers editing sites and scoreboards polling the standings, each
+as a concurrent logged-in admin session; see `manage.py loadtest`.
+"""
+from collections import defaultdict, namedtuple
+from datetime import time as daytime, timedelta
+from html.parser import HTMLParser
+from http.cookiejar import CookieJar
+import random
+import sys
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import (
+    HTTPCookieProcessor,
+    HTTPRedirectHandler,
+    Request,
+    build_opener,
+)
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.signals import got_request_exception
+from django.db import OperationalError
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from eval import models
+
+
+LOCKED_HEADER = "X-Load-Test-Locked"
+LOCKED_MESSAGE = "database is locked"
+
+Response = namedtuple("Response", ("status", "body", "locked"))
+
+
+class FormParser(HTMLParser):
+    """
+    Values of the page's form fields as a browser would submit them.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.values = {}
+        self._select = None
+        self._options = []
+        self._textarea = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "option" and self._select is not None:
+            self._options.append((attrs.get("value", ""), "selected" in attrs))
+            return
+
+        # NOTE: disabled fields are not submitted, `__prefix__` forms are
+        # templates for "add another".
+        name = attrs.get("name")
+        if not name or "disabled" in attrs or "__prefix__" in name:
+            return
+
+        if tag == "input":
+            input_type = attrs.get("type", "text")
+            if input_type in ("submit", "button", "file", "image"):
+                return
+            checkable = input_type in ("checkbox", "radio")
+            if checkable and "checked" not in attrs:
+                return
+            self.values[name] = attrs.get("value", "on" if checkable else "")
+        elif tag == "select":
+            self._select = name
+            self._options = []
+        elif tag == "textarea":
+            self._textarea = name
+            self.values[name] = ""
+
+    def handle_endtag(self, tag):
+        if tag == "select" and self._select is not None:
+            selected = [value for value, chosen in self._options if chosen]
+            if selected:
+                self.values[self._select] = selected[0]
+            elif self._options:
+                self.values[self._select] = self._options[0][0]
+            self._select = None
+        elif tag == "textarea":
+            self._textarea = None
+
+    def handle_data(self, data):
+        if self._textarea is not None:
+            self.values[self._textarea] += data
+
+
+def parse_form(html):
+    parser = FormParser()
+    parser.feed(html)
+    return parser.values
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    # The redirect after a successful POST is not followed.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Client:
+    """
+    Admin session (cookies, CSRF token) over HTTP.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), NoRedirectHandler
+        )
+
+    @property
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+
+        return ""
+
+    def request(self, path, data=None):
+        """
+        GET, or POST of the form `data`.
+        """
+        url = f"{self.base_url}{path}"
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.csrf_token)
+            data = urlencode(data).encode()
+        # NOTE: the CSRF check over HTTPS requires a same origin referer.
+        request = Request(url, data, headers={"Referer": url})
+
+        try:
+            with self.opener.open(request) as response:
+                status, headers = response.status, response.headers
+                body = response.read().decode()
+        except HTTPError as e:
+            status, headers = e.code, e.headers
+            body = e.read().decode(errors="replace")
+
+        # Without the in-process server only the debug page tells.
+        locked = LOCKED_HEADER in headers or (
+            status == 500 and LOCKED_MESSAGE in body
+        )
+        return Response(status, body, locked)
+
+    def login(self, username, password):
+        path = reverse("admin:login")
+        self.request(path)
+        response = self.request(
+            path,
+            {"username": username, "password": password, "next": "/admin/"},
+        )
+        if response.status != 302:
+            raise RuntimeError(f"Admin login failed ({response.status}).")
+
+
+_request_state = threading.local()
+
+
+def _mark_locked(sender, **kwargs):
+    error = sys.exc_info()[1]
+    if isinstance(error, OperationalError) and LOCKED_MESSAGE in str(error):
+        _request_state.locked = True
+
+
+def _flag_locked(application):
+    """
+    Adds `LOCKED_HEADER` to responses of requests that failed on a locked
+    database (`got_request_exception` runs in the request's thread).
+    """
+
+    def wrapper(environ, start_response):
+        _request_state.locked = False
+
+        def flagging_start_response(status, headers, *args):
+            if _request_state.locked:
+                headers = headers + [(LOCKED_HEADER, "1")]
+            return start_response(status, headers, *args)
+
+        return application(environ, flagging_start_response)
+
+    return wrapper
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class InProcessServer:
+    """
+    The project's WSGI application served by a thread of this process.
+    """
+
+    def __init__(self):
+        self.server = ThreadedWSGIServer(
+            ("127.0.0.1", 0), QuietRequestHandler
+        )
+        self.server.set_app(_flag_locked(WSGIHandler()))
+        self.thread = threading.Thread(target=self.server.serve_forever)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        got_request_exception.connect(_mark_locked)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        got_request_exception.disconnect(_mark_locked)
+
+
+class Stats:
+    """
+    Latencies (seconds), failed and locked requests per action.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.locked = defaultdict(int)
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, action, latency, ok, locked=False):
+        with self._lock:
+            self.latencies[action].append(latency)
+            self.errors[action] += not ok
+            self.locked[action] += locked
+
+
+def create_event(teams, sites, rng):
+    """
+    Inactive event with synthetic sites, teams and their site results;
+    every other site is evaluated by a measured value with one variant.
+    """
+    event = models.Event.objects.create(
+        name=f"Load test {time.strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+
+    site_objs = []
+    for number in range(1, sites + 1):
+        site = models.Site.objects.create(
+            event=event,
+            number=number,
+            name=f"Site {number}",
+            task=(
+                models.TASK_EVAL_REPORTED_RESULT
+                if number % 2
+                else models.TASK_EVAL_CORRECT_ANSWERS
+            ),
+            time_limit=5,
+            time_limit_diff_penalty=5,
+            missed_penalty=45,
+            time_limit_max=10,
+            time_limit_max_penalty=30,
+        )
+        if site.task == models.TASK_EVAL_REPORTED_RESULT:
+            models.SiteVariant.objects.create(
+                site=site,
+                name="A",
+                reference_value=100,
+                unit="m",
+                precision=0.01,
+                deviation_tolerance=1,
+                deviation_tolerance_penalty=5,
+                deviation_tolerance_max=10,
+                deviation_tolerance_max_penalty=30,
+            )
+        site_objs.append(site)
+
+    for number in range(1, teams + 1):
+        result = models.Result.objects.create(
+            event=event,
+            team=f"Team {number}",
+            start=daytime(9),
+            finish=daytime(12),
+        )
+        for site in site_objs:
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=rng.randint(2 * 60, 12 * 60)),
+                value=round(rng.uniform(90, 110), 2),
+                site=site,
+                variant=site.sitevariant_set.first(),
+                result=result,
+            )
+
+    return event
+
+
+def create_user():
+    """
+    Throwaway superuser (unique name, random password) for the scripted
+    logins; returns (user, password). Delete it afterwards.
+    """
+    password = get_random_string(24)
+    user = User.objects.create_superuser(
+        f"loadtest-{get_random_string(12)}", "", password
+    )
+    return user, password
+
+
+class LoadTest:
+    """
+    Runs `judges`, `editors` and `scoreboards` sessions against the admin
+    at `base_url` for `duration` seconds.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        event,
+        username,
+        password,
+        think_time=0.5,
+        poll_interval=2.0,
+        seed=None,
+    ):
+        self.base_url = base_url
+        self.event = event
+        self.username = username
+        self.password = password
+        self.think_time = think_time
+        self.poll_interval = poll_interval
+        self.seed = seed
+        self.stats = Stats()
+
+        self.result_pks = list(
+            models.Result.objects.filter(event=event).values_list(
+                "pk", flat=True
+            )
+        )
+        self.site_pks = list(
+            models.Site.objects.filter(event=event).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def request(self, client, action, path, data=None, expected=200):
+        start = time.perf_counter()
+        try:
+            response = client.request(path, data)
+        except OSError:
+            # Refused or dropped connections.
+            self.stats.add(action, time.perf_counter() - start, False)
+            return None
+
+        ok = response.status == expected
+        self.stats.add(
+            action, time.perf_counter() - start, ok, response.locked
+        )
+        return response if ok else None
+
+    def judge(self, client, rng):
+        """
+        Opens a team's result and saves new times and values of its sites.
+        """
+        path = reverse(
+            "admin:eval_result_change", args=[rng.choice(self.result_pks)]
+        )
+        response = self.request(client, "result form", path)
+        if response is None:
+            return
+
+        values = parse_form(response.body)
+        for index in range(int(values["siteresult_set-TOTAL_FORMS"])):
+            prefix = f"siteresult_set-{index}-"
+            minutes, seconds = rng.randint(2, 12), rng.randint(0, 59)
+            values[f"{prefix}time"] = f"00:{minutes:02}:{seconds:02}"
+            values[f"{prefix}value"] = round(rng.uniform(90, 110), 2)
+            values.pop(f"{prefix}missed", None)
+            if rng.random() < 0.05:
+                values[f"{prefix}missed"] = "on"
+
+        self.request(client, "save result", path, values, expected=302)
+        time.sleep(self.think_time)
+
+    def editor(self, client, rng):
+        """
+        Changes a site's time limit penalty; rescores all its results.
+        """
+        path = reverse(
+            "admin:eval_site_change", args=[rng.choice(self.site_pks)]
+        )
+        response = self.request(client, "site form", path)
+        if response is None:
+            return
+
+        values = parse_form(response.body)
+        values["time_limit_diff_penalty"] = rng.randint(1, 10)
+        self.request(client, "save site", path, values, expected=302)
+        time.sleep(self.think_time)
+
+    def scoreboard(self, client, rng):
+        query = f"?event={self.event.pk}"
+        self.request(
+            client,
+            "standings",
+            f"{reverse('admin:eval_result_changelist')}{query}",
+        )
+        self.request(
+            client, "export", f"{reverse('admin:eval_result_export')}{query}"
+        )
+        time.sleep(self.poll_interval)
+
+    def run(self, duration, judges=10, editors=1, scoreboards=3):
+        sessions = (
+            [self.judge] * judges
+            + [self.editor] * editors
+            + [self.scoreboard] * scoreboards
+        )
+        clients = []
+        for _ in sessions:
+            client = Client(self.base_url)
+            client.login(self.username, self.password)
+            clients.append(client)
+
+        deadline = time.monotonic() + duration
+
+        def session(step, client, rng):
+            while time.monotonic() < deadline:
+                step(client, rng)
+
+        base_rng = random.Random(self.seed)
+        threads = [
+            threading.Thread(
+                target=session,
+                args=(step, client, random.Random(base_rng.random())),
+            )
+            for step, client in zip(sessions, clients)
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats.elapsed = time.perf_counter() - start
+
+        return self.stats
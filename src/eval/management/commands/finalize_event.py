@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import archive
+from eval.management.utils import add_event_argument, get_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshots standings, per-site breakdowns and the export of the "
+        "event; its data are never recomputed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        add_event_argument(parser)
+
+    def handle(self, *args, **options):
+        event = get_event(options)
+        try:
+            archive.finalize(event)
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.stdout.write(
+            f"Finalized '{event}': {event.final_standings.count()} teams."
+        )
@@ -0,0 +1,125 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import loadtest
+from eval.management.utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates judges saving results, organizers editing sites and "
+        "scoreboards polling the standings against a synthetic event; "
+        "reports throughput, latency percentiles and SQLite lock errors. "
+        "Runs the WSGI application in-process unless --url is given (e.g. "
+        "runserver on the same database). Writes to the configured database: "
+        "a temporary superuser and the event, both removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", help="Base URL of a running server, e.g. runserver."
+        )
+        parser.add_argument("--duration", type=float, default=30.0)
+        parser.add_argument("--judges", type=int, default=10)
+        parser.add_argument("--editors", type=int, default=1)
+        parser.add_argument("--scoreboards", type=int, default=3)
+        parser.add_argument("--teams", type=int, default=50)
+        parser.add_argument("--sites", type=int, default=5)
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.5,
+            help="Seconds between saves of a judge or an editor.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds between polls of a scoreboard.",
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the synthetic event afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["teams"] < 1 or options["sites"] < 1:
+            raise CommandError("At least one team and one site are needed.")
+
+        self.stdout.write("Creating the synthetic event...")
+        event = loadtest.create_event(
+            options["teams"], options["sites"], random.Random(options["seed"])
+        )
+        user = None
+        try:
+            user, password = loadtest.create_user()
+            stats = self.run(event, user.username, password, options)
+        finally:
+            # NOTE: the sessions' superuser never outlives the run.
+            if user is not None:
+                user.delete()
+            if not options["keep"]:
+                self.stdout.write("Deleting the synthetic event...")
+                event.delete()
+
+        self.report(stats)
+
+    def run(self, event, username, password, options):
+        def run_against(url):
+            test = loadtest.LoadTest(
+                url,
+                event,
+                username,
+                password,
+                think_time=options["think_time"],
+                poll_interval=options["poll_interval"],
+                seed=options["seed"],
+            )
+            self.stdout.write(
+                f"Running for {options['duration']:g} s against {url}..."
+            )
+            try:
+                return test.run(
+                    options["duration"],
+                    judges=options["judges"],
+                    editors=options["editors"],
+                    scoreboards=options["scoreboards"],
+                )
+            except (OSError, RuntimeError) as e:
+                raise CommandError(e)
+
+        if options["url"]:
+            return run_against(options["url"])
+
+        with loadtest.InProcessServer() as server:
+            return run_against(server.url)
+
+    def report(self, stats):
+        self.stdout.write(
+            f"{'action':<12} {'count':>6} {'errors':>6} {'locked':>6} "
+            f"{'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'max ms':>8}"
+        )
+        total = 0
+        for action, latencies in sorted(stats.latencies.items()):
+            total += len(latencies)
+            p50, p95, p99 = (
+                percentile(latencies, percent) * 1000
+                for percent in (50, 95, 99)
+            )
+            self.stdout.write(
+                f"{action:<12} {len(latencies):>6} "
+                f"{stats.errors[action]:>6} {stats.locked[action]:>6} "
+                f"{len(latencies) / stats.elapsed:>7.1f} {p50:>8.1f} "
+                f"{p95:>8.1f} {p99:>8.1f} {max(latencies) * 1000:>8.1f}"
+            )
+
+        self.stdout.write(
+            f"{total} requests in {stats.elapsed:.1f} s "
+            f"({total / stats.elapsed:.1f} req/s), "
+            f"{sum(stats.errors.values())} failed, "
+            f"{sum(stats.locked.values())} on a locked database."
+        )
@@ -0,0 +1,52 @@
+from collections import defaultdict
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from eval.management.utils import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregates query counts, DB and Python time per view and signal "
+        "handler from EVAL_INSTRUMENTATION_LOG."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log",
+            default=getattr(settings, "EVAL_INSTRUMENTATION_LOG", None),
+            help="Instrumentation log; defaults to EVAL_INSTRUMENTATION_LOG.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["log"]:
+            raise CommandError("EVAL_INSTRUMENTATION_LOG is not configured.")
+
+        records = defaultdict(list)
+        try:
+            with open(options["log"]) as log:
+                for line in log:
+                    record = json.loads(line)
+                    records[(record["kind"], record["name"])].append(record)
+        except FileNotFoundError:
+            raise CommandError(f"No instrumentation log at {options['log']}.")
+
+        self.stdout.write(
+            f"{'kind':<8} {'name':<50} {'count':>6} {'queries':>8} "
+            f"{'max q':>6} {'db ms':>8} {'py ms':>8} {'p95 ms':>8}"
+        )
+        for (kind, name), items in sorted(records.items()):
+            count = len(items)
+            queries = [item["queries"] for item in items]
+            db_time = sum(item["db_time"] for item in items) / count
+            python_time = sum(item["python_time"] for item in items) / count
+            p95 = percentile([item["total_time"] for item in items], 95)
+
+            self.stdout.write(
+                f"{kind:<8} {name[:50]:<50} {count:>6} "
+                f"{sum(queries) / count:>8.1f} {max(queries):>6} "
+                f"{db_time * 1000:>8.1f} {python_time * 1000:>8.1f} "
+                f"{p95 * 1000:>8.1f}"
+            )
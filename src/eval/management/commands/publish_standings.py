@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import publishing
+from eval.management.utils import add_event_argument, get_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the standings and per-team breakdowns of the event to static "
+        "HTML and JSON files; with --watch again after each change."
+    )
+
+    def add_arguments(self, parser):
+        add_event_argument(parser)
+        parser.add_argument(
+            "--root",
+            default=getattr(settings, "EVAL_PUBLISH_ROOT", None),
+            help="Output directory; defaults to EVAL_PUBLISH_ROOT.",
+        )
+        parser.add_argument(
+            "--watch",
+            type=float,
+            metavar="SECONDS",
+            help="Check for changes every SECONDS and publish them.",
+        )
+
+    def _publish(self, event, root):
+        count = publishing.publish(event, root)
+        self.stdout.write(f"Published '{event}': {count} teams to {root}.")
+
+    def handle(self, *args, **options):
+        root = options["root"]
+        if not root:
+            raise CommandError("EVAL_PUBLISH_ROOT is not configured.")
+
+        event = get_event(options)
+        state = publishing.get_state(event)
+        self._publish(event, root)
+        if options["watch"] is None:
+            return
+
+        # NOTE: changes within one interval are published at once.
+        while True:
+            time.sleep(options["watch"])
+            current = publishing.get_state(event)
+            if current != state:
+                state = current
+                event.refresh_from_db()
+                self._publish(event, root)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import stats
+from eval import verification
+from eval.management.utils import add_event_argument, get_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescores all site results of the event, optionally in parallel "
+        "processes, writes the changed summaries in batches and updates "
+        "site statistics."
+    )
+
+    def add_arguments(self, parser):
+        add_event_argument(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of scoring processes.",
+        )
+
+    def handle(self, *args, **options):
+        event = get_event(options)
+        if event.is_finalized:
+            raise CommandError(f"Event '{event}' is finalized.")
+
+        start = time.perf_counter()
+        mismatches = verification.find_mismatches(
+            event, workers=options["workers"]
+        )
+        verification.repair(mismatches)
+        # NOTE: also fills in statistics of sites scored before they existed.
+        stats.update_event_statistics(event)
+
+        self.stdout.write(
+            f"Updated {len(mismatches)} summaries in "
+            f"{time.perf_counter() - start:.2f} s."
+        )
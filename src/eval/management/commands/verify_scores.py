@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import verification
+from eval.management.utils import add_event_argument, get_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes all scores and compares them to the stored summaries; "
+        "fails when any differ unless --repair is given."
+    )
+
+    def add_arguments(self, parser):
+        add_event_argument(parser)
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Update only the mismatched summaries.",
+        )
+
+    def handle(self, *args, **options):
+        event = get_event(options)
+        mismatches = verification.find_mismatches(event)
+
+        for mismatch in mismatches:
+            if mismatch.stored is None:
+                self.stdout.write(f"{mismatch.label}: missing summary")
+                continue
+
+            for field, expected in mismatch.expected.items():
+                stored = mismatch.stored[field]
+                if stored != expected:
+                    self.stdout.write(
+                        f"{mismatch.label}: {field} stored {stored}, "
+                        f"expected {expected}"
+                    )
+
+        if not mismatches:
+            self.stdout.write("All summaries are consistent.")
+            return
+
+        if not options["repair"]:
+            raise CommandError(f"{len(mismatches)} inconsistent summaries.")
+
+        if event.is_finalized:
+            raise CommandError(f"Event '{event}' is finalized.")
+
+        verification.repair(mismatches)
+        self.stdout.write(f"Repaired {len(mismatches)} summaries.")
@@ -0,0 +1,86 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eval import constants
+from eval import sandbox
+from eval.management.utils import add_event_argument, get_event
+
+
+OVERRIDE_RE = re.compile(
+    r"^(?P<site>\d+)\.(?P<field>\w+)(?P<op>\+?=)(?P<value>.+)$"
+)
+
+
+def parse_override(override):
+    match = OVERRIDE_RE.match(override)
+    if not match:
+        raise CommandError(
+            f"Invalid override '{override}'; use e.g. 3.time_limit=4 or "
+            "3.deviation_tolerance+=0.5."
+        )
+
+    value = match["value"]
+    if value != "null":
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        else:
+            value = int(value) if value.is_integer() else value
+    else:
+        value = None
+
+    if match["op"] == "+=":
+        if not isinstance(value, (int, float)):
+            raise CommandError(
+                f"Invalid override '{override}'; only a number can be added."
+            )
+        delta = value
+        value = lambda current: current + delta  # noqa
+
+    return int(match["site"]), match["field"], value
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescores the event in memory with changed site/variant parameters "
+        "and prints rank changes; nothing is saved."
+    )
+
+    def add_arguments(self, parser):
+        add_event_argument(parser)
+        parser.add_argument(
+            "overrides",
+            nargs="+",
+            metavar="SITE.FIELD=VALUE",
+            help="E.g. 3.time_limit=4 or 3.deviation_tolerance+=0.5.",
+        )
+
+    def handle(self, *args, **options):
+        overrides = {}
+        for override in options["overrides"]:
+            site_number, field, value = parse_override(override)
+            overrides.setdefault(site_number, {})[field] = value
+
+        event = sandbox.Sandbox(get_event(options))
+        try:
+            event.check_overrides(overrides)
+        except ValueError as e:
+            raise CommandError(e)
+        # Score the current data outside of the measured rescoring.
+        event.baseline
+
+        start = time.perf_counter()
+        _, changes = event.compare(overrides)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        for change in changes:
+            self.stdout.write(
+                f"{constants.CATEGORY_SK} {change.category}: "
+                f"{change.team} {change.old_rank}. --> {change.new_rank}."
+            )
+        self.stdout.write(
+            f"{len(changes)} rank change(s), rescored in {elapsed:.1f} ms."
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import CommandError
+
+from eval import models
+
+
+def add_event_argument(parser):
+    parser.add_argument(
+        "--event",
+        type=int,
+        help="Event primary key; the active event by default.",
+    )
+
+
+def get_event(options):
+    if options["event"] is None:
+        event = models.get_active_event()
+        if event is None:
+            raise CommandError("No event is active; use --event.")
+
+        return event
+
+    try:
+        return models.Event.objects.get(pk=options["event"])
+    except models.Event.DoesNotExist:
+        raise CommandError(f"Event {options['event']} does not exist.")
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
@@ -7,8 +7,6 @@ import django.db.models.deletion
 
 class Migration(migrations.Migration):
 
-    replaces = [('eval', '0001_initial'), ('eval', '0002_auto_20190327_2251')]
-
     dependencies = [
     ]
 
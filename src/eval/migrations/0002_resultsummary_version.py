@@ -0,0 +1,18 @@
+# Generated by Django 2.1.7 on 2026-10-19 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='version',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
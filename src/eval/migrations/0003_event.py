@@ -0,0 +1,75 @@
+# Generated by Django 2.1.7 on 2026-10-19 03:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import eval.models
+
+
+def create_default_event(apps, schema_editor):
+    # Existing sites and results are moved to this event.
+    Event = apps.get_model('eval', 'Event')
+    Event.objects.create(pk=1, name='IG5', is_active=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0002_resultsummary_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Názov')),
+                ('is_active', models.BooleanField(default=False, help_text='Nové stanoviská a výsledky patria do aktívneho podujatia.', verbose_name='Aktívne')),
+            ],
+            options={
+                'verbose_name': 'podujatie',
+                'verbose_name_plural': 'Podujatia',
+                'ordering': ('-pk',),
+            },
+        ),
+        migrations.RunPython(create_default_event, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='result',
+            name='team',
+            field=models.CharField(max_length=50, verbose_name='Tým'),
+        ),
+        migrations.AlterField(
+            model_name='site',
+            name='number',
+            field=models.IntegerField(default=1, verbose_name='Číslo'),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='event',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='eval.Event', verbose_name='Podujatie'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='event',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='eval.Event', verbose_name='Podujatie'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='event',
+            field=models.ForeignKey(default=eval.models.get_active_event_pk, on_delete=django.db.models.deletion.CASCADE, to='eval.Event', verbose_name='Podujatie'),
+        ),
+        migrations.AlterField(
+            model_name='site',
+            name='event',
+            field=models.ForeignKey(default=eval.models.get_active_event_pk, on_delete=django.db.models.deletion.CASCADE, to='eval.Event', verbose_name='Podujatie'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='result',
+            unique_together={('event', 'team')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='site',
+            unique_together={('event', 'number')},
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 2.1.7 on 2026-10-19 03:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0003_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinalStanding',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(max_length=50, verbose_name='Tým')),
+                ('category_1_rank', models.PositiveIntegerField(verbose_name='Poradie (Kategória 1)')),
+                ('category_2_rank', models.PositiveIntegerField(verbose_name='Poradie (Kategória 2)')),
+                ('missed_sites', models.PositiveIntegerField(verbose_name='Vynechané')),
+                ('route_time', models.IntegerField()),
+                ('stop_time', models.IntegerField()),
+                ('total_penalty', models.IntegerField()),
+                ('total_time', models.IntegerField()),
+                ('sites', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'konečné poradie',
+                'verbose_name_plural': 'Konečné poradia',
+                'ordering': ('event', 'category_1_rank'),
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='final_export',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='is_finalized',
+            field=models.BooleanField(default=False, editable=False, help_text='Výsledky sú uložené a už sa neprepočítavajú.', verbose_name='Uzavreté'),
+        ),
+        migrations.AddField(
+            model_name='finalstanding',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='final_standings', to='eval.Event', verbose_name='Podujatie'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='finalstanding',
+            unique_together={('event', 'team')},
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.1.7 on 2026-10-19 04:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0004_finalstanding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStatistics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('results_count', models.PositiveIntegerField(default=0, verbose_name='Výsledky')),
+                ('missed_count', models.PositiveIntegerField(default=0, verbose_name='Vynechané')),
+                ('time_avg', models.FloatField(blank=True, null=True)),
+                ('time_min', models.FloatField(blank=True, null=True)),
+                ('time_max', models.FloatField(blank=True, null=True)),
+                ('deviation_avg', models.FloatField(blank=True, null=True)),
+                ('deviation_std', models.FloatField(blank=True, null=True)),
+                ('deviation_min', models.FloatField(blank=True, null=True)),
+                ('deviation_max', models.FloatField(blank=True, null=True)),
+                ('outside_tolerance_count', models.PositiveIntegerField(default=0)),
+                ('outside_max_tolerance_count', models.PositiveIntegerField(default=0)),
+                ('over_time_limit_max_count', models.PositiveIntegerField(default=0)),
+                ('total_penalty_avg', models.FloatField(blank=True, null=True)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='eval.Site')),
+                ('variant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='eval.SiteVariant', verbose_name='Varianta')),
+            ],
+            options={
+                'verbose_name': 'štatistika',
+                'verbose_name_plural': 'Štatistiky',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='sitestatistics',
+            unique_together={('site', 'variant')},
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 2.1.7 on 2026-10-19 04:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# NOTE: the rules as of this migration, see `models.get_category_orderings`.
+CATEGORY_1_MISSED_SITES_DSQ = 1
+CATEGORY_2_MISSED_SITES_DSQ = 2
+DSQ_ORDERING_PENALTY = 60 * 60 * 24 * 5
+
+
+def fill_category_orderings(apps, schema_editor):
+    ResultSummary = apps.get_model('eval', 'ResultSummary')
+    summaries = ResultSummary.objects.annotate(
+        missed_count=Count(
+            'result__siteresult', filter=Q(result__siteresult__missed=True)
+        )
+    )
+    for summary in summaries:
+        summary.missed_sites = summary.missed_count
+        summary.category_1_ordering = summary.total_time
+        if summary.missed_sites >= CATEGORY_1_MISSED_SITES_DSQ:
+            summary.category_1_ordering += DSQ_ORDERING_PENALTY
+        summary.category_2_ordering = summary.total_penalty
+        if summary.missed_sites >= CATEGORY_2_MISSED_SITES_DSQ:
+            summary.category_2_ordering += DSQ_ORDERING_PENALTY
+        summary.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0005_sitestatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='category_1_ordering',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='category_2_ordering',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='missed_sites',
+            field=models.PositiveIntegerField(default=0, verbose_name='Vynechané'),
+        ),
+        migrations.RunPython(fill_category_orderings, migrations.RunPython.noop),
+    ]
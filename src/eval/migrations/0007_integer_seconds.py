@@ -0,0 +1,66 @@
+# Generated by Django 2.1.7 on 2026-10-19 04:36
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+# NOTE: as of this migration, see `scoring`.
+def time_to_seconds(value):
+    return value.hour * 60 * 60 + value.minute * 60 + value.second
+
+
+def get_duration_seconds(start, end):
+    # An end before the start is on the next day.
+    return (time_to_seconds(end) - time_to_seconds(start)) % (24 * 60 * 60)
+
+
+def fill_seconds(apps, schema_editor):
+    Result = apps.get_model('eval', 'Result')
+    SiteResult = apps.get_model('eval', 'SiteResult')
+    for result in Result.objects.all():
+        result.route_seconds = (
+            get_duration_seconds(result.start, result.finish)
+            + result.route_shortening_penalty * 60
+        )
+        # Routes over midnight were stored negative.
+        result.route_time = timedelta(seconds=result.route_seconds)
+        result.save(update_fields=['route_seconds', 'route_time'])
+
+    for site_result in SiteResult.objects.all():
+        if site_result.time is not None:
+            site_result.time_seconds = int(site_result.time.total_seconds())
+        if (
+            site_result.stop_time_start is not None
+            and site_result.stop_time_end is not None
+        ):
+            site_result.stop_seconds = get_duration_seconds(
+                site_result.stop_time_start, site_result.stop_time_end
+            )
+        site_result.save(update_fields=['time_seconds', 'stop_seconds'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0006_resultsummary_category_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='route_seconds',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='siteresult',
+            name='stop_seconds',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='siteresult',
+            name='time_seconds',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_seconds, migrations.RunPython.noop),
+    ]
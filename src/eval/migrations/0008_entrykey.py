@@ -0,0 +1,27 @@
+# Generated by Django 2.1.7 on 2026-10-19 04:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0007_integer_seconds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntryKey',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='eval.Event')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='entrykey',
+            unique_together={('event', 'key')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.1.7 on 2026-10-19 04:49
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def get_search_name(team):
+    # NOTE: as of this migration, see `models.get_search_name`.
+    decomposed = unicodedata.normalize('NFKD', team.casefold())
+    return ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+
+
+def fill_search_names(apps, schema_editor):
+    Result = apps.get_model('eval', 'Result')
+    for result in Result.objects.all():
+        result.search_name = get_search_name(result.team)[:100]
+        result.save(update_fields=['search_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0008_entrykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='resultsummary',
+            name='missed_sites',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Vynechané'),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
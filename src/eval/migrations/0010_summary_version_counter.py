@@ -0,0 +1,39 @@
+# Generated by Django 2.1.7 on 2026-10-19 05:00
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_counter(apps, schema_editor):
+    ResultSummary = apps.get_model('eval', 'ResultSummary')
+    SummaryVersion = apps.get_model('eval', 'SummaryVersion')
+    # Continues after the versions taken so far.
+    latest = ResultSummary.objects.aggregate(version=Max('version'))
+    SummaryVersion.objects.create(pk=1, value=latest['version'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0009_search_filters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_pk', models.PositiveIntegerField(db_index=True)),
+                ('team', models.CharField(max_length=50)),
+                ('version', models.PositiveIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SummaryVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+    ]
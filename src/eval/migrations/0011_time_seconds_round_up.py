@@ -0,0 +1,27 @@
+# Generated by Django 2.1.7 on 2026-10-19 06:00
+
+from datetime import timedelta
+
+from django.db import migrations
+
+
+def round_up_time_seconds(apps, schema_editor):
+    SiteResult = apps.get_model('eval', 'SiteResult')
+    # Only fractional times were stored rounded down.
+    for site_result in SiteResult.objects.exclude(time=None).iterator():
+        seconds = -(-site_result.time // timedelta(seconds=1))
+        if seconds != site_result.time_seconds:
+            SiteResult.objects.filter(pk=site_result.pk).update(
+                time_seconds=seconds
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0010_summary_version_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(round_up_time_seconds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.1.7 on 2026-10-19 09:12
+
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def get_search_words(team):
+    # NOTE: as of this migration, see `models.get_search_words`.
+    decomposed = unicodedata.normalize('NFKD', team.casefold())
+    words = ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+def fill_search_words(apps, schema_editor):
+    Result = apps.get_model('eval', 'Result')
+    ResultSearchWord = apps.get_model('eval', 'ResultSearchWord')
+    ResultSearchWord.objects.bulk_create(
+        ResultSearchWord(result=result, word=word[:100])
+        for result in Result.objects.all()
+        for word in get_search_words(result.team)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eval', '0012_time_seconds_truncate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSearchWord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(db_index=True, max_length=100)),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_words', to='eval.Result')),
+            ],
+        ),
+        migrations.RunPython(fill_search_words, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='result',
+            name='search_name',
+        ),
+    ]
@@ -1,14 +1,28 @@
-from datetime import datetime, date, timedelta
+from datetime import timedelta
+import unicodedata
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
 from django.utils.translation import gettext as _
 
 from eval import constants
+from eval.scoring import (  # noqa
+    TASK_EVAL_CORRECT_ANSWERS,
+    TASK_EVAL_REPORTED_RESULT,
+    SiteResultScore,
+    calculate_precision_penalty,
+    calculate_stop_time,
+    calculate_time_penalty,
+    duration_to_seconds,
+    get_duration_seconds,
+    get_time_delta,
+    score_site_result,
+    time_to_seconds,
+)
+from ig5_site.sqlite3.transaction import atomic_write
 
 
-TASK_EVAL_REPORTED_RESULT = "reported_result"
 TASK_EVAL_REPORTED_RESULT_HUMAN = _("Výsledok merania")
-TASK_EVAL_CORRECT_ANSWERS = "correct_answsers"
 TASK_EVAL_CORRECT_ANSWERS_HUMAN = _("Počet správnych odpovedí")
 TASK_CHOICES = (
     (TASK_EVAL_REPORTED_RESULT, TASK_EVAL_REPORTED_RESULT_HUMAN),
@@ -16,90 +30,112 @@ TASK_CHOICES = (
 )
 
 
-def get_time_delta(start, end):
-    today = date.today()
-    start = datetime.combine(today, start)
-    stop = datetime.combine(today, end)
-    return stop - start
+class ResultSummaryBase(models.Model):
+    fields_from_result = (
+        "stop_time",
+        "time_penalty",
+        "precision_penalty",
+        "total_penalty",
+        "total_time",
+    )
 
+    stop_time = models.IntegerField()
+    time_penalty = models.IntegerField()
+    precision_penalty = models.IntegerField()
+    total_penalty = models.IntegerField()
+    total_time = models.IntegerField()
 
-def calculate_precision_penalty(
-    reference_value,
-    actual_value,
-    deviation_tolerance,
-    deviation_tolerance_penalty,
-    deviation_tolerance_max,
-    deviation_tolerance_max_penalty,
-    precision,
-):
-    """
-    Returns penalty in seconds!
-    """
-    within_tolerance = True
-    within_max_tolerance = True
-    deviation = abs(reference_value - actual_value)
-
-    if deviation <= deviation_tolerance_max:
-        if deviation <= deviation_tolerance:
-            penalty = 0
-        else:
-            # Add penalty for each unit over tolerance.
-            penalty = (
-                abs(deviation - deviation_tolerance)
-                * deviation_tolerance_penalty
-                / precision
-            )
-            within_tolerance = False
-    else:
-        penalty = deviation_tolerance_max_penalty
-        within_tolerance = False
-        within_max_tolerance = False
+    class Meta:
+        abstract = True
+
+    def take_fields_from_result(self):
+        changed = self._state.adding
+        for field in self.fields_from_result:
+            value = getattr(self.result, field)
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed = True
+
+        # NOTE: unchanged summaries are not saved - keeps `version` stable.
+        if changed:
+            self.save()
+
+
+class Event(models.Model):
+    name = models.CharField(verbose_name=constants.NAME_SK, max_length=50)
+    is_active = models.BooleanField(
+        verbose_name=_("Aktívne"),
+        default=False,
+        help_text=_(
+            "Nové stanoviská a výsledky patria do aktívneho podujatia."
+        ),
+    )
+    is_finalized = models.BooleanField(
+        verbose_name=_("Uzavreté"),
+        default=False,
+        editable=False,
+        help_text=_("Výsledky sú uložené a už sa neprepočítavajú."),
+    )
+    final_export = models.TextField(blank=True, default="", editable=False)
+
+    class Meta:
+        verbose_name = constants.EVENT_SK.lower()
+        verbose_name_plural = constants.EVENT_PLURAL_SK
+        ordering = ("-pk",)
 
-    return round(penalty) * 60, within_tolerance, within_max_tolerance
+    def __str__(self):
+        return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
 
-def calculate_time_penalty(reference_time, actual_time, per_second_penalty):
+        # Only one active event.
+        if self.is_active:
+            Event.objects.exclude(pk=self.pk).update(is_active=False)
+
+
+def get_active_event():
     """
-    Returns penalty in seconds!
+    The active event or `None`; read only (also a field default).
     """
-    # NOTE: These lines are needed for testing with input strings.
-    # reference_time = datetime.strptime(reference_time, time_format)
-    # actual_time = datetime.strptime(actual_time, time_format)
-    delta = reference_time - actual_time
-    penalty = delta.seconds
-    if delta.days < 0:
-        penalty = delta.seconds - 60 * 60 * 24
+    return Event.objects.filter(is_active=True).first()
 
-    return penalty * -1 * per_second_penalty
 
+def get_active_event_pk():
+    event = get_active_event()
+    return None if event is None else event.pk
 
-class ResultSummaryBase(models.Model):
-    stop_time = models.IntegerField()
-    time_penalty = models.IntegerField()
-    precision_penalty = models.IntegerField()
-    total_penalty = models.IntegerField()
-    total_time = models.IntegerField()
 
-    class Meta:
-        abstract = True
+def is_event_finalized(event_pk):
+    return Event.objects.filter(pk=event_pk, is_finalized=True).exists()
 
-    def take_fields_from_result(self):
-        fields = (
-            "stop_time",
-            "time_penalty",
-            "precision_penalty",
-            "total_penalty",
-            "total_time",
-        )
-        for field in fields:
-            setattr(self, field, getattr(self.result, field))
-        self.save()
+
+def get_search_name(team):
+    """
+    Team name without case and diacritics; "Žabí Tím" --> "zabi tim".
+    """
+    decomposed = unicodedata.normalize("NFKD", team.casefold())
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+
+
+def get_search_words(team):
+    """
+    Searched name from each of its words; "Žabí Tím" --> ["zabi tim", "tim"].
+    """
+    words = get_search_name(team).split()
+    return [" ".join(words[index:]) for index in range(len(words))]
 
 
 class Result(models.Model):
-    team = models.CharField(
-        verbose_name=constants.TEAM_SK, max_length=50, unique=True
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        default=get_active_event_pk,
+        verbose_name=constants.EVENT_SK,
     )
+    team = models.CharField(verbose_name=constants.TEAM_SK, max_length=50)
     start = models.TimeField(verbose_name=constants.START_SK)
     finish = models.TimeField(verbose_name=constants.FINISH_SK)
     route_shortening_penalty = models.IntegerField(
@@ -108,21 +144,38 @@ class Result(models.Model):
         default=0,
     )
     route_time = models.DurationField(default=timedelta())
+    # NOTE: `route_time` in seconds, for arithmetic in SQL and arrays.
+    route_seconds = models.IntegerField(default=0)
 
     class Meta:
         verbose_name = constants.RESULT_SK.lower()
         verbose_name_plural = constants.RESULT_PLURAL_SK
+        unique_together = ("event", "team")
 
     def __str__(self):
         return self.team
 
     def save(self, *args, **kwargs):
-        self.route_time = get_time_delta(self.start, self.finish) + timedelta(
-            seconds=self.route_shortening_penalty * 60
+        if is_event_finalized(self.event_id):
+            raise ValueError("Finalized event results can not be changed.")
+
+        self.route_seconds = (
+            get_duration_seconds(
+                time_to_seconds(self.start), time_to_seconds(self.finish)
+            )
+            + self.route_shortening_penalty * 60
         )
+        self.route_time = timedelta(seconds=self.route_seconds)
 
         super().save(*args, **kwargs)
 
+        self.search_words.all().delete()
+        max_length = ResultSearchWord._meta.get_field("word").max_length
+        ResultSearchWord.objects.bulk_create(
+            ResultSearchWord(result=self, word=word[:max_length])
+            for word in get_search_words(self.team)
+        )
+
     def _get_total(self, field):
         values = []
 
@@ -149,16 +202,69 @@ class Result(models.Model):
 
     @property
     def total_time(self):
-        return self._get_total("total_time") + self.route_time.seconds
+        return self._get_total("total_time") + self.route_seconds
+
+
+def get_result_totals(result_pk):
+    """
+    Totals of the result's stored site result summaries, as in
+    `ResultSummary.fields_from_result`, by one query.
+    """
+    sums = {
+        field: Sum(f"siteresult__summary__{field}")
+        for field in ResultSummaryBase.fields_from_result
+    }
+    missed_sites = Count("siteresult", filter=Q(siteresult__missed=True))
+    route_seconds, *values = (
+        Result.objects.filter(pk=result_pk)
+        .values("route_seconds")
+        .annotate(missed_sites=missed_sites, **sums)
+        .values_list("route_seconds", "missed_sites", *sums)
+        .get()
+    )
+
+    totals = dict(zip(("missed_sites", *sums), values))
+    for field in sums:
+        totals[field] = totals[field] or 0
+    totals["total_time"] += route_seconds
+    return totals
+
+
+def get_category_orderings(total_time, total_penalty, missed_sites):
+    """
+    Ranking keys of both categories; disqualified teams go last.
+    """
+    dsq = constants.DSQ_ORDERING_PENALTY
+    if missed_sites >= constants.CATEGORY_1_MISSED_SITES_DSQ:
+        total_time += dsq
+    if missed_sites >= constants.CATEGORY_2_MISSED_SITES_DSQ:
+        total_penalty += dsq
+
+    return {
+        "category_1_ordering": total_time,
+        "category_2_ordering": total_penalty,
+    }
 
 
 class ResultSummary(ResultSummaryBase):
+    fields_from_result = ResultSummaryBase.fields_from_result + (
+        "missed_sites",
+    )
+
     result = models.OneToOneField(
         Result,
         on_delete=models.CASCADE,
         related_name=constants.SUMMARY,
         primary_key=True,
     )
+    # Monotonic change counter; bumped whenever the scores change.
+    version = models.PositiveIntegerField(default=0, db_index=True)
+    missed_sites = models.PositiveIntegerField(
+        verbose_name=constants.MISSED_SK, default=0, db_index=True
+    )
+    # NOTE: derived from the fields above on save, ordered by in the admin.
+    category_1_ordering = models.IntegerField(default=0, db_index=True)
+    category_2_ordering = models.IntegerField(default=0, db_index=True)
 
     class Meta:
         verbose_name = constants.SUMMARY_SK
@@ -167,11 +273,122 @@ class ResultSummary(ResultSummaryBase):
     def __str__(self):
         return self.result.team
 
+    @atomic_write()
+    def take_fields_from_result(self, touch=False):
+        """
+        Sums the stored site result summaries in a write transaction: a
+        concurrent writer of another site of the team either committed
+        before (and is summed) or waits for the write lock and sums after;
+        no stale totals.
+        With `touch` a new version is taken even if the totals are the
+        same (the team or a site result changed), see the delta export.
+        """
+        # NOTE: the write lock is SQLite's, of the whole database; no
+        # `select_for_update` (a no-op on SQLite).
+        summaries = ResultSummary.objects.all()
+        stored = summaries.filter(pk=self.result_id).first()
+        if stored is None:
+            try:
+                # The team's first site result.
+                with transaction.atomic():
+                    self._take_totals(force_insert=True)
+                return
+            except IntegrityError:
+                # Created concurrently.
+                stored = summaries.get(pk=self.result_id)
+
+        for field in self._meta.concrete_fields:
+            setattr(self, field.attname, getattr(stored, field.attname))
+        self._state.adding = False
+        self._take_totals(touch=touch)
+
+    def _take_totals(self, force_insert=False, touch=False):
+        changed = force_insert or touch
+        for field, value in get_result_totals(self.result_id).items():
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed = True
+
+        # NOTE: unchanged summaries are not saved - keeps `version` stable.
+        if changed:
+            self.save(force_insert=force_insert)
+
+    def save(self, *args, **kwargs):
+        self.version = get_next_summary_version()
+        orderings = get_category_orderings(
+            self.total_time, self.total_penalty, self.missed_sites
+        )
+        for field, value in orderings.items():
+            setattr(self, field, value)
+
+        super().save(*args, **kwargs)
+
+
+class SummaryVersion(models.Model):
+    """
+    The single row counter of summary versions (`ResultSummary.version`,
+    `DeletedResult.version`); see `get_next_summary_version`.
+    """
+
+    value = models.PositiveIntegerField(default=0)
+
+
+SUMMARY_VERSION_PK = 1
+
+
+def get_latest_summary_version():
+    value = (
+        SummaryVersion.objects.filter(pk=SUMMARY_VERSION_PK)
+        .values_list("value", flat=True)
+        .first()
+    )
+    return value or 0
+
+
+@atomic_write()
+def get_next_summary_version():
+    """
+    Takes the next version; the counter row stays locked by the update
+    until the transaction commits, so versions are committed in order.
+    """
+    SummaryVersion.objects.get_or_create(pk=SUMMARY_VERSION_PK)
+    counter = SummaryVersion.objects.filter(pk=SUMMARY_VERSION_PK)
+    counter.update(value=F("value") + 1)
+    return counter.values_list("value", flat=True).get()
+
+
+class ResultSearchWord(models.Model):
+    """
+    Team name from one of its words as by `get_search_words`, searched by
+    indexed prefix.
+    """
+
+    result = models.ForeignKey(
+        Result, on_delete=models.CASCADE, related_name="search_words"
+    )
+    word = models.CharField(max_length=100, db_index=True)
+
+
+class DeletedResult(models.Model):
+    """
+    Tombstone of a deleted team, reported by the delta export of versions
+    after `version`.
+    """
+
+    # NOTE: not a foreign key, results are deleted along with the event.
+    event_pk = models.PositiveIntegerField(db_index=True)
+    team = models.CharField(max_length=50)
+    version = models.PositiveIntegerField(db_index=True)
+
 
 class Site(models.Model):
-    number = models.IntegerField(
-        verbose_name=_("Číslo"), default=1, unique=True
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        default=get_active_event_pk,
+        verbose_name=constants.EVENT_SK,
     )
+    number = models.IntegerField(verbose_name=_("Číslo"), default=1)
     name = models.CharField(
         verbose_name=constants.NAME_SK, max_length=50, default=""
     )
@@ -219,6 +436,7 @@ class Site(models.Model):
         verbose_name = constants.SITE_SK.lower()
         verbose_name_plural = constants.SITE_PLURAL_SK
         ordering = ("number",)
+        unique_together = ("event", "number")
 
     def __str__(self):
         return f"{constants.SITE_SK} {self.number}: {self.name}"
@@ -272,6 +490,9 @@ class SiteResult(models.Model):
     )
     stop_time_start = models.TimeField(blank=True, null=True)
     stop_time_end = models.TimeField(blank=True, null=True)
+    # NOTE: `time` and the stop time window length in seconds, see `save`.
+    time_seconds = models.IntegerField(blank=True, null=True)
+    stop_seconds = models.IntegerField(default=0)
     value = models.FloatField(
         verbose_name=constants.RESULT_SK, blank=True, null=True
     )
@@ -298,23 +519,43 @@ class SiteResult(models.Model):
     def __str__(self):
         return f"{self.result.team} - {self.site.name}"
 
+    def save(self, *args, **kwargs):
+        finalized = Event.objects.filter(
+            result=self.result_id, is_finalized=True
+        )
+        if finalized.exists():
+            raise ValueError("Finalized event results can not be changed.")
+
+        self.set_seconds()
+        super().save(*args, **kwargs)
+
+    def set_seconds(self):
+        self.time_seconds = duration_to_seconds(self.time)
+        self.stop_seconds = -calculate_stop_time(
+            self.stop_time_start, self.stop_time_end
+        )
+
+    def get_score(self):
+        # NOTE: from the fields, the stored seconds are only set on save.
+        return score_site_result(
+            self.site,
+            self.variant,
+            None if self.time is None else self.time.total_seconds(),
+            self.value,
+            self.missed,
+            self.stop_time,
+        )
+
     @property
     def task_within_timebox(self):
-        if self.site.time_limit_max is not None:
-            return self.time.seconds < self.site.time_limit_max * 60
-
-        return True
+        return self.get_score().within_timebox
 
     @property
     def stop_time(self):
         if self.missed:
             return 0
 
-        if self.stop_time_end and self.stop_time_start:
-            delta = get_time_delta(self.stop_time_start, self.stop_time_end)
-            return -delta.seconds
-
-        return 0
+        return calculate_stop_time(self.stop_time_start, self.stop_time_end)
 
     @property
     def missed_penalty(self):
@@ -322,127 +563,31 @@ class SiteResult(models.Model):
 
     @property
     def time_penalty(self):
-        if self.missed:
-            return 0
-
-        if not self.task_within_timebox:
-            # TODO check if not None!
-            return self.site.time_limit_max_penalty * 60
-
-        reference_time = timedelta(minutes=self.site.time_limit)
-        return calculate_time_penalty(
-            reference_time, self.time, self.site.time_limit_diff_penalty
-        )
-
-    def _calculate_precision_penalty(self):
-        if self.missed:
-            return 0, True, True
-
-        return calculate_precision_penalty(
-            self.variant.reference_value,
-            self.value,
-            self.variant.deviation_tolerance,
-            self.variant.deviation_tolerance_penalty,
-            self.variant.deviation_tolerance_max,
-            self.variant.deviation_tolerance_max_penalty,
-            self.variant.precision,
-        )
+        return self.get_score().time_penalty
 
     @property
     def precision_penalty(self):
-        if self.missed:
-            return 0
-
-        if not self.task_within_timebox:
-            return 0
-
-        if self.site.task == TASK_EVAL_CORRECT_ANSWERS:
-            # Correct answer == 1 point; 1 point == 1.5 bonus minute.
-            return -self.value * 90
-
-        return self._calculate_precision_penalty()[0]
+        return self.get_score().precision_penalty
 
     @property
     def precision_within_tolerance(self):
-        if self.site.task == TASK_EVAL_CORRECT_ANSWERS:
-            return True
-
-        # Deviation tolerance not specified.
-        if self.variant.deviation_tolerance == 0:
-            return True
-
-        return self._calculate_precision_penalty()[1]
+        return self.get_score().precision_within_tolerance
 
     @property
     def precision_within_max_tolerance(self):
-        if self.site.task == TASK_EVAL_CORRECT_ANSWERS:
-            return True
-
-        return self._calculate_precision_penalty()[2]
+        return self.get_score().precision_within_max_tolerance
 
     @property
     def total_penalty_correction(self):
-        if self.site.task == TASK_EVAL_CORRECT_ANSWERS:
-            return 0
-
-        total_penalty = self._calculate_total_penalty()
-        if total_penalty > self.missed_penalty:
-            return self.missed_penalty - total_penalty
-
-        # Slow.
-        if self.time_penalty > 0:
-            # Not precise at all.
-            if not self.precision_within_max_tolerance:
-                return 0
-
-            if self.variant.deviation_tolerance == 0:
-                return 0
-
-            # Not precise.
-            dev_max_pen = self.variant.deviation_tolerance_max_penalty * 60
-            if total_penalty > dev_max_pen:
-                return dev_max_pen - total_penalty
-        # Fast.
-        elif self.time_penalty < 0:
-            if not self.precision_within_tolerance:
-                return -self.time_penalty
-
-        return 0
-
-    def _calculate_total_penalty(self):
-        if self.missed:
-            return self.missed_penalty
-
-        return self.precision_penalty + self.time_penalty
+        return self.get_score().total_penalty_correction
 
     @property
     def total_penalty(self):
-        total_penalty = self._calculate_total_penalty()
-
-        # Slow.
-        if self.time_penalty > 0:
-            # Not precise at all.
-            if not self.precision_within_max_tolerance:
-                return min(total_penalty, self.missed_penalty)
-            # Not precise.
-            elif not self.precision_within_tolerance:
-                return min(
-                    total_penalty,
-                    self.variant.deviation_tolerance_max_penalty * 60,
-                )
-        # Fast.
-        elif self.time_penalty < 0:
-            if not self.precision_within_tolerance:
-                return total_penalty - self.time_penalty
-
-        return total_penalty
+        return self.get_score().total_penalty
 
     @property
     def total_time(self):
-        if self.missed:
-            return self.total_penalty
-
-        return self.total_penalty + self.stop_time
+        return self.get_score().total_time
 
 
 # NOTE: required for ordering by sites in admin.
@@ -453,3 +598,106 @@ class SiteResultSummary(ResultSummaryBase):
         related_name=constants.SUMMARY,
         primary_key=True,
     )
+
+
+class SiteStatistics(models.Model):
+    """
+    Aggregates of a site's results, per variant and for the whole site
+    (`variant` is `None`); kept up to date by `eval.stats`. Times are in
+    seconds, deviations are `value - reference_value`.
+    """
+
+    site = models.ForeignKey(
+        Site, on_delete=models.CASCADE, related_name="statistics"
+    )
+    variant = models.ForeignKey(
+        SiteVariant,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        verbose_name=constants.VARIANT_SK,
+    )
+    results_count = models.PositiveIntegerField(
+        verbose_name=constants.RESULT_PLURAL_SK, default=0
+    )
+    missed_count = models.PositiveIntegerField(
+        verbose_name=constants.MISSED_SK, default=0
+    )
+    time_avg = models.FloatField(blank=True, null=True)
+    time_min = models.FloatField(blank=True, null=True)
+    time_max = models.FloatField(blank=True, null=True)
+    deviation_avg = models.FloatField(blank=True, null=True)
+    deviation_std = models.FloatField(blank=True, null=True)
+    deviation_min = models.FloatField(blank=True, null=True)
+    deviation_max = models.FloatField(blank=True, null=True)
+    outside_tolerance_count = models.PositiveIntegerField(default=0)
+    outside_max_tolerance_count = models.PositiveIntegerField(default=0)
+    over_time_limit_max_count = models.PositiveIntegerField(default=0)
+    total_penalty_avg = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = constants.STATISTICS_SK.lower()
+        verbose_name_plural = constants.STATISTICS_PLURAL_SK
+        unique_together = ("site", "variant")
+
+    @property
+    def reported_count(self):
+        return self.results_count - self.missed_count
+
+
+class FinalStanding(models.Model):
+    """
+    Immutable snapshot of a team's standing in a finalized event.
+    """
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="final_standings",
+        verbose_name=constants.EVENT_SK,
+    )
+    team = models.CharField(verbose_name=constants.TEAM_SK, max_length=50)
+    category_1_rank = models.PositiveIntegerField(
+        verbose_name=f"{constants.ORDER_SK} ({constants.CATEGORY_SK} 1)"
+    )
+    category_2_rank = models.PositiveIntegerField(
+        verbose_name=f"{constants.ORDER_SK} ({constants.CATEGORY_SK} 2)"
+    )
+    missed_sites = models.PositiveIntegerField(
+        verbose_name=constants.MISSED_SK
+    )
+    route_time = models.IntegerField()
+    stop_time = models.IntegerField()
+    total_penalty = models.IntegerField()
+    total_time = models.IntegerField()
+    # JSON list of per-site breakdowns.
+    sites = models.TextField()
+
+    class Meta:
+        verbose_name = constants.FINAL_STANDING_SK.lower()
+        verbose_name_plural = constants.FINAL_STANDING_PLURAL_SK
+        ordering = ("event", "category_1_rank")
+        unique_together = ("event", "team")
+
+    def __str__(self):
+        return self.team
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Final standings can not be changed.")
+
+        super().save(*args, **kwargs)
+
+
+class EntryKey(models.Model):
+    """
+    Idempotency key of an applied site result entry (station entry id or
+    ingest record key); a retried upload of the entry is not applied again.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("event", "key")
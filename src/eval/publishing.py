@@ -0,0 +1,205 @@
+"""
+Static standings: category 1 and 2 standings and per-team breakdowns of an
+event rendered to HTML and JSON files any static web server can serve, so
+the public results never hit the app; see `publish`.
+"""
+import json
+import os
+import tempfile
+
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.text import slugify
+
+from eval import archive
+from eval import constants
+from eval import models
+from eval.admin import utils
+
+
+TEAMS_DIR = "teams"
+
+
+def get_state(event):
+    """
+    Changes with any published value; see `publish_standings --watch`.
+    """
+    event = models.Event.objects.get(pk=event.pk)
+    return (
+        event.is_finalized,
+        event.name,
+        models.get_latest_summary_version(),
+        list(
+            models.Result.objects.filter(event=event).values_list(
+                "pk", "team", "route_seconds"
+            )
+        ),
+    )
+
+
+def _get_page_names(standings):
+    names = {}
+    for standing in sorted(standings, key=lambda standing: standing["team"]):
+        slug = slugify(standing["team"]) or "team"
+        name, suffix = slug, 1
+        while name in names.values():
+            suffix += 1
+            name = f"{slug}-{suffix}"
+        names[standing["team"]] = name
+
+    return names
+
+
+def _write(path, content):
+    # NOTE: readers get the old or the new file, never a partial one.
+    directory = os.path.dirname(path)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=directory, delete=False
+    ) as f:
+        f.write(content)
+    # Readable by the web server.
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+
+
+def _format_total_time(standing):
+    formatted = utils.format_seconds(
+        standing["total_time"], colorful=False, signed=False
+    )
+    if standing["missed_sites"] >= constants.CATEGORY_1_MISSED_SITES_DSQ:
+        return mark_safe(f"{formatted} (DSQ)")
+
+    return formatted
+
+
+def _format_total_penalty(standing):
+    formatted = utils.format_seconds(standing["total_penalty"], "")
+    if standing["missed_sites"] >= constants.CATEGORY_2_MISSED_SITES_DSQ:
+        return mark_safe(f"{formatted} (DSQ)")
+
+    return formatted
+
+
+def _format_site(site):
+    labels = [constants.SPEED_SK, constants.PRECISION_SK, constants.TOTAL_SK]
+    values = [
+        site["time_penalty"],
+        site["precision_penalty"],
+        site["total_penalty"],
+    ]
+    # NOTE: missed sites are marked in their own column.
+    if site["correction"]:
+        labels.insert(2, constants.CORRECTION_SK)
+        values.insert(2, site["correction"])
+
+    return dict(
+        site,
+        time=utils.format_seconds(
+            site["time"] or 0, colorful=False, signed=False
+        ),
+        stop_time=utils.format_seconds(site["stop_time"], "&nbsp;"),
+        penalty=utils.format_like_table(
+            labels, [utils.format_seconds(value) for value in values]
+        ),
+    )
+
+
+def _format_standing(standing):
+    return dict(
+        standing,
+        route_time=utils.format_seconds(
+            standing["route_time"], colorful=False, signed=False
+        ),
+        stop_time=utils.format_seconds(standing["stop_time"], "&nbsp;"),
+        total_time=_format_total_time(standing),
+        total_penalty=_format_total_penalty(standing),
+        sites=[_format_site(site) for site in standing["sites"]],
+    )
+
+
+def publish(event, root):
+    """
+    Writes `index.html` (both categories), `standings.json` and a page and
+    JSON of each team into `root`; each file is replaced atomically, team
+    files before the standings linking them. Returns the number of teams.
+    """
+    teams_root = os.path.join(root, TEAMS_DIR)
+    os.makedirs(teams_root, exist_ok=True)
+
+    standings = archive.get_standings(event)
+    page_names = _get_page_names(standings)
+    published = timezone.now()
+    context = {
+        "event": event,
+        "published": published,
+        "labels": {
+            "category": constants.CATEGORY_SK,
+            "correction": constants.CORRECTION_SK,
+            "missed": constants.MISSED_SK,
+            "order": constants.ORDER_SK,
+            "penalty": constants.PENALTY_SK,
+            "route": constants.ROUTE_SK,
+            "site": constants.SITE_SK,
+            "stop_time": constants.STOP_TIME,
+            "team": constants.TEAM_SK,
+            "time": constants.TIME_SK,
+            "updated": constants.UPDATED_SK,
+            "value": constants.RESULT_SK,
+            "variant": constants.VARIANT_SK,
+        },
+    }
+    meta = {
+        "event": event.name,
+        "finalized": event.is_finalized,
+        "published": published.isoformat(),
+    }
+
+    teams = []
+    formatted = []
+    for standing in standings:
+        name = page_names[standing["team"]]
+        teams.append(dict(standing, page=f"{TEAMS_DIR}/{name}.html"))
+        formatted.append(_format_standing(teams[-1]))
+
+        path = os.path.join(teams_root, name)
+        _write(f"{path}.json", json.dumps(dict(meta, **teams[-1])))
+        _write(
+            f"{path}.html",
+            render_to_string(
+                "eval/standings/team.html",
+                dict(context, standing=formatted[-1]),
+            ),
+        )
+
+    _write(
+        os.path.join(root, "standings.json"),
+        json.dumps(dict(meta, teams=teams)),
+    )
+    _write(
+        os.path.join(root, "index.html"),
+        render_to_string(
+            "eval/standings/index.html",
+            dict(
+                context,
+                category_1=formatted,
+                category_2=sorted(
+                    formatted,
+                    key=lambda standing: standing["category_2_rank"],
+                ),
+            ),
+        ),
+    )
+
+    # Teams renamed or removed since.
+    pages = {
+        f"{name}.{extension}"
+        for name in page_names.values()
+        for extension in ("html", "json")
+    }
+    for filename in os.listdir(teams_root):
+        # NOTE: temporary files of a concurrent `publish` start with "tmp".
+        if filename not in pages and not filename.startswith("tmp"):
+            os.remove(os.path.join(teams_root, filename))
+
+    return len(standings)
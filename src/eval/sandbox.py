@@ -0,0 +1,216 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+
+from eval import models
+from eval import scoring
+from eval import snapshot
+from eval.snapshot import SITE_FIELDS, VARIANT_FIELDS
+
+
+Standing = namedtuple(
+    "Standing",
+    (
+        "team",
+        "total_time",
+        "total_penalty",
+        "missed_sites",
+        "category_1_rank",
+        "category_2_rank",
+    ),
+)
+RankChange = namedtuple(
+    "RankChange", ("team", "category", "old_rank", "new_rank")
+)
+
+
+def rank_standings(totals):
+    """
+    `totals` maps result pk --> (team, total_time, total_penalty,
+    missed_sites); ranks follow the `ResultAdmin` category ordering.
+    """
+    orderings = {
+        pk: models.get_category_orderings(*values[1:])
+        for pk, values in totals.items()
+    }
+
+    def category_1_key(pk):
+        return orderings[pk]["category_1_ordering"], pk
+
+    def category_2_key(pk):
+        return orderings[pk]["category_2_ordering"], pk
+
+    category_1 = sorted(totals, key=category_1_key)
+    category_2 = {
+        pk: rank
+        for rank, pk in enumerate(sorted(totals, key=category_2_key), start=1)
+    }
+
+    return {
+        pk: Standing(*totals[pk], rank, category_2[pk])
+        for rank, pk in enumerate(category_1, start=1)
+    }
+
+
+class Sandbox:
+    """
+    In-memory copy of an event (the active one by default) for "what if"
+    rescoring. The data are loaded once; `rescore` and `compare` never touch
+    the database.
+
+    Overrides are given per site number, e.g.
+    `{3: {"deviation_tolerance": lambda value: value + 0.5}}`; values can be
+    constants or callables taking the current value. Variant fields apply to
+    all variants of the site.
+    """
+
+    def __init__(self, event=None):
+        self.event = event or models.get_active_event()
+
+        sites = models.Site.objects.filter(event=self.event)
+        self.sites = {
+            values["id"]: snapshot.SiteRecord(**values)
+            for values in sites.values("id", "number", *SITE_FIELDS)
+        }
+        variants = models.SiteVariant.objects.filter(site__event=self.event)
+        self.variants = {
+            values["id"]: snapshot.VariantRecord(**values)
+            for values in variants.values("id", "site_id", *VARIANT_FIELDS)
+        }
+        results = models.Result.objects.filter(event=self.event)
+        self.results = {
+            pk: (team, route_seconds)
+            for pk, team, route_seconds in results.values_list(
+                "pk", "team", "route_seconds"
+            )
+        }
+
+        self.site_results = snapshot.SiteResultColumns()
+        site_results = models.SiteResult.objects.filter(
+            result__event=self.event
+        ).values_list(
+            "pk",
+            "result_id",
+            "site_id",
+            "variant_id",
+            "time",
+            "value",
+            "missed",
+            "stop_seconds",
+        )
+        for *ids, time, value, missed, stop_seconds in site_results.iterator():
+            # NOTE: with fractions, see `scoring.score_site_result`.
+            seconds = None if time is None else time.total_seconds()
+            stop_time = 0 if missed else -stop_seconds
+            self.site_results.append(*ids, seconds, value, missed, stop_time)
+        self._baseline = None
+
+    @property
+    def baseline(self):
+        if self._baseline is None:
+            self._baseline = self.rescore()
+
+        return self._baseline
+
+    def _apply_overrides(self, overrides):
+        sites_by_number = {site.number: pk for pk, site in self.sites.items()}
+        sites = {pk: site.copy() for pk, site in self.sites.items()}
+        variants = {
+            pk: variant.copy() for pk, variant in self.variants.items()
+        }
+
+        for number, fields in (overrides or {}).items():
+            try:
+                site_pk = sites_by_number[number]
+            except KeyError:
+                raise ValueError(f"Unknown site number: {number}.")
+
+            for field, value in fields.items():
+                if field in SITE_FIELDS:
+                    targets = [sites[site_pk]]
+                elif field in VARIANT_FIELDS:
+                    targets = [
+                        variant
+                        for variant in variants.values()
+                        if variant.site_id == site_pk
+                    ]
+                else:
+                    raise ValueError(f"Unknown field: {field}.")
+
+                for target in targets:
+                    if callable(value):
+                        current = getattr(target, field)
+                        try:
+                            setattr(target, field, value(current))
+                        except TypeError:
+                            raise ValueError(
+                                f"Site {number}: {field} is {current!r}."
+                            )
+                    else:
+                        setattr(target, field, value)
+
+        return sites, variants
+
+    def check_overrides(self, overrides):
+        """
+        Raises `ValueError` if `overrides` can't be applied.
+        """
+        self._apply_overrides(overrides)
+
+    def score_site_results(self, overrides=None, workers=1, chunk_size=1000):
+        """
+        Returns a list of (site result pk, result pk, missed,
+        `SiteResultScore`); with more `workers` chunks of site results are
+        scored in parallel processes.
+        """
+        sites, variants = self._apply_overrides(overrides)
+        score = partial(scoring.score_rows, sites, variants)
+
+        if workers <= 1:
+            return score(self.site_results)
+
+        chunks = []
+        for start in range(0, len(self.site_results), chunk_size):
+            end = start + chunk_size
+            chunks.append(self.site_results[start:end])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(chain.from_iterable(executor.map(score, chunks)))
+
+    def rescore(self, overrides=None):
+        """
+        Returns result pk --> `Standing`.
+        """
+        totals = {
+            pk: [team, route_time, 0, 0]
+            for pk, (team, route_time) in self.results.items()
+        }
+
+        for _, result_id, missed, score in self.score_site_results(overrides):
+            total = totals[result_id]
+            # NOTE: `int` as stored in `SiteResultSummary`.
+            total[1] += int(score.total_time)
+            total[2] += int(score.total_penalty)
+            total[3] += missed
+
+        return rank_standings(totals)
+
+    def compare(self, overrides):
+        """
+        Returns new standings and `RankChange`s against current data.
+        """
+        standings = self.rescore(overrides)
+        changes = []
+        for pk, standing in standings.items():
+            old = self.baseline[pk]
+            for category in (1, 2):
+                field = f"category_{category}_rank"
+                old_rank = getattr(old, field)
+                new_rank = getattr(standing, field)
+                if old_rank != new_rank:
+                    changes.append(
+                        RankChange(standing.team, category, old_rank, new_rank)
+                    )
+
+        changes.sort(key=lambda change: (change.category, change.new_rank))
+        return standings, changes
@@ -0,0 +1,257 @@
+"""
+Pure scoring rules; no Django imports, so they can run in worker processes.
+"""
+from collections import namedtuple
+from datetime import timedelta
+import math
+
+
+# NOTE: `Site.task` values; see `models.TASK_CHOICES`.
+TASK_EVAL_REPORTED_RESULT = "reported_result"
+TASK_EVAL_CORRECT_ANSWERS = "correct_answsers"
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def time_to_seconds(value):
+    """
+    Seconds since midnight of a `datetime.time`; `None` stays `None`.
+    """
+    if value is None:
+        return None
+
+    return value.hour * 60 * 60 + value.minute * 60 + value.second
+
+
+def get_duration_seconds(start_seconds, end_seconds):
+    """
+    Seconds from `start_seconds` to `end_seconds` (seconds since midnight);
+    an end before the start is on the next day.
+    """
+    return (end_seconds - start_seconds) % SECONDS_PER_DAY
+
+
+def duration_to_seconds(value):
+    """
+    Whole seconds of a `datetime.timedelta`, truncated as the time limit
+    compares them; `None` stays `None`.
+    """
+    if value is None:
+        return None
+
+    return value // timedelta(seconds=1)
+
+
+def get_time_delta(start, end):
+    return timedelta(
+        seconds=get_duration_seconds(
+            time_to_seconds(start), time_to_seconds(end)
+        )
+    )
+
+
+def calculate_stop_time(stop_time_start, stop_time_end):
+    if stop_time_end is not None and stop_time_start is not None:
+        return -get_duration_seconds(
+            time_to_seconds(stop_time_start), time_to_seconds(stop_time_end)
+        )
+
+    return 0
+
+
+def calculate_precision_penalty(
+    reference_value,
+    actual_value,
+    deviation_tolerance,
+    deviation_tolerance_penalty,
+    deviation_tolerance_max,
+    deviation_tolerance_max_penalty,
+    precision,
+):
+    """
+    Returns penalty in seconds!
+    """
+    within_tolerance = True
+    within_max_tolerance = True
+    deviation = abs(reference_value - actual_value)
+
+    if deviation <= deviation_tolerance_max:
+        if deviation <= deviation_tolerance:
+            penalty = 0
+        else:
+            # Add penalty for each unit over tolerance.
+            penalty = (
+                abs(deviation - deviation_tolerance)
+                * deviation_tolerance_penalty
+                / precision
+            )
+            within_tolerance = False
+    else:
+        penalty = deviation_tolerance_max_penalty
+        within_tolerance = False
+        within_max_tolerance = False
+
+    return round(penalty) * 60, within_tolerance, within_max_tolerance
+
+
+def calculate_time_penalty(reference_time, actual_time, per_second_penalty):
+    """
+    Returns penalty in seconds! Times are in seconds, a started second over
+    counts; faster than the reference gives a bonus (negative penalty).
+    """
+    return math.ceil(actual_time - reference_time) * per_second_penalty
+
+
+SiteResultScore = namedtuple(
+    "SiteResultScore",
+    (
+        "stop_time",
+        "time_penalty",
+        "precision_penalty",
+        "total_penalty",
+        "total_time",
+        "total_penalty_correction",
+        "within_timebox",
+        "precision_within_tolerance",
+        "precision_within_max_tolerance",
+    ),
+)
+
+
+def score_site_result(site, variant, time, value, missed, stop_time=0):
+    """
+    Scoring rules of a single site result. `site` and `variant` can be any
+    objects with `Site`/`SiteVariant` attributes, `time` is in seconds
+    (with fractions) or `None` if not reported; no database access.
+    """
+    missed_penalty = site.missed_penalty * 60
+    correct_answers = site.task == TASK_EVAL_CORRECT_ANSWERS
+
+    if missed:
+        return SiteResultScore(
+            stop_time=0,
+            time_penalty=0,
+            precision_penalty=0,
+            total_penalty=missed_penalty,
+            total_time=missed_penalty,
+            total_penalty_correction=0,
+            within_timebox=True,
+            precision_within_tolerance=True,
+            precision_within_max_tolerance=True,
+        )
+
+    within_timebox = True
+    if site.time_limit_max is not None and time is not None:
+        # NOTE: whole seconds, unlike the penalty.
+        within_timebox = int(time) < site.time_limit_max * 60
+
+    if not within_timebox:
+        # TODO check if not None!
+        time_penalty = site.time_limit_max_penalty * 60
+    elif time is None:
+        time_penalty = 0
+    else:
+        time_penalty = calculate_time_penalty(
+            site.time_limit * 60, time, site.time_limit_diff_penalty
+        )
+
+    if correct_answers:
+        within_tolerance = within_max_tolerance = True
+        # Correct answer == 1 point; 1 point == 1.5 bonus minute.
+        precision_penalty = -value * 90
+    else:
+        (
+            precision_penalty,
+            within_tolerance,
+            within_max_tolerance,
+        ) = calculate_precision_penalty(
+            variant.reference_value,
+            value,
+            variant.deviation_tolerance,
+            variant.deviation_tolerance_penalty,
+            variant.deviation_tolerance_max,
+            variant.deviation_tolerance_max_penalty,
+            variant.precision,
+        )
+        # Deviation tolerance not specified.
+        if variant.deviation_tolerance == 0:
+            within_tolerance = True
+
+    if not within_timebox:
+        precision_penalty = 0
+
+    total_penalty = precision_penalty + time_penalty
+    corrected_penalty = total_penalty
+    correction = 0
+
+    # Slow.
+    if time_penalty > 0:
+        # Not precise at all.
+        if not within_max_tolerance:
+            corrected_penalty = min(total_penalty, missed_penalty)
+        elif not correct_answers:
+            dev_max_pen = variant.deviation_tolerance_max_penalty * 60
+            # Not precise.
+            if not within_tolerance:
+                corrected_penalty = min(total_penalty, dev_max_pen)
+
+            if (
+                variant.deviation_tolerance != 0
+                and total_penalty > dev_max_pen
+            ):
+                correction = dev_max_pen - total_penalty
+    # Fast.
+    elif time_penalty < 0:
+        if not within_tolerance:
+            corrected_penalty = total_penalty - time_penalty
+            correction = -time_penalty
+
+    if not correct_answers and total_penalty > missed_penalty:
+        correction = missed_penalty - total_penalty
+
+    return SiteResultScore(
+        stop_time=stop_time,
+        time_penalty=time_penalty,
+        precision_penalty=precision_penalty,
+        total_penalty=corrected_penalty,
+        total_time=corrected_penalty + stop_time,
+        total_penalty_correction=correction,
+        within_timebox=within_timebox,
+        precision_within_tolerance=within_tolerance,
+        precision_within_max_tolerance=within_max_tolerance,
+    )
+
+
+def score_rows(sites, variants, rows):
+    """
+    Scores (pk, result pk, site pk, variant pk, time, value, missed, stop
+    time) rows, times in seconds; `sites`/`variants` map primary keys to
+    attribute objects.
+    Returns a list of (pk, result pk, missed, `SiteResultScore`).
+    """
+    return [
+        (
+            pk,
+            result_id,
+            missed,
+            score_site_result(
+                sites[site_id],
+                variants.get(variant_id),
+                time,
+                value,
+                missed,
+                stop_time,
+            ),
+        )
+        for (
+            pk,
+            result_id,
+            site_id,
+            variant_id,
+            time,
+            value,
+            missed,
+            stop_time,
+        ) in rows
+    ]
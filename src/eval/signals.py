@@ -1,33 +1,130 @@
-from django.db.models.signals import post_save
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from eval import caching
 from eval import models
+from eval import stats
+from eval.instrumentation import instrumented
+
+
+def get_result_summary(result):
+    try:
+        return result.summary
+    except ObjectDoesNotExist:
+        # Results get a summary with their first site result.
+        result.summary = models.ResultSummary(result=result)
+        return result.summary
 
 
 @receiver(post_save, sender=models.Site)
 @receiver(post_save, sender=models.SiteVariant)
+@instrumented
 def update_summaries_after_site(sender, instance, created, **kwargs):
-    for result in models.Result.objects.all():
-        for site_result in result.siteresult_set.all():
-            site_result.summary.take_fields_from_result()
+    site = instance if sender is models.Site else instance.site
+    caching.invalidate_sites(site.event_id)
+    if models.is_event_finalized(site.event_id):
+        return
+
+    # Only results of the site (and so its event) are affected.
+    site_results = site.siteresult_set.select_related(
+        "site", "variant", "summary", "result__summary"
+    )
+    results = {}
+    for site_result in site_results:
+        site_result.summary.take_fields_from_result()
+        results[site_result.result_id] = site_result.result
 
-        result.summary.take_fields_from_result()
+    for result in results.values():
+        get_result_summary(result).take_fields_from_result()
+
+    stats.update_site_statistics(site)
 
 
 @receiver(post_save, sender=models.Result)
 @receiver(post_save, sender=models.SiteResult)
+@instrumented
 def update_summaries_after_result(sender, instance, created, **kwargs):
     sender_is_site_result = sender is models.SiteResult
 
     if sender_is_site_result:
         summary = models.SiteResultSummary
+        event_pk = instance.result.event_id
     else:
         summary = models.ResultSummary
+        event_pk = instance.event_id
+
+    # Finalized events are served from `FinalStanding`s.
+    if models.is_event_finalized(event_pk):
+        return
 
     if created:
         instance.summary = summary(result=instance)
 
-    # Update `ResultSummary` after each `SiteResultSummary` change.
+    # Update `ResultSummary` after each `SiteResultSummary` change; a new
+    # version even if the totals are the same (exported columns changed).
     if sender_is_site_result:
         instance.summary.take_fields_from_result()
-        instance.result.summary.take_fields_from_result()
+        result_summary = get_result_summary(instance.result)
+        result_summary.take_fields_from_result(touch=True)
+        stats.update_site_statistics(instance.site)
+    elif not created:
+        # Route time and team of a result with site results.
+        result_summary = get_result_summary(instance)
+        if not result_summary._state.adding:
+            result_summary.take_fields_from_result(touch=True)
+
+
+@receiver(post_delete, sender=models.SiteResult)
+@instrumented
+def update_summary_after_site_result_delete(sender, instance, **kwargs):
+    # NOTE: no summary when the whole result is being deleted.
+    summary = models.ResultSummary.objects.filter(
+        result=instance.result_id, result__event__is_finalized=False
+    ).first()
+    if summary is not None:
+        summary.take_fields_from_result(touch=True)
+
+
+@receiver(post_delete, sender=models.Result)
+@instrumented
+def record_deleted_result(sender, instance, **kwargs):
+    # Reported by the delta export, see `models.DeletedResult`.
+    models.DeletedResult.objects.create(
+        event_pk=instance.event_id,
+        team=instance.team,
+        version=models.get_next_summary_version(),
+    )
+
+
+@receiver(post_delete, sender=models.Event)
+def delete_result_tombstones(sender, instance, **kwargs):
+    models.DeletedResult.objects.filter(event_pk=instance.pk).delete()
+
+
+@receiver(post_delete, sender=models.SiteResult)
+@instrumented
+def update_statistics_after_site_result_delete(sender, instance, **kwargs):
+    site = instance.site
+    if models.is_event_finalized(site.event_id):
+        return
+
+    # NOTE: the site may be being deleted too, no new rows.
+    stats.update_site_statistics(site, create=False)
+
+
+@receiver(post_save, sender=models.Result)
+@receiver(post_delete, sender=models.Result)
+@receiver(post_save, sender=models.SiteResult)
+@receiver(post_delete, sender=models.SiteResult)
+# Sites are listed in the facet counts.
+@receiver(post_save, sender=models.Site)
+@receiver(post_delete, sender=models.Site)
+def invalidate_counts(sender, **kwargs):
+    caching.invalidate_counts()
+
+
+# NOTE: variants are not in the site catalogue.
+@receiver(post_delete, sender=models.Site)
+def invalidate_sites_after_delete(sender, instance, **kwargs):
+    caching.invalidate_sites(instance.event_id)
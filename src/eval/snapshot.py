@@ -0,0 +1,131 @@
+"""
+Compact, model-free representation of an event for scoring; no Django
+imports, so it can be passed to worker processes.
+"""
+from array import array
+import math
+
+
+SITE_FIELDS = (
+    "task",
+    "time_limit",
+    "time_limit_diff_penalty",
+    "missed_penalty",
+    "time_limit_max",
+    "time_limit_max_penalty",
+)
+VARIANT_FIELDS = (
+    "reference_value",
+    "precision",
+    "deviation_tolerance",
+    "deviation_tolerance_penalty",
+    "deviation_tolerance_max",
+    "deviation_tolerance_max_penalty",
+)
+
+
+class Record:
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for field, value in values.items():
+            setattr(self, field, value)
+
+    def copy(self):
+        return type(self)(
+            **{
+                field: getattr(self, field)
+                for field in self.__slots__
+                if hasattr(self, field)
+            }
+        )
+
+
+class SiteRecord(Record):
+    __slots__ = ("id", "number") + SITE_FIELDS
+
+
+class VariantRecord(Record):
+    __slots__ = ("id", "site_id") + VARIANT_FIELDS
+
+
+# NOTE: "no value" marker, primary keys start at 1; times and values are NaN.
+NO_PK = 0
+
+
+class SiteResultColumns:
+    """
+    Site results stored column-wise in typed arrays; iterating yields
+    (pk, result pk, site pk, variant pk, time, value, missed, stop time)
+    rows as expected by `scoring.score_rows`; times in seconds (with
+    fractions).
+    """
+
+    def __init__(self):
+        self.pk = array("q")
+        self.result_id = array("q")
+        self.site_id = array("q")
+        self.variant_id = array("q")
+        self.time = array("d")
+        self.value = array("d")
+        self.missed = array("b")
+        self.stop_time = array("q")
+
+    def append(
+        self,
+        pk,
+        result_id,
+        site_id,
+        variant_id,
+        time,
+        value,
+        missed,
+        stop_time,
+    ):
+        self.pk.append(pk)
+        self.result_id.append(result_id)
+        self.site_id.append(site_id)
+        self.variant_id.append(NO_PK if variant_id is None else variant_id)
+        self.time.append(math.nan if time is None else time)
+        self.value.append(math.nan if value is None else value)
+        self.missed.append(missed)
+        self.stop_time.append(stop_time)
+
+    def __len__(self):
+        return len(self.pk)
+
+    def __getitem__(self, index):
+        """
+        Slices are columns again (e.g. chunks for worker processes).
+        """
+        if not isinstance(index, slice):
+            raise TypeError("Only slices are supported.")
+
+        columns = SiteResultColumns()
+        for name, column in vars(self).items():
+            setattr(columns, name, column[index])
+
+        return columns
+
+    def __iter__(self):
+        for row in zip(
+            self.pk,
+            self.result_id,
+            self.site_id,
+            self.variant_id,
+            self.time,
+            self.value,
+            self.missed,
+            self.stop_time,
+        ):
+            pk, result_id, site_id, variant_id, time, value, missed, stop = row
+            yield (
+                pk,
+                result_id,
+                site_id,
+                None if variant_id == NO_PK else variant_id,
+                None if math.isnan(time) else time,
+                None if math.isnan(value) else value,
+                bool(missed),
+                stop,
+            )
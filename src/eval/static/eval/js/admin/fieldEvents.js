@@ -24,6 +24,275 @@ function autoAddColonToTimeFields() {
   });
 }
 
+// Live penalty preview; the rules are `eval.scoring.score_site_result` and
+// must be kept in sync with it.
+
+function roundHalfEven(value) {
+  // Python's `round`.
+  var rounded = Math.round(value);
+  if (Math.abs(value % 1) === 0.5 && rounded % 2 !== 0) {
+    rounded -= 1;
+  }
+  return rounded;
+}
+
+function parseDuration(value) {
+  // Subset of Django's `parse_duration`: [[hh:]mm:]ss[.ffffff].
+  var match = /^(?:(\d+):(?=\d+:\d+))?(?:(\d+):)?(\d+(?:\.\d+)?)$/.exec(
+    value.trim()
+  );
+  if (!match) {
+    return null;
+  }
+  var hours = parseInt(match[1] || "0", 10);
+  var minutes = parseInt(match[2] || "0", 10);
+  return hours * 3600 + minutes * 60 + parseFloat(match[3]);
+}
+
+function parseFloatValue(value) {
+  value = value.trim();
+  if (value === "" || isNaN(Number(value))) {
+    return null;
+  }
+  return Number(value);
+}
+
+function calculatePrecisionPenalty(variant, value) {
+  var withinTolerance = true;
+  var withinMaxTolerance = true;
+  var penalty = 0;
+  var deviation = Math.abs(variant.reference_value - value);
+
+  if (deviation <= variant.deviation_tolerance_max) {
+    if (deviation > variant.deviation_tolerance) {
+      // Add penalty for each unit over tolerance.
+      penalty =
+        (Math.abs(deviation - variant.deviation_tolerance) *
+          variant.deviation_tolerance_penalty) /
+        variant.precision;
+      withinTolerance = false;
+    }
+  } else {
+    penalty = variant.deviation_tolerance_max_penalty;
+    withinTolerance = false;
+    withinMaxTolerance = false;
+  }
+
+  return [roundHalfEven(penalty) * 60, withinTolerance, withinMaxTolerance];
+}
+
+function calculateTimePenalty(referenceSeconds, seconds, perSecondPenalty) {
+  // A started second over counts.
+  return Math.ceil(seconds - referenceSeconds) * perSecondPenalty;
+}
+
+function scoreSiteResult(site, variant, seconds, value, missed, correctAnswers) {
+  // Returns null if the site result can't be scored (yet).
+  var missedPenalty = site.missed_penalty * 60;
+
+  if (missed) {
+    return {
+      timePenalty: 0,
+      precisionPenalty: 0,
+      missedPenalty: missedPenalty,
+      totalPenalty: missedPenalty,
+      correction: 0
+    };
+  }
+  if (seconds === null || value === null) {
+    return null;
+  }
+  if (!correctAnswers && !variant) {
+    return null;
+  }
+
+  var withinTimebox = true;
+  if (site.time_limit_max !== null) {
+    // Whole seconds, unlike the penalty.
+    withinTimebox = Math.floor(seconds) < site.time_limit_max * 60;
+  }
+
+  var timePenalty;
+  if (!withinTimebox) {
+    if (site.time_limit_max_penalty === null) {
+      return null;
+    }
+    timePenalty = site.time_limit_max_penalty * 60;
+  } else {
+    timePenalty = calculateTimePenalty(
+      site.time_limit * 60,
+      seconds,
+      site.time_limit_diff_penalty
+    );
+  }
+
+  var precisionPenalty, withinTolerance, withinMaxTolerance;
+  if (correctAnswers) {
+    withinTolerance = withinMaxTolerance = true;
+    // Correct answer == 1 point; 1 point == 1.5 bonus minute.
+    precisionPenalty = -value * 90;
+  } else {
+    var precision = calculatePrecisionPenalty(variant, value);
+    precisionPenalty = precision[0];
+    withinTolerance = precision[1];
+    withinMaxTolerance = precision[2];
+    // Deviation tolerance not specified.
+    if (variant.deviation_tolerance === 0) {
+      withinTolerance = true;
+    }
+  }
+
+  if (!withinTimebox) {
+    precisionPenalty = 0;
+  }
+
+  var totalPenalty = precisionPenalty + timePenalty;
+  var correctedPenalty = totalPenalty;
+  var correction = 0;
+
+  // Slow.
+  if (timePenalty > 0) {
+    // Not precise at all.
+    if (!withinMaxTolerance) {
+      correctedPenalty = Math.min(totalPenalty, missedPenalty);
+    } else if (!correctAnswers) {
+      var devMaxPen = variant.deviation_tolerance_max_penalty * 60;
+      // Not precise.
+      if (!withinTolerance) {
+        correctedPenalty = Math.min(totalPenalty, devMaxPen);
+      }
+      if (variant.deviation_tolerance !== 0 && totalPenalty > devMaxPen) {
+        correction = devMaxPen - totalPenalty;
+      }
+    }
+    // Fast.
+  } else if (timePenalty < 0) {
+    if (!withinTolerance) {
+      correctedPenalty = totalPenalty - timePenalty;
+      correction = -timePenalty;
+    }
+  }
+
+  if (!correctAnswers && totalPenalty > missedPenalty) {
+    correction = missedPenalty - totalPenalty;
+  }
+
+  return {
+    timePenalty: timePenalty,
+    precisionPenalty: precisionPenalty,
+    missedPenalty: null,
+    totalPenalty: correctedPenalty,
+    correction: correction
+  };
+}
+
+function formatSeconds(value) {
+  // See `eval.admin.utils.format_seconds`; values are stored as integers.
+  var color = "";
+  var sign = "&nbsp;&nbsp;";
+  value = Math.trunc(value);
+  if (value < 0) {
+    color = "green";
+    sign = "-";
+  } else if (value > 0) {
+    color = "red";
+    sign = "+";
+  }
+
+  var seconds = Math.abs(value);
+  var minutes = Math.floor((seconds % 3600) / 60);
+  var text = [
+    Math.floor(seconds / 3600),
+    (minutes < 10 ? "0" : "") + minutes,
+    (seconds % 60 < 10 ? "0" : "") + (seconds % 60)
+  ].join(":");
+  return '<span style="color: ' + color + '">' + sign + text + "</span>";
+}
+
+function formatLikeTable(labels, values) {
+  // See `eval.admin.utils.format_like_table`.
+  var text = "";
+  $.each(labels, function(index, label) {
+    var value = values[index];
+    if (index + 1 === values.length) {
+      label = "<strong>" + label + "</strong>";
+      value = "<strong>" + value + "</strong>";
+    }
+    text +=
+      '<span style="display:table-row">' +
+      '<span style="display:table-cell">' +
+      label +
+      "</span>&nbsp;" +
+      '<span style="display:table-cell">' +
+      value +
+      "</span>" +
+      "</span>";
+  });
+  return text;
+}
+
+function updatePenaltyPreview(rules, row) {
+  function field(name) {
+    return row.find("[name$='-" + name + "']");
+  }
+
+  var site = rules.sites[field("site").val()];
+  if (!site) {
+    return;
+  }
+
+  var score = scoreSiteResult(
+    site,
+    site.variants[field("variant").val()],
+    parseDuration(field("time").val() || ""),
+    parseFloatValue(field("value").val() || ""),
+    field("missed").is(":checked"),
+    site.task === rules.task_correct_answers
+  );
+
+  var preview = row.find("td.field-get_penalty .penalty-preview");
+  if (!preview.length) {
+    preview = $('<div class="penalty-preview"></div>');
+    row.find("td.field-get_penalty").append(preview);
+  }
+  if (!score) {
+    preview.empty();
+    return;
+  }
+
+  var labels = [rules.labels.speed, rules.labels.precision];
+  var values = [score.timePenalty, score.precisionPenalty];
+  if (score.missedPenalty !== null) {
+    labels.push(rules.labels.missed);
+    values.push(score.missedPenalty);
+  } else if (score.correction) {
+    labels.push(rules.labels.correction);
+    values.push(score.correction);
+  }
+  labels.push(rules.labels.total);
+  values.push(score.totalPenalty);
+
+  preview.html(
+    "<em>" +
+      rules.labels.preview +
+      "</em>" +
+      formatLikeTable(labels, $.map(values, formatSeconds))
+  );
+}
+
+function livePenaltyPreview() {
+  var rulesElement = document.getElementById("scoring-rules");
+  if (!rulesElement) {
+    return;
+  }
+  var rules = JSON.parse(rulesElement.textContent);
+
+  $(document).on("input change", "tr.form-row :input", function() {
+    updatePenaltyPreview(rules, $(this).closest("tr"));
+  });
+}
+
 $(document).ready(function() {
   autoAddColonToTimeFields();
+  livePenaltyPreview();
 });
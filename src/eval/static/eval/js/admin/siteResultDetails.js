@@ -0,0 +1,16 @@
+var $ = django.jQuery;
+
+function loadSiteResultDetails(event) {
+  event.preventDefault();
+
+  var row = $(this).closest("tr");
+  $.getJSON(this.href, function(columns) {
+    $.each(columns, function(field, html) {
+      row.find("td.field-" + field + " p").html(html);
+    });
+  });
+}
+
+$(document).ready(function() {
+  $(document).on("click", "a.site-result-details", loadSiteResultDetails);
+});
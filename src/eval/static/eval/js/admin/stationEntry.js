@@ -0,0 +1,265 @@
+// Station entry: entries are queued in `localStorage` (they survive reloads
+// and lost connectivity) and synced in batches whenever the server is
+// reachable; see `eval.stations`. Builds on `fieldEvents.js`.
+
+var SYNC_INTERVAL = 15000;
+
+function loadQueue(config) {
+  try {
+    return JSON.parse(localStorage.getItem(config.storageKey)) || [];
+  } catch (e) {
+    return [];
+  }
+}
+
+function saveQueue(config, queue) {
+  localStorage.setItem(config.storageKey, JSON.stringify(queue));
+}
+
+function newEntryId() {
+  return (
+    Date.now().toString(36) +
+    Math.random()
+      .toString(36)
+      .slice(2, 8)
+  );
+}
+
+function readEntry(form) {
+  function value(name) {
+    var field = form.find("[name='entry-" + name + "']");
+    return field.length ? $.trim(field.val()) : "";
+  }
+
+  return {
+    id: newEntryId(),
+    result: parseInt(value("result"), 10),
+    variant: value("variant") ? parseInt(value("variant"), 10) : null,
+    missed: form.find("[name='entry-missed']").is(":checked"),
+    time: value("time"),
+    value: value("value"),
+    stop_time_start: value("stop_time_start"),
+    stop_time_end: value("stop_time_end"),
+    errors: null
+  };
+}
+
+function fillForm(form, entry) {
+  $.each(entry, function(name, value) {
+    var field = form.find("[name='entry-" + name + "']");
+    if (name === "missed") {
+      field.prop("checked", value);
+    } else if (field.length && value !== null) {
+      field.val(value);
+    }
+  });
+  form.find(":input").first().trigger("change");
+}
+
+function clearForm(form) {
+  form.find("input[type='text']").val("");
+  form.find("[name='entry-missed']").prop("checked", false);
+  form.find("[name='entry-result']").val("");
+  form.find(".penalty-preview").empty();
+}
+
+function formatErrors(errors) {
+  var messages = [];
+  $.each(errors, function(field, fieldErrors) {
+    $.each(fieldErrors, function() {
+      messages.push((field === "__all__" ? "" : field + ": ") + this.message);
+    });
+  });
+  return messages.join(" ");
+}
+
+function renderQueue(config, queue, form) {
+  var teams = {};
+  form.find("[name='entry-result'] option").each(function() {
+    teams[this.value] = $(this).text();
+  });
+
+  var body = $("#station-queue tbody").empty();
+  $.each(queue, function(index, entry) {
+    var status = entry.errors
+      ? config.labels.rejected + ": " + formatErrors(entry.errors)
+      : config.labels.pending;
+    var edit = $('<a href="#"></a>')
+      .text(config.labels.edit)
+      .on("click", function(event) {
+        event.preventDefault();
+        // Back to the form; queued again on submit.
+        var current = loadQueue(config);
+        saveQueue(
+          config,
+          $.grep(current, function(item) {
+            return item.id !== entry.id;
+          })
+        );
+        fillForm(form, entry);
+        renderQueue(config, loadQueue(config), form);
+      });
+
+    $("<tr></tr>")
+      .toggleClass("errornote", Boolean(entry.errors))
+      .append($("<td></td>").text(teams[entry.result] || entry.result))
+      .append($("<td></td>").text(entry.time))
+      .append($("<td></td>").text(entry.value))
+      .append($("<td></td>").text(entry.missed ? config.labels.missed : ""))
+      .append($("<td></td>").text(status))
+      .append($("<td></td>").append(edit))
+      .appendTo(body);
+  });
+}
+
+function markEntered(form, resultPks) {
+  $.each(resultPks, function() {
+    var option = form.find("[name='entry-result'] option[value='" + this + "']");
+    if (option.length && option.text().indexOf("✓") === -1) {
+      option.text(option.text() + " ✓");
+    }
+  });
+}
+
+function StationSync(config, form) {
+  var syncing = false;
+  var status = $("#station-status");
+
+  function setStatus(text) {
+    status.text(text);
+  }
+
+  function sync() {
+    var queue = loadQueue(config);
+    // Rejected entries wait for a correction.
+    var batch = $.grep(queue, function(entry) {
+      return !entry.errors;
+    }).slice(0, config.batchSize);
+    if (syncing || !batch.length) {
+      return;
+    }
+
+    syncing = true;
+    var more = false;
+    $.ajax({
+      url: config.syncUrl,
+      type: "POST",
+      contentType: "application/json",
+      // NOTE: anything else (e.g. the login page) is a failure.
+      dataType: "json",
+      headers: {
+        "X-CSRFToken": form.find("[name='csrfmiddlewaretoken']").val()
+      },
+      data: JSON.stringify({
+        entries: $.map(batch, function(entry) {
+          return $.extend({}, entry, { errors: undefined });
+        })
+      })
+    })
+      // NOTE: unlike `done`, an error in the handler rejects too.
+      .then(function(response) {
+        var applied = {};
+        var entered = [];
+        $.each(response.applied, function() {
+          applied[this] = true;
+        });
+
+        // NOTE: entries queued while syncing are kept.
+        queue = $.grep(loadQueue(config), function(entry) {
+          if (applied[entry.id]) {
+            entered.push(entry.result);
+            return false;
+          }
+          if (response.errors[entry.id]) {
+            entry.errors = response.errors[entry.id];
+          }
+          return true;
+        });
+        saveQueue(config, queue);
+        markEntered(form, entered);
+        renderQueue(config, queue, form);
+        setStatus(config.labels.synced + ": " + response.applied.length);
+
+        // More than one batch queued.
+        more = batch.length === config.batchSize;
+      })
+      .fail(function() {
+        setStatus(config.labels.offline);
+      })
+      .always(function() {
+        syncing = false;
+        if (more) {
+          sync();
+        }
+      });
+  }
+
+  return sync;
+}
+
+function stationPenaltyPreview(config, rules, form) {
+  var site = rules.sites[config.site];
+  var preview = form.find(".penalty-preview");
+
+  form.on("input change", ":input", function() {
+    var variant = form.find("[name='entry-variant']");
+    var score = scoreSiteResult(
+      site,
+      site.variants[variant.length ? variant.val() : ""],
+      parseDuration(form.find("[name='entry-time']").val() || ""),
+      parseFloatValue(form.find("[name='entry-value']").val() || ""),
+      form.find("[name='entry-missed']").is(":checked"),
+      site.task === rules.task_correct_answers
+    );
+    if (!score) {
+      preview.empty();
+      return;
+    }
+
+    preview.html(
+      formatLikeTable(
+        [rules.labels.speed, rules.labels.precision, rules.labels.total],
+        $.map(
+          [score.timePenalty, score.precisionPenalty, score.totalPenalty],
+          formatSeconds
+        )
+      )
+    );
+  });
+}
+
+function stationEntry() {
+  var configElement = document.getElementById("station-config");
+  if (!configElement) {
+    return;
+  }
+  var config = JSON.parse(configElement.textContent);
+  var rules = JSON.parse(
+    document.getElementById("station-scoring-rules").textContent
+  );
+  var form = $("#station-entry");
+  var sync = StationSync(config, form);
+
+  form.on("submit", function(event) {
+    event.preventDefault();
+    var entry = readEntry(form);
+    if (isNaN(entry.result)) {
+      return;
+    }
+
+    var queue = loadQueue(config);
+    queue.push(entry);
+    saveQueue(config, queue);
+    clearForm(form);
+    renderQueue(config, queue, form);
+    sync();
+  });
+
+  stationPenaltyPreview(config, rules, form);
+  renderQueue(config, loadQueue(config), form);
+  $(window).on("online", sync);
+  setInterval(sync, SYNC_INTERVAL);
+  sync();
+}
+
+$(document).ready(stationEntry);
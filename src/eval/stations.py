@@ -0,0 +1,255 @@
+"""
+Station entry: site results of one site entered at its station, queued in
+the browser while offline (see `stationEntry.js`) and synced in batches;
+a batch is applied in one transaction with one rescoring pass. Entry ids
+are idempotency keys, a retried batch is not applied twice.
+"""
+from collections import namedtuple
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+from eval import caching
+from eval import constants
+from eval import models
+from eval import signals
+from eval import stats
+from eval import verification
+from ig5_site.sqlite3.transaction import atomic_write
+
+
+ENTRY_FIELDS = (
+    "variant",
+    "missed",
+    "time",
+    "value",
+    "stop_time_start",
+    "stop_time_end",
+)
+SITE_RESULT_FIELDS = ENTRY_FIELDS + ("time_seconds", "stop_seconds")
+KEY_MAX_LENGTH = models.EntryKey._meta.get_field("key").max_length
+# Entries per sync request, see `stationEntry.js`.
+MAX_BATCH_SIZE = 100
+
+# Keys of the applied, already applied (skipped) and rejected entries (key
+# --> field errors); pks of the written results.
+Written = namedtuple(
+    "Written", ("applied", "duplicates", "errors", "result_pks")
+)
+
+
+def get_entry_errors(cleaned_data, has_variants):
+    """
+    Field --> error of values required for a site result that's not missed;
+    shared with the result change form.
+    """
+    if cleaned_data.get("missed"):
+        return {}
+
+    required = {"time": _("Zadajte hodnotu."), "value": _("Zadajte hodnotu.")}
+    if has_variants:
+        required["variant"] = _("Vyberte jednu z možností.")
+
+    return {
+        field: error
+        for field, error in required.items()
+        if cleaned_data.get(field) is None
+    }
+
+
+class EntryForm(forms.ModelForm):
+    """
+    A station entry of a team; the same rules as the result change form.
+    """
+
+    class Meta:
+        model = models.SiteResult
+        fields = ENTRY_FIELDS
+
+    def __init__(self, *args, site, variants, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.variants = variants
+        # NOTE: variants of the site are loaded once per batch.
+        variant = self.fields["variant"]
+        variant.queryset = models.SiteVariant.objects.filter(site=site)
+        variant.choices = [("", variant.empty_label)] + [
+            (pk, str(site_variant)) for pk, site_variant in variants.items()
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        errors = get_entry_errors(cleaned_data, bool(self.variants))
+        for field, error in errors.items():
+            # Not again for invalid values.
+            if field not in self.errors:
+                self.add_error(field, ValidationError(error))
+
+        return cleaned_data
+
+
+def _get_entry_data(entry):
+    # NOTE: booleans come as JSON, the form expects browser form values.
+    data = {field: entry.get(field) for field in ENTRY_FIELDS}
+    data["missed"] = bool(data["missed"])
+    return {
+        field: "" if value is None else value for field, value in data.items()
+    }
+
+
+def _get_result_pk(entry):
+    pk = entry.get("result")
+    return pk if isinstance(pk, int) else None
+
+
+def _get_entry_key(entry):
+    key = entry.get("id")
+    if isinstance(key, str) and 0 < len(key) <= KEY_MAX_LENGTH:
+        return key
+
+    return None
+
+
+def rescore(scope):
+    """
+    Rescores site results of `scope`, site --> result pks, after a bulk
+    write: their summaries, their results' summaries (once per team) and the
+    statistics of the sites.
+    """
+    results = {}
+    for site, result_pks in scope.items():
+        site_results = site.siteresult_set.filter(
+            result__in=result_pks
+        ).select_related("variant", "summary", "result__summary")
+
+        created, updated = [], {}
+        for site_result in site_results:
+            # Already loaded.
+            site_result.site = site
+            values = verification.get_summary_values(site_result.get_score())
+            if hasattr(site_result, constants.SUMMARY):
+                updated[site_result.pk] = values
+            else:
+                created.append(
+                    models.SiteResultSummary(result=site_result, **values)
+                )
+            results[site_result.result_id] = site_result.result
+
+        models.SiteResultSummary.objects.bulk_create(created)
+        verification.bulk_update(
+            models.SiteResultSummary, updated, verification.SUMMARY_FIELDS
+        )
+
+    # NOTE: written site results are exported again, see `signals`.
+    for result in results.values():
+        signals.get_result_summary(result).take_fields_from_result(touch=True)
+
+    for site in scope:
+        stats.update_site_statistics(site)
+    caching.invalidate_counts()
+
+
+def write_entries(site, entries):
+    """
+    Creates or updates the site results of `entries`, dicts with a client
+    `id` (the idempotency key), a `result` pk and `ENTRY_FIELDS` values; a
+    later entry of the same team wins. Written in bulk and not rescored, see
+    `rescore`; call in a transaction.
+    """
+    result_pks = [_get_result_pk(entry) for entry in entries]
+    results = models.Result.objects.filter(
+        event=site.event_id, pk__in=[pk for pk in result_pks if pk]
+    ).in_bulk()
+    existing = {
+        site_result.result_id: site_result
+        for site_result in site.siteresult_set.filter(
+            result__in=list(results)
+        )
+    }
+    variants = {
+        variant.pk: variant for variant in site.sitevariant_set.all()
+    }
+    keys = {_get_entry_key(entry) for entry in entries}
+    applied_keys = set(
+        models.EntryKey.objects.filter(
+            event=site.event_id, key__in=keys - {None}
+        ).values_list("key", flat=True)
+    )
+
+    written = Written([], [], {}, [])
+    site_results = {}
+    for entry, result_pk in zip(entries, result_pks):
+        key = _get_entry_key(entry)
+        if key is None:
+            # NOTE: JSON object keys are strings.
+            written.errors[str(entry.get("id"))] = {
+                "id": [_("Neplatný kľúč.")]
+            }
+            continue
+        if key in applied_keys:
+            written.duplicates.append(key)
+            continue
+
+        result = results.get(result_pk)
+        if result is None:
+            written.errors[key] = {"result": [_("Neznámy tím.")]}
+            continue
+
+        site_result = site_results.get(result.pk) or existing.get(result.pk)
+        form = EntryForm(
+            _get_entry_data(entry),
+            instance=site_result
+            or models.SiteResult(site=site, result=result),
+            site=site,
+            variants=variants,
+        )
+        if not form.is_valid():
+            written.errors[key] = form.errors.get_json_data()
+            continue
+
+        site_result = form.save(commit=False)
+        site_result.set_seconds()
+        site_results[result.pk] = site_result
+        applied_keys.add(key)
+        written.applied.append(key)
+
+    # NOTE: written without `post_save` signals.
+    models.SiteResult.objects.bulk_create(
+        site_result
+        for site_result in site_results.values()
+        if site_result.pk is None
+    )
+    verification.bulk_update(
+        models.SiteResult,
+        {
+            site_result.pk: {
+                field: getattr(
+                    site_result, site_result._meta.get_field(field).attname
+                )
+                for field in SITE_RESULT_FIELDS
+            }
+            for site_result in site_results.values()
+            if site_result.pk is not None
+        },
+        SITE_RESULT_FIELDS,
+    )
+    # A concurrent upload of the same key fails here, see `EntryKey`.
+    models.EntryKey.objects.bulk_create(
+        models.EntryKey(event_id=site.event_id, key=key)
+        for key in written.applied
+    )
+    written.result_pks.extend(site_results)
+
+    return written
+
+
+@atomic_write()
+def apply_entries(site, entries):
+    """
+    Writes `entries` of the site and rescores once; returns `Written`.
+    """
+    written = write_entries(site, entries)
+    if written.result_pks:
+        rescore({site: written.result_pks})
+
+    return written
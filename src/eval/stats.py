@@ -0,0 +1,217 @@
+"""
+Per site statistics, recomputed by aggregate queries over the site's results
+whenever they change; see `models.SiteStatistics`.
+"""
+import math
+
+from django.db.models import (
+    Avg,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Max,
+    Min,
+    Q,
+    Sum,
+)
+from django.db.models.functions import Least
+
+from eval import constants
+from eval import models
+
+
+STATISTICS_FIELDS = (
+    "results_count",
+    "missed_count",
+    "time_avg",
+    "time_min",
+    "time_max",
+    "deviation_avg",
+    "deviation_std",
+    "deviation_min",
+    "deviation_max",
+    "outside_tolerance_count",
+    "outside_max_tolerance_count",
+    "over_time_limit_max_count",
+    "total_penalty_avg",
+)
+
+
+class AbsExceeds(Func):
+    """
+    1 if |first| > second, else 0; Django 2.1 can't compare two expressions
+    in `Q` objects.
+    """
+
+    arg_joiner = ") > "
+    template = "CASE WHEN ABS(%(expressions)s THEN 1 ELSE 0 END"
+    output_field = IntegerField()
+
+
+def _get_aggregates(site):
+    reported = Q(missed=False)
+    deviation = ExpressionWrapper(
+        F("value") - F("variant__reference_value"), output_field=FloatField()
+    )
+    has_deviation = reported & Q(value__isnull=False, variant__isnull=False)
+
+    # NOTE: the same rules as in `scoring.score_site_result`; a deviation
+    # tolerance of 0 means it's not specified.
+    outside_max_tolerance = AbsExceeds(
+        deviation, F("variant__deviation_tolerance_max")
+    )
+    outside_tolerance = AbsExceeds(
+        deviation,
+        Least(
+            "variant__deviation_tolerance", "variant__deviation_tolerance_max"
+        ),
+    )
+    tolerance_specified = ~Q(variant__deviation_tolerance=0)
+
+    if site.time_limit_max is None:
+        over_time_limit_max = Q(pk__isnull=True)
+    else:
+        over_time_limit_max = Q(time_seconds__gte=site.time_limit_max * 60)
+
+    return {
+        "results_count": Count("pk"),
+        "missed_count": Count("pk", filter=Q(missed=True)),
+        "time_avg": Avg("time_seconds", filter=reported),
+        "time_min": Min("time_seconds", filter=reported),
+        "time_max": Max("time_seconds", filter=reported),
+        "deviation_avg": Avg(deviation, filter=has_deviation),
+        "deviation_sq_avg": Avg(deviation * deviation, filter=has_deviation),
+        "deviation_min": Min(deviation, filter=has_deviation),
+        "deviation_max": Max(deviation, filter=has_deviation),
+        "outside_tolerance_count": Sum(
+            outside_tolerance, filter=has_deviation & tolerance_specified
+        ),
+        "outside_max_tolerance_count": Sum(
+            outside_max_tolerance, filter=has_deviation
+        ),
+        "over_time_limit_max_count": Count(
+            "pk", filter=reported & over_time_limit_max
+        ),
+        "total_penalty_avg": Avg("summary__total_penalty"),
+    }
+
+
+def _get_fields(values):
+    # Spread from E[x^2] - E[x]^2; `StdDev` is not available in SQLite.
+    deviation_std = None
+    if values["deviation_avg"] is not None:
+        variance = values["deviation_sq_avg"] - values["deviation_avg"] ** 2
+        deviation_std = math.sqrt(max(variance, 0))
+
+    return {
+        "results_count": values["results_count"] or 0,
+        "missed_count": values["missed_count"] or 0,
+        "time_avg": values["time_avg"],
+        "time_min": values["time_min"],
+        "time_max": values["time_max"],
+        "deviation_avg": values["deviation_avg"],
+        "deviation_std": deviation_std,
+        "deviation_min": values["deviation_min"],
+        "deviation_max": values["deviation_max"],
+        "outside_tolerance_count": values["outside_tolerance_count"] or 0,
+        "outside_max_tolerance_count": (
+            values["outside_max_tolerance_count"] or 0
+        ),
+        "over_time_limit_max_count": values["over_time_limit_max_count"] or 0,
+        "total_penalty_avg": values["total_penalty_avg"],
+    }
+
+
+def update_site_statistics(site, create=True):
+    """
+    Recomputes statistics of the site and each of its variants; with
+    `create=False` only existing rows are updated (site results being
+    deleted along with their site).
+    """
+    site_results = models.SiteResult.objects.filter(site=site)
+    aggregates = _get_aggregates(site)
+
+    # Variants without results still get (empty) statistics.
+    empty = dict.fromkeys(aggregates)
+    rows = {
+        variant_pk: empty
+        for variant_pk in site.sitevariant_set.values_list("pk", flat=True)
+    }
+    variants = site_results.filter(variant__isnull=False).values("variant")
+    for values in variants.annotate(**aggregates):
+        rows[values.pop("variant")] = values
+    rows[None] = site_results.aggregate(**aggregates)
+
+    existing = set(site.statistics.values_list("variant", flat=True))
+    for variant_pk, values in rows.items():
+        fields = _get_fields(values)
+        if variant_pk in existing:
+            site.statistics.filter(variant=variant_pk).update(**fields)
+        elif create:
+            models.SiteStatistics.objects.create(
+                site=site, variant_id=variant_pk, **fields
+            )
+
+
+def update_event_statistics(event):
+    for site in models.Site.objects.filter(event=event):
+        update_site_statistics(site)
+
+
+def get_event_statistics(event):
+    """
+    Stored statistics of the event's sites, e.g. for JSON reports.
+    """
+    sites = {}
+    statistics = models.SiteStatistics.objects.filter(
+        site__event=event
+    ).select_related("site", "variant")
+    for row in statistics.order_by("site__number", "variant__name"):
+        site = sites.setdefault(
+            row.site.number,
+            {"number": row.site.number, "name": row.site.name, "variants": []},
+        )
+        values = {field: getattr(row, field) for field in STATISTICS_FIELDS}
+        if row.variant is None:
+            site.update(values)
+        else:
+            site["variants"].append(dict(values, name=row.variant.name))
+
+    return list(sites.values())
+
+
+def get_facet_counts(event):
+    """
+    Teams disqualified per category, by the stored (indexed) missed sites
+    counts, and missed results per site, from the stored statistics; see
+    `ResultAdmin.changelist_view`.
+    """
+    disqualified = models.ResultSummary.objects.filter(
+        result__event=event
+    ).aggregate(
+        category_1=Count(
+            "pk",
+            filter=Q(
+                missed_sites__gte=constants.CATEGORY_1_MISSED_SITES_DSQ
+            ),
+        ),
+        category_2=Count(
+            "pk",
+            filter=Q(
+                missed_sites__gte=constants.CATEGORY_2_MISSED_SITES_DSQ
+            ),
+        ),
+    )
+    missed = models.SiteStatistics.objects.filter(
+        site__event=event, variant=None
+    ).order_by("site__number")
+
+    return {
+        "disqualified": disqualified,
+        "missed": list(
+            missed.values_list("site__number", "site__name", "missed_count")
+        ),
+    }
@@ -7,10 +7,20 @@ from eval import models
 now = datetime.now()
 
 
+def get_active_event():
+    # NOTE: transaction test cases flush the event of the migrations.
+    event = models.get_active_event()
+    if event is None:
+        event = models.Event.objects.create(name="IG5", is_active=True)
+
+    return event
+
+
 class ResultFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = models.Result
 
+    event = factory.LazyFunction(get_active_event)
     team = factory.Sequence(lambda n: f"Team {n}")
     start = now.time()
     finish = (now + timedelta(hours=3)).time()
@@ -20,5 +30,6 @@ class SiteFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = models.Site
 
+    event = factory.LazyFunction(get_active_event)
     number = factory.Sequence(lambda n: n)
     name = factory.Sequence(lambda n: f"site {n}")
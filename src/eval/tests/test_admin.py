@@ -0,0 +1,322 @@
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from eval import caching
+from eval import constants
+from eval import models
+from eval.admin import ResultAdmin
+from eval.admin import columns
+from eval.admin import utils
+from eval.tests.factories import ResultFactory, SiteFactory
+from eval.tests.test_models import ResultBase
+
+
+class SiteResultInlineTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.result = ResultFactory.create()
+        for site in (self.site1, self.site2, self.site3):
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=5 * 60),
+                value=12,
+                site=site,
+                variant=site.sitevariant_set.first(),
+                result=self.result,
+            )
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+        self.url = reverse("admin:eval_result_change", args=[self.result.pk])
+
+    def _add_site_result(self):
+        site = SiteFactory.create(
+            task=models.TASK_EVAL_CORRECT_ANSWERS,
+            time_limit=5,
+            time_limit_diff_penalty=1,
+            missed_penalty=5,
+        )
+        models.SiteResult.objects.create(
+            time=timedelta(seconds=5 * 60),
+            value=3,
+            site=site,
+            result=self.result,
+        )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_queries_independent_of_sites_count(self):
+        # NOTE: the site columns are rebuilt on the first request after a
+        # site change only.
+        self.client.get(self.url)
+        queries = self._count_queries(self.url)
+        for _ in range(3):
+            self._add_site_result()
+
+        self.client.get(self.url)
+        self.assertEqual(self._count_queries(self.url), queries)
+
+    def test_compact_mode(self):
+        site_result = self.result.siteresult_set.get(site=self.site1)
+        details_url = reverse(
+            "admin:eval_result_site_result", args=[site_result.pk]
+        )
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, details_url)
+
+        response = self.client.get(f"{self.url}?compact=1")
+        self.assertContains(response, details_url)
+
+        columns = self.client.get(details_url).json()
+        self.assertEqual(set(columns), {"get_penalty", "get_time"})
+        self.assertIn("+0:35:00", columns["get_penalty"])
+
+    def test_compact_mode_by_sites_count(self):
+        with mock.patch.object(constants, "COMPACT_SITE_RESULTS_MIN_SITES", 3):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "site-result-details")
+
+
+class ScoringRulesTestCase(ResultBase, TestCase):
+    def test_scoring_rules(self):
+        rules = utils.get_scoring_rules(models.get_active_event())
+
+        self.assertEqual(
+            set(rules["sites"]), {self.site1.pk, self.site2.pk, self.site3.pk}
+        )
+        site = rules["sites"][self.site1.pk]
+        self.assertEqual(site["time_limit"], 5)
+        variant = self.site1.sitevariant_set.get()
+        self.assertEqual(site["variants"][variant.pk]["reference_value"], 123)
+        self.assertEqual(rules["sites"][self.site3.pk]["variants"], {})
+
+    def test_scoring_rules_in_change_form(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+        response = self.client.get(reverse("admin:eval_result_add"))
+        self.assertContains(response, 'id="scoring-rules"')
+
+
+class ResultChangelistTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.results = [ResultFactory.create() for _ in range(7)]
+        # Equal totals for pairs of teams; the last one has no site results.
+        for index, result in enumerate(self.results[:-1]):
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=(index // 2 + 7) * 60),
+                value=12,
+                site=self.site3,
+                result=result,
+            )
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+        self.url = reverse("admin:eval_result_changelist")
+
+    def _get_teams(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        changelist = response.context["cl"]
+        teams = [result.team for result in changelist.result_list]
+        return teams, changelist
+
+    @mock.patch.object(ResultAdmin, "list_per_page", 3)
+    def test_keyset_pagination(self):
+        teams, changelist = self._get_teams(self.url)
+        self.assertEqual(changelist.result_count, 7)
+
+        while changelist.get_next_page_url():
+            page, changelist = self._get_teams(
+                self.url + changelist.get_next_page_url()
+            )
+            teams.extend(page)
+
+        expected = [self.results[-1]] + sorted(
+            self.results[:-1],
+            key=lambda result: (result.summary.total_time, result.pk),
+        )
+        self.assertEqual(teams, [result.team for result in expected])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{self.url}?after=x")
+        self.assertRedirects(response, f"{self.url}?e=1")
+
+    def test_cached_count(self):
+        changelist = self._get_teams(self.url)[1]
+        queryset = changelist.queryset
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(caching.get_cached_count(queryset), 7)
+        self.assertEqual(len(context.captured_queries), 0)
+
+        ResultFactory.create()
+        self.assertEqual(caching.get_cached_count(queryset), 8)
+
+    def test_search(self):
+        result = self.results[0]
+        result.team = "Žabí Tím"
+        result.save()
+
+        for term in ("zabi", "ŽABÍ t", " žabí  tím ", "tim", "TÍ"):
+            teams = self._get_teams(f"{self.url}?{urlencode({'q': term})}")[0]
+            self.assertEqual(teams, ["Žabí Tím"])
+        self.assertEqual(self._get_teams(f"{self.url}?q=abi")[0], [])
+        self.assertEqual(len(self._get_teams(f"{self.url}?q=team")[0]), 6)
+
+    def test_missed_sites_filters(self):
+        for result, sites in (
+            (self.results[0], [self.site1]),
+            (self.results[1], [self.site1, self.site2]),
+        ):
+            for site in sites:
+                models.SiteResult.objects.create(
+                    missed=True, site=site, result=result
+                )
+        first, second = self.results[0].team, self.results[1].team
+
+        def get_teams(query):
+            return set(self._get_teams(f"{self.url}?{query}")[0])
+
+        changelist = self._get_teams(self.url)[1]
+        missed_sites = changelist.filter_specs[2]
+        self.assertEqual(
+            [lookup for lookup, _ in missed_sites.lookup_choices], [0, 1, 2]
+        )
+        self.assertEqual(get_teams("missed_sites=1"), {first})
+        self.assertEqual(get_teams("missed_sites=2"), {second})
+        self.assertEqual(len(get_teams("missed_sites=0")), 5)
+        self.assertEqual(get_teams("dsq=1"), {first, second})
+        self.assertEqual(get_teams("dsq=2"), {second})
+        self.assertEqual(get_teams("dsq=no"), get_teams("missed_sites=0"))
+
+        response = self.client.get(f"{self.url}?missed_sites=x")
+        self.assertRedirects(response, f"{self.url}?e=1")
+
+    def test_facet_counts(self):
+        for result, site in (
+            (self.results[0], self.site1),
+            (self.results[1], self.site1),
+            (self.results[1], self.site2),
+        ):
+            models.SiteResult.objects.create(
+                missed=True, site=site, result=result
+            )
+        event = models.get_active_event()
+
+        response = self.client.get(self.url)
+        (_, disqualified), (_, missed) = response.context["facets"]
+        self.assertEqual([count for _, count, _ in disqualified], [2, 1])
+        self.assertEqual(
+            [(label, count) for label, count, _ in missed],
+            [
+                (f"ST{site.number} {site.name}", count)
+                for site, count in (
+                    (self.site1, 2),
+                    (self.site2, 1),
+                    (self.site3, 0),
+                )
+            ],
+        )
+        self.assertContains(response, f"?event={event.pk}&amp;dsq=1")
+
+        with CaptureQueriesContext(connection) as context:
+            ResultAdmin(models.Result, None).get_facets(event)
+        self.assertEqual(len(context.captured_queries), 0)
+
+        models.SiteResult.objects.create(
+            missed=True, site=self.site2, result=self.results[2]
+        )
+        facets = ResultAdmin(models.Result, None).get_facets(event)
+        self.assertEqual([count for _, count, _ in facets[0][1]], [3, 1])
+
+
+class SiteColumnsTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.site = SiteFactory.create(
+            number=99,
+            task=models.TASK_EVAL_CORRECT_ANSWERS,
+            time_limit=5,
+            time_limit_diff_penalty=3,
+            missed_penalty=10,
+        )
+        self.result = ResultFactory.create()
+        self.site_result = models.SiteResult.objects.create(
+            time=timedelta(seconds=6 * 60),
+            value=3,
+            site=self.site,
+            result=self.result,
+        )
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+
+    def test_site_columns(self):
+        response = self.client.get(reverse("admin:eval_result_changelist"))
+        changelist = response.context["cl"]
+        column = next(
+            column
+            for column in changelist.list_display
+            if getattr(column, "__name__", "") == "get_site_99"
+        )
+        self.assertEqual(column.short_description, f"ST 99: {self.site.name}")
+        self.assertContains(response, "column-get_site_99")
+
+        # NOTE: numbers over 9 used to read the column of the last digit.
+        result = changelist.result_list[0]
+        self.assertEqual(
+            column(result),
+            utils.format_seconds(self.site_result.summary.total_penalty),
+        )
+        # The admin itself is not changed.
+        self.assertFalse(hasattr(ResultAdmin, "get_site_99"))
+
+        index = changelist.list_display.index(column)
+        response = self.client.get(
+            f"{reverse('admin:eval_result_changelist')}?o={index}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["cl"].get_ordering_field_columns(), {index: "asc"}
+        )
+
+    def test_registry(self):
+        event = models.get_active_event()
+        registry = columns.SiteColumnRegistry()
+
+        site_columns = registry.get(event)
+        with self.assertNumQueries(0):
+            self.assertIs(registry.get(event), site_columns)
+        self.assertEqual(
+            [column.__name__ for column in site_columns.list_display],
+            [
+                f"get_site_{site.number}"
+                for site in (self.site1, self.site2, self.site3, self.site)
+            ],
+        )
+
+        self.site.name = "renamed"
+        self.site.save()
+        renamed = registry.get(event)
+        self.assertIsNot(renamed, site_columns)
+        self.assertEqual(
+            renamed.list_display[-1].short_description, "ST 99: renamed"
+        )
+
+        self.site.delete()
+        self.assertEqual(len(registry.get(event).list_display), 3)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from eval import archive
+from eval import models
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class ArchiveTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.event = models.get_active_event()
+        self.site_results = [
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=(index + 7) * 60),
+                value=12,
+                site=self.site3,
+                result=ResultFactory.create(),
+            )
+            for index in range(2)
+        ]
+        archive.finalize(self.event)
+
+    def test_final_standings(self):
+        standings = list(self.event.final_standings.all())
+        self.assertEqual(
+            [standing.team for standing in standings],
+            [site_result.result.team for site_result in self.site_results],
+        )
+        first = standings[0]
+        self.assertEqual(first.category_1_rank, 1)
+        self.assertEqual(first.total_penalty, -1380)
+        self.assertEqual(json.loads(first.sites)[0]["total_penalty"], -1380)
+        self.assertTrue(self.event.final_export.startswith("Poradie"))
+
+        with self.assertRaises(ValueError):
+            first.save()
+        with self.assertRaises(ValueError):
+            archive.finalize(self.event)
+
+    def test_no_recompute_after_finalize(self):
+        self.site3.time_limit = 1
+        self.site3.save()
+
+        site_result = self.site_results[0]
+        site_result.value = 0
+        with self.assertRaises(ValueError):
+            site_result.save()
+        with self.assertRaises(ValueError):
+            site_result.result.save()
+
+        summary = models.ResultSummary.objects.get(result=site_result.result)
+        self.assertEqual(summary.total_penalty, -1380)
+
+    def test_admin_reads_from_snapshot(self):
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("admin:eval_result_changelist"))
+        self.assertRedirects(
+            response,
+            reverse("admin:eval_finalstanding_changelist")
+            + f"?event={self.event.pk}",
+        )
+
+        response = self.client.get(reverse("admin:eval_result_export"))
+        self.assertEqual(response.content.decode(), self.event.final_export)
+
+    def test_admin_add_denied(self):
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("admin:eval_result_add"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_delete_denied(self):
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+        result = self.site_results[0].result
+
+        response = self.client.post(
+            reverse("admin:eval_result_delete", args=[result.pk]),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            reverse("admin:eval_site_delete", args=[self.site3.pk]),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(models.Result.objects.filter(pk=result.pk).exists())
+        self.assertEqual(self.site3.siteresult_set.count(), 2)
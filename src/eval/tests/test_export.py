@@ -0,0 +1,184 @@
+import ast
+import csv
+from datetime import timedelta
+import io
+import struct
+import zipfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from eval import models
+from eval.admin import utils
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class ExportTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.results = [ResultFactory.create() for _ in range(3)]
+        self.site_results = [
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=(index + 7) * 60),
+                value=12,
+                site=self.site3,
+                result=result,
+            )
+            for index, result in enumerate(self.results)
+        ]
+
+    def _export(self, since_version=None):
+        queryset = models.Result.objects.order_by("summary__total_time")
+        response = utils.export_results_as_csv(
+            queryset,
+            "test",
+            models.get_active_event(),
+            since_version=since_version,
+        )
+        rows = list(csv.reader(response.content.decode().splitlines()))
+        return int(response["X-Results-Version"]), rows[1:]
+
+    def test_rows_of_partly_filled_teams(self):
+        response = utils.export_results_as_csv(
+            models.Result.objects.all(), "test", models.get_active_event()
+        )
+        header, *rows = csv.reader(response.content.decode().splitlines())
+
+        # Only site 3 of each team is filled.
+        site3_column = header.index(
+            f"ST{self.site3.number} {self.site3.name}"
+        )
+        for row in rows:
+            self.assertEqual(len(row), len(header))
+            self.assertEqual(row[2:site3_column], [""] * (site3_column - 2))
+            self.assertNotEqual(row[site3_column + 1], "")
+
+    def test_version_bumped_only_on_change(self):
+        summary = self.results[0].summary
+        version = summary.version
+
+        summary.take_fields_from_result()
+        summary.refresh_from_db()
+        self.assertEqual(summary.version, version)
+
+        self.site_results[0].value = 10
+        self.site_results[0].save()
+        summary.refresh_from_db()
+        self.assertGreater(summary.version, version)
+
+    def test_delta_export(self):
+        version, rows = self._export()
+        self.assertEqual(len(rows), 3)
+
+        _, rows = self._export(since_version=version)
+        self.assertEqual(rows, [])
+
+        # Last team gets faster and takes the second position.
+        site_result = self.site_results[2]
+        site_result.time = timedelta(seconds=7.5 * 60)
+        site_result.save()
+
+        new_version, rows = self._export(since_version=version)
+        self.assertGreater(new_version, version)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][:2], ["2.", self.results[2].team])
+
+    def test_delta_export_without_total_changes(self):
+        # Within the tolerance of variant A, the totals stay the same.
+        site_result = models.SiteResult.objects.create(
+            time=timedelta(seconds=5 * 60),
+            value=123,
+            site=self.site1,
+            variant=self.site1.sitevariant_set.get(),
+            result=self.results[0],
+        )
+        version, _ = self._export()
+        total_time = models.ResultSummary.objects.get(
+            result=self.results[0]
+        ).total_time
+
+        site_result.value = 124
+        site_result.save()
+        self.assertEqual(
+            models.ResultSummary.objects.get(
+                result=self.results[0]
+            ).total_time,
+            total_time,
+        )
+        version, rows = self._export(since_version=version)
+        self.assertEqual(
+            [row[1] for row in rows], [self.results[0].team]
+        )
+
+        result = self.results[1]
+        result.team = "Renamed"
+        result.save()
+        _, rows = self._export(since_version=version)
+        self.assertEqual([row[1] for row in rows], ["Renamed"])
+
+    def test_delta_export_of_deletes(self):
+        version, _ = self._export()
+        deleted = self.results[0].team
+        self.results[0].delete()
+        self.site_results[1].delete()
+
+        new_version, rows = self._export(since_version=version)
+        self.assertGreater(new_version, version)
+        self.assertEqual(
+            [row[:2] for row in rows],
+            [["2.", self.results[1].team], ["-", deleted]],
+        )
+        self.assertEqual(self._export(since_version=new_version)[1], [])
+
+        # Added again.
+        ResultFactory.create(team=deleted)
+        _, rows = self._export(since_version=version)
+        self.assertNotIn(["-", deleted], [row[:2] for row in rows])
+
+    def test_version_counter(self):
+        latest = models.get_latest_summary_version()
+        self.assertEqual(models.get_next_summary_version(), latest + 1)
+        self.assertEqual(models.get_next_summary_version(), latest + 2)
+        self.assertEqual(models.get_latest_summary_version(), latest + 2)
+
+    def test_npz_export(self):
+        queryset = models.Result.objects.order_by("summary__total_time")
+        response = utils.export_results_as_npz(queryset, "test")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response)))
+
+        def load(name):
+            data = archive.read(f"{name}.npy")
+            header_length = struct.unpack("<H", data[8:10])[0]
+            end = 10 + header_length
+            header = ast.literal_eval(data[10:end].decode())
+            return header, data[end:]
+
+        header, data = load("time")
+        self.assertEqual(header["descr"], "<i8")
+        self.assertEqual(header["shape"], (3,))
+        self.assertEqual(struct.unpack("<3q", data), (420, 480, 540))
+
+        header, data = load("team")
+        self.assertEqual(header["descr"], "<U50")
+        self.assertEqual(
+            data[:200].decode("utf-32-le").rstrip("\0"), self.results[0].team
+        )
+
+        _, data = load("value")
+        self.assertEqual(struct.unpack("<3d", data), (12.0, 12.0, 12.0))
+
+    def test_export_view(self):
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+        url = reverse("admin:eval_result_export")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        version = response["X-Results-Version"]
+
+        response = self.client.get(url, {"since": version})
+        self.assertEqual(len(response.content.decode().splitlines()), 1)
+
+        response = self.client.get(url, {"since": "x"})
+        self.assertEqual(response.status_code, 400)
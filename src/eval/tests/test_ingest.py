@@ -0,0 +1,117 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from eval import ingest
+from eval import models
+from eval import verification
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class IngestTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.event = models.get_active_event()
+        self.results = [
+            ResultFactory.create(team=team) for team in ("Alfa", "Beta")
+        ]
+
+    def _record(self, key, site, team, **values):
+        record = {
+            "key": key,
+            "site": site.number,
+            "team": team,
+            "time": "00:04:30",
+            "value": 125,
+        }
+        record.update(values)
+        return record
+
+    def _records(self):
+        return [
+            self._record("1", self.site1, "Alfa", variant="A"),
+            self._record("2", self.site3, "Alfa", value=10),
+            self._record("3", self.site2, "Beta", variant="-", value=5),
+            self._record("4", self.site3, "Beta", missed=True, value=None),
+        ]
+
+    def test_ingest(self):
+        written = ingest.ingest(self.event, self._records())
+
+        self.assertEqual(sorted(written.applied), ["1", "2", "3", "4"])
+        self.assertEqual(written.errors, {})
+        self.assertEqual(models.SiteResult.objects.count(), 4)
+        self.assertEqual(verification.find_mismatches(), [])
+        summary = models.ResultSummary.objects.get(result=self.results[1])
+        self.assertEqual(summary.missed_sites, 1)
+
+    def test_retry_not_applied_again(self):
+        ingest.ingest(self.event, self._records())
+        # Corrected in the meantime.
+        site_result = models.SiteResult.objects.get(site=self.site3, value=10)
+        site_result.value = 11
+        site_result.save()
+
+        written = ingest.ingest(self.event, self._records())
+        self.assertEqual(written.applied, [])
+        self.assertEqual(sorted(written.duplicates), ["1", "2", "3", "4"])
+        site_result.refresh_from_db()
+        self.assertEqual(site_result.value, 11)
+
+    def test_rejected_records(self):
+        written = ingest.ingest(
+            self.event,
+            [
+                self._record("1", self.site1, "Alfa", variant="B"),
+                self._record("2", self.site1, "Gama", variant="A"),
+                dict(self._record("3", self.site3, "Alfa"), site=99),
+                self._record("", self.site3, "Alfa"),
+                self._record("5", self.site3, "Beta"),
+                self._record("5", self.site1, "Beta", variant="A"),
+            ],
+        )
+
+        self.assertEqual(written.applied, ["5"])
+        self.assertEqual(written.duplicates, ["5"])
+        self.assertEqual(set(written.errors), {"1", "2", "3", ""})
+        self.assertIn("variant", written.errors["1"])
+        self.assertIn("result", written.errors["2"])
+        self.assertIn("site", written.errors["3"])
+        self.assertIn("id", written.errors[""])
+
+    def test_ingest_view(self):
+        url = reverse("eval:ingest")
+        data = json.dumps({"records": self._records()})
+
+        def post(data, username="admin", password="password"):
+            credentials = base64.b64encode(
+                f"{username}:{password}".encode()
+            ).decode()
+            return self.client.post(
+                url,
+                data,
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Basic {credentials}",
+            )
+
+        User.objects.create_superuser("admin", "", "password")
+        User.objects.create_user("reader", "", "password")
+        response = self.client.post(
+            url, data, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(post(data, password="wrong").status_code, 401)
+        self.assertEqual(post(data, username="reader").status_code, 403)
+        self.assertEqual(post("[]").status_code, 400)
+
+        response = post(data)
+        self.assertEqual(len(response.json()["applied"]), 4)
+        response = post(data)
+        self.assertEqual(len(response.json()["duplicates"]), 4)
+
+        self.event.is_finalized = True
+        self.event.save()
+        self.assertEqual(post(data).status_code, 403)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from io import StringIO
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from eval import instrumentation
+from eval import models
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class InstrumentationTestCase(ResultBase, TestCase):
+    def setUp(self):
+        log = tempfile.NamedTemporaryFile(delete=False)
+        log.close()
+        self.log = log.name
+        self.addCleanup(os.remove, self.log)
+
+        self.settings_override = override_settings(
+            EVAL_INSTRUMENTATION_LOG=self.log,
+            EVAL_INSTRUMENTATION_BUDGETS={"default": {"queries": 0}},
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def _get_records(self):
+        with open(self.log) as log:
+            return [json.loads(line) for line in log]
+
+    def test_measure(self):
+        with self.assertLogs("eval.instrumentation", "WARNING") as logs:
+            with instrumentation.measure("block") as measurement:
+                models.Site.objects.count()
+
+        self.assertEqual(measurement.queries, 1)
+        self.assertIn("over budget: queries 1 > 0", logs.output[0])
+        self.assertEqual(self._get_records()[0]["name"], "block")
+
+    def test_disabled(self):
+        with override_settings(EVAL_INSTRUMENTATION_LOG=None):
+            with instrumentation.measure("block") as measurement:
+                models.Site.objects.count()
+
+        self.assertIsNone(measurement)
+        self.assertEqual(self._get_records(), [])
+
+    def test_request_and_signal_records(self):
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+
+        with self.assertLogs("eval.instrumentation", "WARNING"):
+            self.client.get(reverse("admin:eval_result_changelist"))
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=7 * 60),
+                value=12,
+                site=self.site3,
+                result=ResultFactory.create(),
+            )
+
+        names = {record["name"] for record in self._get_records()}
+        self.assertIn("admin:eval_result_changelist", names)
+        self.assertIn("eval.signals.update_summaries_after_result", names)
+
+        out = StringIO()
+        call_command("perf_report", stdout=out)
+        self.assertIn("admin:eval_result_changelist", out.getvalue())
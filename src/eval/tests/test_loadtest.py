@@ -0,0 +1,75 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from eval import loadtest
+from eval import models
+
+
+class FormParserTestCase(SimpleTestCase):
+    def test_parse_form(self):
+        values = loadtest.parse_form(
+            '<input name="team" value="A"><input name="time">'
+            '<input type="checkbox" name="missed">'
+            '<input type="checkbox" name="done" checked>'
+            '<input type="submit" name="_save" value="Save">'
+            '<select name="variant" disabled><option value="1"></select>'
+            '<select name="site"><option value="">--</option>'
+            '<option value="2" selected>2</option></select>'
+            '<select name="task"><option value="a"><option value="b">'
+            "</select>"
+            '<input name="form-__prefix__-time">'
+            '<textarea name="note">x &amp; y</textarea>'
+        )
+
+        self.assertEqual(
+            values,
+            {
+                "team": "A",
+                "time": "",
+                "done": "on",
+                "site": "2",
+                "task": "a",
+                "note": "x & y",
+            },
+        )
+
+
+class LoadTestCommandTestCase(LiveServerTestCase):
+    def test_loadtest(self):
+        # NOTE: one kind of session at a time, the in-memory test database
+        # is shared by the server threads.
+        for session, actions in (
+            ("judges", ("result form", "save result")),
+            ("editors", ("site form", "save site")),
+            ("scoreboards", ("standings", "export")),
+        ):
+            sessions = {"judges": 0, "editors": 0, "scoreboards": 0}
+            sessions[session] = 1
+            out = StringIO()
+            call_command(
+                "loadtest",
+                url=self.live_server_url,
+                duration=0.5,
+                teams=2,
+                sites=2,
+                think_time=0,
+                poll_interval=0,
+                seed=1,
+                stdout=out,
+                **sessions,
+            )
+
+            output = out.getvalue()
+            for action in actions:
+                self.assertIn(action, output)
+            self.assertIn(" 0 failed, 0 on a locked database.", output)
+            # Synthetic data and the sessions' user are removed.
+            self.assertFalse(
+                models.Event.objects.filter(
+                    name__startswith="Load test"
+                ).exists()
+            )
+            self.assertFalse(User.objects.exists())
@@ -1,9 +1,20 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
+from eval import constants
 from eval import models
-from eval.tests.factories import ResultFactory, SiteFactory
+from eval import sandbox
+from eval.tests.factories import (
+    ResultFactory,
+    SiteFactory,
+    get_active_event,
+)
+from ig5_site.sqlite3.transaction import atomic_write
 
 
 class SiteTestCase(TestCase):
@@ -56,6 +67,173 @@ class SiteTestCase(TestCase):
         self.assertEqual(site_result.total_time, 2400)
 
 
+class SiteResultTimeTestCase(TestCase):
+    def setUp(self):
+        site = SiteFactory.create(
+            task=models.TASK_EVAL_CORRECT_ANSWERS,
+            time_limit=8,
+            time_limit_diff_penalty=5,
+            missed_penalty=50,
+            time_limit_max=10,
+            time_limit_max_penalty=35,
+        )
+        self.site_result = models.SiteResult(
+            time=timedelta(seconds=8 * 60), value=0, site=site
+        )
+
+    def test_started_second_counts(self):
+        self.site_result.time = timedelta(seconds=8 * 60, milliseconds=500)
+        self.assertEqual(self.site_result.time_penalty, 5)
+
+        self.site_result.time = timedelta(seconds=8 * 60, milliseconds=-500)
+        self.assertEqual(self.site_result.time_penalty, 0)
+
+        # Stored truncated, as the time limit compares.
+        self.site_result.set_seconds()
+        self.assertEqual(self.site_result.time_seconds, 8 * 60 - 1)
+
+    def test_time_limit_max_in_whole_seconds(self):
+        self.site_result.time = timedelta(seconds=10 * 60, milliseconds=-500)
+        self.assertTrue(self.site_result.task_within_timebox)
+        self.assertEqual(self.site_result.time_penalty, 120 * 5)
+
+        # The in-memory rescoring applies the same rules.
+        self.site_result.result = ResultFactory.create()
+        self.site_result.save()
+        (_, _, _, score), = sandbox.Sandbox().score_site_results()
+        self.assertTrue(score.within_timebox)
+        self.assertEqual(score.time_penalty, 120 * 5)
+
+        self.site_result.time = timedelta(seconds=10 * 60)
+        self.assertFalse(self.site_result.task_within_timebox)
+
+    def test_unsaved_time_is_scored(self):
+        self.site_result.time_seconds = 8 * 60
+        self.site_result.time = timedelta(seconds=9 * 60)
+        self.assertEqual(self.site_result.time_penalty, 300)
+
+        self.site_result.time = timedelta(seconds=10 * 60)
+        self.assertFalse(self.site_result.task_within_timebox)
+        self.assertEqual(self.site_result.time_penalty, 35 * 60)
+
+    def test_no_time(self):
+        self.site_result.time = None
+        self.assertTrue(self.site_result.task_within_timebox)
+        self.assertEqual(self.site_result.time_penalty, 0)
+
+
+class EventTestCase(TestCase):
+    def setUp(self):
+        self.event = get_active_event()
+        self.archived_event = models.Event.objects.create(name="IG5 2018")
+
+    def _create_site_result(self, event):
+        site = SiteFactory.create(
+            event=event,
+            number=1,
+            task=models.TASK_EVAL_CORRECT_ANSWERS,
+            time_limit=8,
+            time_limit_diff_penalty=5,
+            missed_penalty=50,
+        )
+        return models.SiteResult.objects.create(
+            time=timedelta(seconds=7 * 60),
+            value=12,
+            site=site,
+            result=ResultFactory.create(event=event, team="Team"),
+        )
+
+    def test_single_active_event(self):
+        self.archived_event.is_active = True
+        self.archived_event.save()
+
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_active)
+        self.assertEqual(models.get_active_event(), self.archived_event)
+
+    def test_numbers_and_teams_unique_per_event(self):
+        self._create_site_result(self.event)
+        self._create_site_result(self.archived_event)
+
+        with self.assertRaises(IntegrityError):
+            ResultFactory.create(event=self.event, team="Team")
+
+    def test_site_change_does_not_touch_other_events(self):
+        site_result = self._create_site_result(self.event)
+        archived_site_result = self._create_site_result(self.archived_event)
+        # Drift in the archived event has to stay as is.
+        models.ResultSummary.objects.filter(
+            result=archived_site_result.result
+        ).update(total_penalty=1)
+
+        site = site_result.site
+        site.time_limit = 7
+        site.save()
+
+        self.assertEqual(
+            models.ResultSummary.objects.get(
+                result=archived_site_result.result
+            ).total_penalty,
+            1,
+        )
+        site_result.result.summary.refresh_from_db()
+        self.assertEqual(site_result.result.summary.total_penalty, -1080)
+
+    def test_no_active_event(self):
+        self._create_site_result(self.event)
+        latest_site = self._create_site_result(self.archived_event).site
+        models.Event.objects.update(is_active=False)
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+
+        self.assertIsNone(models.get_active_event())
+        response = self.client.get(reverse("admin:eval_site_changelist"))
+        self.assertContains(response, constants.NO_ACTIVE_EVENT_SK)
+        # The latest event is shown, none is created.
+        self.assertEqual(
+            list(response.context["cl"].result_list), [latest_site]
+        )
+        self.assertEqual(models.Event.objects.count(), 2)
+        response = self.client.get(reverse("admin:eval_result_add"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_changelist_scoped_by_event(self):
+        site_result = self._create_site_result(self.event)
+        archived_site_result = self._create_site_result(self.archived_event)
+        user = User.objects.create_superuser("admin", "", "password")
+        self.client.force_login(user)
+        url = reverse("admin:eval_result_changelist")
+
+        response = self.client.get(url)
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [site_result.result],
+        )
+
+        response = self.client.get(url, {"event": self.archived_event.pk})
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [archived_site_result.result],
+        )
+
+
+class WriteTransactionTestCase(TransactionTestCase):
+    def _get_begins(self, context_manager):
+        with CaptureQueriesContext(connection) as context:
+            with context_manager:
+                models.Event.objects.count()
+
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("BEGIN")
+        ]
+
+    def test_only_writes_begin_immediate(self):
+        self.assertEqual(self._get_begins(atomic_write()), ["BEGIN IMMEDIATE"])
+        self.assertEqual(self._get_begins(transaction.atomic()), ["BEGIN"])
+
+
 class ResultBase:
     @classmethod
     def setUpClass(cls):
@@ -587,6 +765,106 @@ class SummaryTestCase(ResultBase, TestCase):
         # 12000 - 120 + 1140 (route, stop, penalty)
         self.assertEqual(result.summary.total_time, 13020)
 
+    def test_result_summary_category_orderings(self):
+        result = ResultFactory.create()
+        site_results = [
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=7 * 60),
+                value=12,
+                site=site,
+                missed=True,
+                result=result,
+            )
+            for site in (self.site1, self.site2)
+        ]
+
+        summary = models.ResultSummary.objects.get(pk=result.pk)
+        dsq = constants.DSQ_ORDERING_PENALTY
+        self.assertEqual(summary.missed_sites, 2)
+        self.assertEqual(
+            summary.category_1_ordering, summary.total_time + dsq
+        )
+        self.assertEqual(
+            summary.category_2_ordering, summary.total_penalty + dsq
+        )
+
+        site_results[0].delete()
+        summary = models.ResultSummary.objects.get(pk=result.pk)
+        self.assertEqual(summary.missed_sites, 1)
+        self.assertEqual(
+            summary.total_penalty, self.site2.missed_penalty * 60
+        )
+        self.assertEqual(
+            summary.category_1_ordering, summary.total_time + dsq
+        )
+        self.assertEqual(summary.category_2_ordering, summary.total_penalty)
+
+    def test_times_over_midnight(self):
+        result = ResultFactory.create(
+            start=time(22, 30), finish=time(1, 15), route_shortening_penalty=5
+        )
+        site_result = models.SiteResult.objects.create(
+            time=timedelta(seconds=4 * 60),
+            value=12,
+            site=self.site3,
+            result=result,
+            stop_time_start=time(23, 58),
+            stop_time_end=time(0, 3),
+        )
+
+        self.assertEqual(result.route_seconds, 2 * 60 * 60 + 45 * 60 + 300)
+        self.assertEqual(result.route_time.total_seconds(), 10200)
+        self.assertEqual(site_result.time_seconds, 240)
+        self.assertEqual(site_result.stop_time, -300)
+        self.assertEqual(
+            result.summary.total_time,
+            10200 + site_result.summary.total_time,
+        )
+
+    def test_result_summary_concurrent_writers(self):
+        """
+        Test writers holding stale instances of the same result (e.g. two
+        judges of different sites) don't overwrite each other's totals.
+        """
+        result = ResultFactory.create()
+        models.SiteResult.objects.create(
+            time=timedelta(seconds=7 * 60),
+            value=12,
+            site=self.site3,
+            result=result,
+        )
+
+        judges = [
+            models.Result.objects.select_related("summary").get(pk=result.pk)
+            for _ in range(2)
+        ]
+        for judge, site in zip(judges, (self.site1, self.site2)):
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=4 * 60),
+                value=35,
+                site=site,
+                variant=site.sitevariant_set.first(),
+                result=judge,
+            )
+
+        summary = models.ResultSummary.objects.get(pk=result.pk)
+        totals = models.get_result_totals(result.pk)
+        for field, value in totals.items():
+            self.assertEqual(getattr(summary, field), value)
+        self.assertEqual(
+            summary.total_penalty,
+            sum(
+                site_result.summary.total_penalty
+                for site_result in result.siteresult_set.all()
+            ),
+        )
+
+        # Route time changes are summed too.
+        judges[0].route_shortening_penalty = 10
+        judges[0].save()
+        summary.refresh_from_db()
+        self.assertEqual(summary.total_time, totals["total_time"] + 600)
+
     # ======================================================================= #
     # __str__ tests.                                                          #
     # ======================================================================= #
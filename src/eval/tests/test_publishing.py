@@ -0,0 +1,80 @@
+from datetime import timedelta
+import json
+import os
+import stat
+import tempfile
+
+from django.test import TestCase
+
+from eval import archive
+from eval import models
+from eval import publishing
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class PublishingTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.event = models.get_active_event()
+        self.results = [
+            ResultFactory.create(team=team) for team in ("Alfa Tím", "Beta")
+        ]
+        for index, result in enumerate(self.results):
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=(index + 7) * 60),
+                value=12,
+                site=self.site3,
+                result=result,
+            )
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def _read(self, *path):
+        with open(os.path.join(self.root.name, *path)) as f:
+            return f.read()
+
+    def test_publish(self):
+        self.assertEqual(publishing.publish(self.event, self.root.name), 2)
+
+        standings = json.loads(self._read("standings.json"))
+        self.assertFalse(standings["finalized"])
+        first = standings["teams"][0]
+        self.assertEqual(first["team"], "Alfa Tím")
+        self.assertEqual(first["category_1_rank"], 1)
+        self.assertEqual(first["page"], "teams/alfa-tim.html")
+        self.assertEqual(first["sites"][0]["total_penalty"], -1380)
+
+        index = self._read("index.html")
+        self.assertIn('<a href="teams/alfa-tim.html">Alfa Tím</a>', index)
+        team = self._read("teams", "alfa-tim.html")
+        self.assertIn(self.site3.name, team)
+        self.assertEqual(
+            json.loads(self._read("teams", "beta.json"))["team"], "Beta"
+        )
+        mode = os.stat(os.path.join(self.root.name, "index.html")).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o644)
+
+    def test_republish_after_change(self):
+        publishing.publish(self.event, self.root.name)
+        state = publishing.get_state(self.event)
+
+        result = self.results[1]
+        result.team = "Gama"
+        result.save()
+        self.assertNotEqual(publishing.get_state(self.event), state)
+
+        publishing.publish(self.event, self.root.name)
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.root.name, "teams"))),
+            ["alfa-tim.html", "alfa-tim.json", "gama.html", "gama.json"],
+        )
+
+    def test_finalized_from_snapshot(self):
+        live = archive.get_standings(self.event)
+        archive.finalize(self.event)
+        self.assertEqual(archive.get_standings(self.event), live)
+
+        publishing.publish(self.event, self.root.name)
+        standings = json.loads(self._read("standings.json"))
+        self.assertTrue(standings["finalized"])
+        self.assertEqual(len(standings["teams"]), 2)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from eval import models
+from eval import sandbox
+from eval import snapshot
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class SandboxTestCase(ResultBase, TestCase):
+    def setUp(self):
+        variant = self.site1.sitevariant_set.first()
+        self.results = []
+        for index, value in enumerate((127, 123, 130)):
+            result = ResultFactory.create()
+            models.SiteResult.objects.create(
+                time=timedelta(seconds=(index + 4) * 60),
+                value=value,
+                site=self.site1,
+                variant=variant,
+                result=result,
+            )
+            self.results.append(result)
+
+    def test_baseline_matches_summaries(self):
+        standings = sandbox.Sandbox().baseline
+
+        for result in models.Result.objects.select_related("summary"):
+            standing = standings[result.pk]
+            self.assertEqual(standing.total_time, result.summary.total_time)
+            self.assertEqual(
+                standing.total_penalty, result.summary.total_penalty
+            )
+
+    def test_rescore_without_writes(self):
+        event = sandbox.Sandbox()
+        event.baseline
+        overrides = {
+            self.site1.number: {"deviation_tolerance": lambda value: value + 4}
+        }
+
+        with self.assertNumQueries(0):
+            standings, changes = event.compare(overrides)
+
+        # Stored data are untouched.
+        variant = models.SiteVariant.objects.get(site=self.site1)
+        self.assertEqual(variant.deviation_tolerance, 3)
+        # Apply the same change for real and compare.
+        variant = self.site1.sitevariant_set.first()
+        variant.deviation_tolerance = 7
+        variant.save()
+        for result in models.Result.objects.select_related("summary"):
+            self.assertEqual(
+                standings[result.pk].total_time, result.summary.total_time
+            )
+        self.assertEqual(
+            [
+                (change.team, change.old_rank, change.new_rank)
+                for change in changes
+                if change.category == 1
+            ],
+            [(self.results[0].team, 2, 1), (self.results[1].team, 1, 2)],
+        )
+
+    def test_unknown_override(self):
+        with self.assertRaises(ValueError):
+            sandbox.Sandbox().rescore({self.site1.number: {"team": "x"}})
+
+    def test_whatif_command(self):
+        out = StringIO()
+        call_command(
+            "whatif", f"{self.site1.number}.deviation_tolerance+=4", stdout=out
+        )
+        self.assertIn("4 rank change(s)", out.getvalue())
+
+    def test_whatif_command_invalid_override(self):
+        # NOTE: `time_limit_max` of the site is not set.
+        for override in ("time_limit_max+=1", "time_limit+=null", "x=1"):
+            with self.assertRaises(CommandError):
+                call_command("whatif", f"{self.site1.number}.{override}")
+
+
+class SnapshotTestCase(TestCase):
+    def test_site_result_columns(self):
+        columns = snapshot.SiteResultColumns()
+        rows = [
+            (1, 10, 100, 1000, 300, 12.5, False, -60),
+            (2, 10, 101, None, None, None, True, 0),
+        ]
+        for row in rows:
+            columns.append(*row)
+
+        self.assertEqual(list(columns), rows)
+        self.assertEqual(list(columns[1:]), rows[1:])
+
+        # Typed arrays, no per-row objects.
+        row_size = sum(column.itemsize for column in vars(columns).values())
+        self.assertLessEqual(row_size, 64)
+
+    def test_override_does_not_change_records(self):
+        site = snapshot.SiteRecord(id=1, number=1, time_limit=5)
+        copy = site.copy()
+        copy.time_limit = 6
+
+        self.assertEqual(site.time_limit, 5)
+        with self.assertRaises(AttributeError):
+            site.team = "x"
@@ -0,0 +1,149 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from eval import models
+from eval import stations
+from eval import verification
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class StationEntryTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.results = [ResultFactory.create() for _ in range(3)]
+        self.variant = self.site1.sitevariant_set.get()
+        # Entered through the change form before.
+        self.site_result = models.SiteResult.objects.create(
+            time=timedelta(seconds=7 * 60),
+            value=120,
+            site=self.site1,
+            variant=self.variant,
+            result=self.results[0],
+        )
+
+    def _entry(self, entry_id, result, **values):
+        entry = {
+            "id": entry_id,
+            "result": result.pk,
+            "variant": self.variant.pk,
+            "missed": False,
+            "time": "00:04:30",
+            "value": "125",
+            "stop_time_start": "",
+            "stop_time_end": "",
+        }
+        entry.update(values)
+        return entry
+
+    def test_apply_entries(self):
+        written = stations.apply_entries(
+            self.site1,
+            [
+                self._entry("a", self.results[0], value="124"),
+                self._entry("b", self.results[1], time="00:06:00"),
+                self._entry(
+                    "c",
+                    self.results[2],
+                    stop_time_start="23:59:00",
+                    stop_time_end="00:01:00",
+                ),
+                # Later entry of the same team wins.
+                self._entry("d", self.results[1], missed=True),
+            ],
+        )
+
+        self.assertEqual(written.applied, ["a", "b", "c", "d"])
+        self.assertEqual(written.errors, {})
+        self.assertEqual(self.site1.siteresult_set.count(), 3)
+
+        self.site_result.refresh_from_db()
+        self.assertEqual(self.site_result.value, 124)
+        self.assertEqual(self.site_result.time_seconds, 270)
+        self.assertTrue(
+            self.site1.siteresult_set.get(result=self.results[1]).missed
+        )
+        self.assertEqual(
+            self.site1.siteresult_set.get(result=self.results[2]).stop_time,
+            -120,
+        )
+
+        # Summaries and statistics as if saved one by one.
+        self.assertEqual(verification.find_mismatches(), [])
+        statistics = self.site1.statistics.get(variant=None)
+        self.assertEqual(statistics.results_count, 3)
+        self.assertEqual(statistics.missed_count, 1)
+
+    def test_rejected_entries(self):
+        unknown = ResultFactory.create(
+            event=models.Event.objects.create(name="IG5 2018")
+        )
+        written = stations.apply_entries(
+            self.site1,
+            [
+                self._entry("a", self.results[1], value=""),
+                self._entry("b", self.results[2], time="later"),
+                self._entry("c", unknown),
+                self._entry("d", self.results[1], variant=None),
+                self._entry("e", self.results[2], missed=True, value=""),
+            ],
+        )
+
+        errors = written.errors
+        self.assertEqual(written.applied, ["e"])
+        self.assertEqual(set(errors), {"a", "b", "c", "d"})
+        self.assertIn("value", errors["a"])
+        self.assertIn("time", errors["b"])
+        self.assertIn("result", errors["c"])
+        self.assertIn("variant", errors["d"])
+        self.assertFalse(
+            self.site1.siteresult_set.filter(result=self.results[1]).exists()
+        )
+
+    def test_station_views(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+        url = reverse("admin:eval_result_station", args=[self.site1.pk])
+        response = self.client.get(url)
+        self.assertContains(response, 'id="station-config"')
+        self.assertContains(response, f"{self.results[0].team} &#10003;")
+
+        sync_url = reverse(
+            "admin:eval_result_station_sync", args=[self.site1.pk]
+        )
+        self.assertEqual(self.client.get(sync_url).status_code, 405)
+        response = self.client.post(
+            sync_url,
+            json.dumps({"entries": [self._entry("a", self.results[1])]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"applied": ["a"], "errors": {}})
+
+        # A retry (the response got lost) after a correction of the team.
+        stations.apply_entries(
+            self.site1, [self._entry("b", self.results[1], value="110")]
+        )
+        response = self.client.post(
+            sync_url,
+            json.dumps({"entries": [self._entry("a", self.results[1])]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"applied": ["a"], "errors": {}})
+        self.assertEqual(
+            self.site1.siteresult_set.get(result=self.results[1]).value, 110
+        )
+
+        for data in ("[]", json.dumps({"entries": [1]})):
+            response = self.client.post(
+                sync_url, data, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400)
+
+        event = self.site1.event
+        event.is_finalized = True
+        event.save()
+        self.assertEqual(self.client.get(url).status_code, 403)
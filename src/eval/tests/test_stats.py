@@ -0,0 +1,149 @@
+from datetime import timedelta
+import math
+import random
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from eval import models
+from eval import stats
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class SiteStatisticsTestCase(ResultBase, TestCase):
+    def setUp(self):
+        variant = self.site1.sitevariant_set.get()
+        variant.pk = None
+        variant.name = "B"
+        variant.reference_value = 100
+        variant.save()
+
+        random.seed(7)
+        for _ in range(20):
+            result = ResultFactory.create()
+            for site in (self.site1, self.site2, self.site3):
+                variants = list(site.sitevariant_set.all())
+                models.SiteResult.objects.create(
+                    time=timedelta(seconds=random.randint(60, 15 * 60)),
+                    value=random.choice([100, 123, 12])
+                    + random.uniform(-15, 15),
+                    missed=random.random() < 0.1,
+                    site=site,
+                    variant=random.choice(variants) if variants else None,
+                    result=result,
+                )
+
+    def _get_expected(self, site_results):
+        reported = [
+            site_result
+            for site_result in site_results
+            if not site_result.missed
+        ]
+        deviations = [
+            site_result.value - site_result.variant.reference_value
+            for site_result in reported
+            if site_result.variant
+        ]
+        times = [site_result.time.total_seconds() for site_result in reported]
+
+        expected = {
+            "results_count": len(site_results),
+            "missed_count": len(site_results) - len(reported),
+            "time_avg": sum(times) / len(times),
+            "time_min": min(times),
+            "time_max": max(times),
+            "outside_tolerance_count": sum(
+                not site_result.precision_within_tolerance
+                for site_result in reported
+            ),
+            "outside_max_tolerance_count": sum(
+                not site_result.precision_within_max_tolerance
+                for site_result in reported
+            ),
+            "over_time_limit_max_count": sum(
+                not site_result.task_within_timebox
+                for site_result in reported
+            ),
+            "total_penalty_avg": sum(
+                site_result.summary.total_penalty
+                for site_result in site_results
+            )
+            / len(site_results),
+        }
+        if deviations:
+            average = sum(deviations) / len(deviations)
+            expected.update(
+                deviation_avg=average,
+                deviation_std=math.sqrt(
+                    sum((value - average) ** 2 for value in deviations)
+                    / len(deviations)
+                ),
+                deviation_min=min(deviations),
+                deviation_max=max(deviations),
+            )
+
+        return expected
+
+    def _assert_statistics(self, statistics, site_results):
+        for field, value in self._get_expected(site_results).items():
+            self.assertAlmostEqual(getattr(statistics, field), value, 6)
+
+    def test_statistics(self):
+        for site in (self.site1, self.site2, self.site3):
+            site_results = list(site.siteresult_set.all())
+            self._assert_statistics(
+                site.statistics.get(variant=None), site_results
+            )
+
+            for variant in site.sitevariant_set.all():
+                self._assert_statistics(
+                    site.statistics.get(variant=variant),
+                    [
+                        site_result
+                        for site_result in site_results
+                        if site_result.variant == variant
+                    ],
+                )
+
+        statistics = self.site1.statistics.get(variant=None)
+        self.assertGreater(statistics.outside_tolerance_count, 0)
+        self.assertGreater(statistics.outside_max_tolerance_count, 0)
+        self.assertGreater(
+            self.site2.statistics.get(variant=None).over_time_limit_max_count,
+            0,
+        )
+        self.assertIsNone(
+            self.site3.statistics.get(variant=None).deviation_avg
+        )
+
+    def test_statistics_updated(self):
+        site_result = self.site1.siteresult_set.filter(missed=False).first()
+        site_result.missed = True
+        site_result.save()
+        self._assert_statistics(
+            self.site1.statistics.get(variant=None),
+            list(self.site1.siteresult_set.all()),
+        )
+
+        models.Result.objects.filter(pk=site_result.result_id).delete()
+        self._assert_statistics(
+            self.site1.statistics.get(variant=None),
+            list(self.site1.siteresult_set.all()),
+        )
+
+    def test_statistics_view(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "", "password")
+        )
+        response = self.client.get(reverse("admin:eval_site_statistics"))
+        sites = response.json()["sites"]
+
+        self.assertEqual(
+            sites, stats.get_event_statistics(models.get_active_event())
+        )
+        self.assertEqual(sites[0]["results_count"], 20)
+        self.assertEqual(
+            [variant["name"] for variant in sites[0]["variants"]], ["A", "B"]
+        )
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from eval import models
+from eval import verification
+from eval.tests.factories import ResultFactory
+from eval.tests.test_models import ResultBase
+
+
+class VerificationTestCase(ResultBase, TestCase):
+    def setUp(self):
+        self.result = ResultFactory.create()
+        self.site_result = models.SiteResult.objects.create(
+            time=timedelta(seconds=7 * 60),
+            value=12,
+            site=self.site3,
+            result=self.result,
+        )
+        ResultFactory.create()
+
+    def test_consistent(self):
+        self.assertEqual(verification.find_mismatches(), [])
+
+        out = StringIO()
+        call_command("verify_scores", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+    def test_report_and_repair(self):
+        # Drift without signals.
+        models.SiteResultSummary.objects.filter(
+            pk=self.site_result.pk
+        ).update(total_penalty=0)
+        models.ResultSummary.objects.filter(pk=self.result.pk).update(
+            total_time=1
+        )
+        version = models.ResultSummary.objects.get(pk=self.result.pk).version
+
+        mismatches = verification.find_mismatches()
+        self.assertEqual(
+            [mismatch.summary_model for mismatch in mismatches],
+            [models.SiteResultSummary, models.ResultSummary],
+        )
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("verify_scores", stdout=out)
+        self.assertIn("total_penalty stored 0, expected -1380", out.getvalue())
+
+        call_command("verify_scores", "--repair", stdout=out)
+        self.assertEqual(verification.find_mismatches(), [])
+        summary = models.ResultSummary.objects.get(pk=self.result.pk)
+        self.assertGreater(summary.version, version)
+
+    def test_parallel_rescore(self):
+        models.SiteResultSummary.objects.update(total_penalty=0, total_time=0)
+        models.ResultSummary.objects.update(total_penalty=0)
+
+        out = StringIO()
+        call_command("rescore", "--workers", "2", stdout=out)
+
+        self.assertIn("Updated 2 summaries", out.getvalue())
+        self.assertEqual(verification.find_mismatches(), [])
+
+    def test_bulk_update(self):
+        results = [ResultFactory.create() for _ in range(400)]
+        verification.bulk_update(
+            models.Result,
+            {result.pk: {"route_shortening_penalty": 5} for result in results},
+            ["route_shortening_penalty"],
+        )
+        self.assertEqual(
+            models.Result.objects.filter(route_shortening_penalty=5).count(),
+            400,
+        )
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from eval import views
+
+
+app_name = "eval"
+urlpatterns = [
+    path("site-results/", views.ingest_view, name="ingest"),
+]
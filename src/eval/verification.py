@@ -0,0 +1,190 @@
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Case, Value, When
+
+from eval import models
+from eval import sandbox
+from eval import stats
+from ig5_site.sqlite3.transaction import atomic_write
+
+
+SUMMARY_FIELDS = models.ResultSummaryBase.fields_from_result
+RESULT_SUMMARY_FIELDS = models.ResultSummary.fields_from_result + (
+    "category_1_ordering",
+    "category_2_ordering",
+)
+
+Mismatch = namedtuple(
+    "Mismatch", ("summary_model", "pk", "label", "stored", "expected")
+)
+
+
+def get_summary_values(score):
+    # NOTE: `int` as stored in the `IntegerField`s.
+    return {field: int(getattr(score, field)) for field in SUMMARY_FIELDS}
+
+
+def _get_stored(queryset, fields=SUMMARY_FIELDS):
+    return {
+        pk: dict(zip(fields, values))
+        for pk, *values in queryset.values_list("result_id", *fields)
+    }
+
+
+def find_mismatches(event=None, workers=1):
+    """
+    Recomputes all scores of the event (the active one by default) in one
+    batch and compares them to the stored `SiteResultSummary`/`ResultSummary`
+    rows; `stored` is `None` for a missing summary.
+    """
+    data = sandbox.Sandbox(event)
+    site_numbers = {pk: site.number for pk, site in data.sites.items()}
+    site_ids = dict(zip(data.site_results.pk, data.site_results.site_id))
+    scored_results = set(data.site_results.result_id)
+
+    expected_site_results = {}
+    expected_results = {
+        pk: {field: 0 for field in RESULT_SUMMARY_FIELDS}
+        for pk in data.results
+    }
+    for pk, result_id, _, score in data.score_site_results(workers=workers):
+        values = get_summary_values(score)
+        expected_site_results[pk] = (result_id, values)
+
+        totals = expected_results[result_id]
+        for field in SUMMARY_FIELDS:
+            totals[field] += values[field]
+
+    for result_id, missed in zip(
+        data.site_results.result_id, data.site_results.missed
+    ):
+        expected_results[result_id]["missed_sites"] += missed
+
+    for pk, (_, route_time) in data.results.items():
+        totals = expected_results[pk]
+        totals["total_time"] += route_time
+        totals.update(
+            models.get_category_orderings(
+                totals["total_time"],
+                totals["total_penalty"],
+                totals["missed_sites"],
+            )
+        )
+
+    mismatches = []
+
+    stored_site_results = _get_stored(
+        models.SiteResultSummary.objects.filter(
+            result__result__event=data.event
+        )
+    )
+    for pk, (result_id, expected) in expected_site_results.items():
+        stored = stored_site_results.get(pk)
+        if stored != expected:
+            team = data.results[result_id][0]
+            label = f"{team} - ST{site_numbers[site_ids[pk]]}"
+            mismatches.append(
+                Mismatch(models.SiteResultSummary, pk, label, stored, expected)
+            )
+
+    stored_results = _get_stored(
+        models.ResultSummary.objects.filter(result__event=data.event),
+        RESULT_SUMMARY_FIELDS,
+    )
+    for pk, expected in expected_results.items():
+        # Results without site results never get a summary.
+        if pk not in stored_results and pk not in scored_results:
+            continue
+
+        stored = stored_results.get(pk)
+        if stored != expected:
+            mismatches.append(
+                Mismatch(
+                    models.ResultSummary,
+                    pk,
+                    data.results[pk][0],
+                    stored,
+                    expected,
+                )
+            )
+
+    return mismatches
+
+
+def bulk_update(model, rows, fields):
+    """
+    Updates `fields` of many rows with one `UPDATE ... CASE` query per batch
+    (`QuerySet.bulk_update` comes with Django 2.2); `rows` maps primary keys
+    to `{field: value}`.
+    """
+    # Two parameters per `When` and field, one for the `IN` clause.
+    max_params = connection.features.max_query_params or 2000
+    batch_size = max(1, max_params // (2 * len(fields) + 1))
+
+    pks = list(rows)
+    for start in range(0, len(pks), batch_size):
+        end = start + batch_size
+        batch = pks[start:end]
+        updates = {}
+        for field in fields:
+            # NOTE: values are adapted by the field, e.g. times on SQLite.
+            output_field = model._meta.get_field(field)
+            updates[field] = Case(
+                *[
+                    When(
+                        pk=pk,
+                        then=Value(rows[pk][field], output_field=output_field),
+                    )
+                    for pk in batch
+                ],
+                output_field=output_field,
+            )
+        model.objects.filter(pk__in=batch).update(**updates)
+
+
+@atomic_write()
+def repair(mismatches):
+    for summary_model, fields in (
+        (models.SiteResultSummary, SUMMARY_FIELDS),
+        (models.ResultSummary, RESULT_SUMMARY_FIELDS),
+    ):
+        items = [
+            mismatch
+            for mismatch in mismatches
+            if mismatch.summary_model is summary_model
+        ]
+        summary_model.objects.bulk_create(
+            summary_model(result_id=mismatch.pk, **mismatch.expected)
+            for mismatch in items
+            if mismatch.stored is None
+        )
+        bulk_update(
+            summary_model,
+            {
+                mismatch.pk: mismatch.expected
+                for mismatch in items
+                if mismatch.stored is not None
+            },
+            fields,
+        )
+
+    # Changed teams for the delta export.
+    models.ResultSummary.objects.filter(
+        result__in=[
+            mismatch.pk
+            for mismatch in mismatches
+            if mismatch.summary_model is models.ResultSummary
+        ]
+    ).update(version=models.get_next_summary_version())
+
+    # Average penalties of the affected sites.
+    sites = models.Site.objects.filter(
+        siteresult__in=[
+            mismatch.pk
+            for mismatch in mismatches
+            if mismatch.summary_model is models.SiteResultSummary
+        ]
+    ).distinct()
+    for site in sites:
+        stats.update_site_statistics(site)
@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+
+from django.contrib.auth import authenticate
+from django.db import IntegrityError
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+)
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from eval import ingest
+from eval.admin import utils
+
+
+INGEST_PERMISSIONS = ("eval.add_result", "eval.change_result")
+
+
+def _get_basic_auth_user(request):
+    try:
+        method, credentials = request.META["HTTP_AUTHORIZATION"].split()
+        if method.lower() != "basic":
+            return None
+        username, password = (
+            base64.b64decode(credentials).decode().split(":", 1)
+        )
+    except (KeyError, ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+    return authenticate(request, username=username, password=password)
+
+
+# NOTE: devices authenticate by HTTP Basic (no cookies), CSRF doesn't apply.
+@csrf_exempt
+@require_POST
+def ingest_view(request):
+    """
+    Bulk ingest of site results of the event (`?event=<pk>`, the active one
+    by default); `{"records": [...]}`, see `eval.ingest.ingest`. Retried
+    records (by `key`) are reported as duplicates and not applied again.
+    """
+    user = _get_basic_auth_user(request)
+    if user is None:
+        response = HttpResponse(status=401)
+        response["WWW-Authenticate"] = 'Basic realm="ig5"'
+        return response
+    if not user.has_perms(INGEST_PERMISSIONS):
+        return HttpResponseForbidden()
+
+    event = utils.get_request_event(request, fallback=False)
+    if event is None:
+        return HttpResponseBadRequest("No event is active; use ?event=<pk>.")
+    if event.is_finalized:
+        return HttpResponseForbidden(f"Event '{event}' is finalized.")
+
+    try:
+        records = json.loads(request.body.decode())["records"]
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest("Invalid request.")
+
+    if not isinstance(records, list) or not all(
+        isinstance(record, dict) for record in records
+    ):
+        return HttpResponseBadRequest("Invalid request.")
+    if len(records) > ingest.MAX_RECORDS:
+        return HttpResponseBadRequest(
+            f"At most {ingest.MAX_RECORDS} records per request."
+        )
+
+    try:
+        written = ingest.ingest(event, records)
+    except IntegrityError:
+        # The same keys uploaded concurrently; the retry gets duplicates.
+        return JsonResponse({"error": "Conflict, retry."}, status=409)
+
+    return JsonResponse(
+        {
+            "applied": written.applied,
+            "duplicates": written.duplicates,
+            "errors": written.errors,
+        }
+    )
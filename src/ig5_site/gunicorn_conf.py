@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for production, e.g.
+
+    gunicorn -c src/ig5_site/gunicorn_conf.py ig5_site.wsgi:application
+
+Tunable by environment variables; see README for the sizing. Workers are
+reloaded gracefully on SIGHUP (`kill -HUP <master pid>`).
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+chdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Preforked processes with threads; a judge waiting on a slow save (or on
+# the SQLite write lock) does not block the others.
+worker_class = "gthread"
+workers = _env_int(
+    "GUNICORN_WORKERS", max(2, min(multiprocessing.cpu_count(), 4))
+)
+threads = _env_int("GUNICORN_THREADS", 4)
+
+# Requests over `timeout` seconds get their worker restarted; on reload
+# (SIGHUP) and shutdown running requests get `graceful_timeout` to finish.
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# Workers are recycled now and then, so memory doesn't grow all day.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -46,6 +46,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Our.
+    "ig5_site.sqlite3.transaction.WriteRequestMiddleware",
+    "eval.instrumentation.InstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "ig5_site.urls"
@@ -74,8 +77,11 @@ WSGI_APPLICATION = "ig5_site.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # NOTE: `django.db.backends.sqlite3` with IMMEDIATE transactions.
+        "ENGINE": "ig5_site.sqlite3",
         "NAME": os.path.join(BASE_DIR, "../../db.sqlite3"),
+        # Seconds a transaction waits for the write lock.
+        "OPTIONS": {"timeout": 20},
         'TEST_NAME': os.path.join(os.path.dirname(__file__), 'test.db'),
     }
 }
@@ -117,3 +123,29 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
+
+
+# Instrumentation (queries, DB and Python time per view and signal handler).
+# Disabled unless a log file is given; see `manage.py perf_report`.
+
+EVAL_INSTRUMENTATION_LOG = os.environ.get("EVAL_INSTRUMENTATION_LOG")
+EVAL_INSTRUMENTATION_BUDGETS = {
+    "default": {"queries": 100, "time": 1.0},
+    "admin:eval_result_changelist": {"queries": 50, "time": 2.0},
+    "admin:eval_result_change": {"queries": 100, "time": 1.0},
+    "eval.signals.update_summaries_after_result": {"queries": 20},
+}
+
+# Static standings (see `manage.py publish_standings`); a directory served by
+# any static web server.
+
+EVAL_PUBLISH_ROOT = os.environ.get("EVAL_PUBLISH_ROOT")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "eval.instrumentation": {"handlers": ["console"], "level": "WARNING"}
+    },
+}
@@ -1,5 +1,12 @@
+import os
+
 from ig5_site.settings.base import *  # noqa
+from ig5_site.settings.base import BASE_DIR, INSTALLED_APPS
 
 
 DEBUG = True
 INSTALLED_APPS += ["django_extensions"]
+EVAL_INSTRUMENTATION_LOG = os.environ.get(
+    "EVAL_INSTRUMENTATION_LOG",
+    os.path.join(BASE_DIR, "../../instrumentation.log"),
+)
@@ -1,7 +1,46 @@
 import os
+import tempfile
 
 from ig5_site.settings.base import *  # noqa
+from ig5_site.settings.base import MIDDLEWARE, TEMPLATES
 
 DEBUG = False
 SECRET_KEY = os.environ["SECRET_KEY"]
 ALLOWED_HOSTS = [os.environ["CURRENT_HOST"]]
+
+# Shared by the worker processes, so a change drops the cached counts and
+# site columns of all of them at once; see `eval.caching`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "EVAL_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "ig5-eval-cache"),
+        ),
+        # Counts of each filter combination.
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Static files are served by the app (WhiteNoise) from `collectstatic`
+# output: names are content hashed and cached "forever", gzipped variants
+# are precomputed.
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Files without a hash in the name.
+WHITENOISE_MAX_AGE = 60 * 60
+
+# Templates are parsed once per process.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    )
+]
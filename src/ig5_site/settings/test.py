@@ -1 +1,6 @@
 from ig5_site.settings.base import *  # noqa
+from ig5_site.settings.base import DATABASES
+
+# NOTE: pytest-django only keeps SQLite test databases in memory for the
+# stock backend's ENGINE.
+DATABASES["default"]["TEST"] = {"NAME": ":memory:"}
@@ -0,0 +1,24 @@
+"""
+SQLite backend whose write transactions take the write lock when they
+begin.
+
+SQLite's default (deferred) transaction reads first and fails at once with
+"database is locked" when it then writes while another connection holds
+the lock - the busy timeout only applies to a transaction that has not
+read yet. Admin saves read and write in one transaction, so concurrent
+workers (and threads) are serialized here instead, waiting up to the
+connection's `timeout`. Only transactions begun under
+`transaction.write_transactions` do, read-only ones stay deferred.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # NOTE: set by `transaction.write_transactions`.
+    begin_immediate = False
+
+    def _start_transaction_under_autocommit(self):
+        if self.begin_immediate:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        else:
+            super()._start_transaction_under_autocommit()
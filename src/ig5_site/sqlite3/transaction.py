@@ -0,0 +1,53 @@
+"""
+Transactions that write: `atomic_write` and `WriteRequestMiddleware` make
+the transactions they begin take SQLite's write lock up front (see `base`);
+any other transaction begins deferred, so reads never wait for writers.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.utils import DEFAULT_DB_ALIAS
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+@contextmanager
+def write_transactions(using=None):
+    """
+    Transactions begun in the block begin IMMEDIATE; a transaction already
+    begun is not changed.
+    """
+    connection = transaction.get_connection(using)
+    previous = getattr(connection, "begin_immediate", False)
+    # NOTE: other backends ignore the flag.
+    connection.begin_immediate = True
+    try:
+        yield
+    finally:
+        connection.begin_immediate = previous
+
+
+@contextmanager
+def atomic_write(using=None):
+    """
+    `transaction.atomic` of a block that reads and then writes.
+    """
+    with write_transactions(using), transaction.atomic(using):
+        yield
+
+
+class WriteRequestMiddleware:
+    """
+    Transactions of unsafe requests (admin saves and deletes) are writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+
+        with write_transactions(DEFAULT_DB_ALIAS):
+            return self.get_response(request)